@@ -6,7 +6,13 @@
 
 import pytest
 import json
+import os
+import shlex
+import sys
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch, MagicMock
 from tigerhill.adapters.multi_language import (
     AgentAdapter,
@@ -15,7 +21,8 @@ from tigerhill.adapters.multi_language import (
     STDIOAgentAdapter,
     UniversalAgentTester
 )
-from tigerhill.storage.trace_store import TraceStore
+from tigerhill.adapters.cache import SemanticCache, TesterCache
+from tigerhill.storage.trace_store import EventType, TraceStore
 
 
 class TestAgentAdapter:
@@ -66,13 +73,13 @@ class TestHTTPAgentAdapter:
         adapter = HTTPAgentAdapter(base_url="http://localhost:3000/")
         assert adapter.base_url == "http://localhost:3000"
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_invoke_post_json_response(self, mock_post):
         """测试 POST 请求和 JSON 响应"""
         # Mock 响应
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"output": "test response"}
+        mock_response.content = json.dumps({"output": "test response"}).encode()
         mock_post.return_value = mock_response
 
         adapter = HTTPAgentAdapter("http://localhost:3000")
@@ -81,12 +88,12 @@ class TestHTTPAgentAdapter:
         assert result == "test response"
         mock_post.assert_called_once()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_invoke_with_custom_headers(self, mock_post):
         """测试自定义请求头"""
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"output": "test"}
+        mock_response.content = json.dumps({"output": "test"}).encode()
         mock_post.return_value = mock_response
 
         adapter = HTTPAgentAdapter(
@@ -99,7 +106,7 @@ class TestHTTPAgentAdapter:
         call_kwargs = mock_post.call_args[1]
         assert call_kwargs['headers']['Authorization'] == "Bearer token123"
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_invoke_http_error(self, mock_post):
         """测试 HTTP 错误"""
         mock_post.side_effect = Exception("Connection error")
@@ -109,26 +116,73 @@ class TestHTTPAgentAdapter:
         with pytest.raises(Exception):
             adapter.invoke("test")
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_invoke_different_response_formats(self, mock_post):
         """测试不同的响应格式"""
         adapter = HTTPAgentAdapter("http://localhost:3000")
 
         # 测试 "response" 字段
         mock_response = Mock()
-        mock_response.json.return_value = {"response": "test1"}
+        mock_response.content = json.dumps({"response": "test1"}).encode()
         mock_post.return_value = mock_response
         assert adapter.invoke("test") == "test1"
 
         # 测试 "result" 字段
-        mock_response.json.return_value = {"result": "test2"}
+        mock_response.content = json.dumps({"result": "test2"}).encode()
         assert adapter.invoke("test") == "test2"
 
         # 测试字符串响应
-        mock_response.json.return_value = "test3"
+        mock_response.content = json.dumps("test3").encode()
         assert adapter.invoke("test") == "test3"
 
 
+    @patch('requests.Session.post')
+    def test_session_reused_and_closed(self, mock_post):
+        """测试复用同一个 Session，cleanup 时关闭"""
+        mock_response = Mock()
+        mock_response.content = json.dumps({"output": "ok"}).encode()
+        mock_post.return_value = mock_response
+
+        with HTTPAgentAdapter("http://localhost:3000") as adapter:
+            adapter.invoke("first")
+            session = adapter._get_session()
+            adapter.invoke("second")
+
+            assert adapter._get_session() is session
+            assert adapter._sessions == [session]
+            assert mock_post.call_count == 2
+
+            with patch.object(session, 'close') as mock_close:
+                adapter.cleanup()
+                mock_close.assert_called_once()
+
+        assert adapter._sessions == []
+
+    @patch('requests.Session.post')
+    def test_session_per_thread(self, mock_post):
+        """测试并发调用时每个线程使用各自的 Session，cleanup 时全部关闭"""
+        mock_response = Mock()
+        mock_response.content = json.dumps({"output": "ok"}).encode()
+        mock_post.return_value = mock_response
+
+        adapter = HTTPAgentAdapter("http://localhost:3000")
+        barrier = threading.Barrier(4)
+
+        def worker():
+            barrier.wait()
+            adapter.invoke("hi")
+            return adapter._get_session()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            sessions = list(executor.map(lambda _: worker(), range(4)))
+
+        assert len({id(s) for s in sessions}) == 4
+        assert len(adapter._sessions) == 4
+
+        adapter.cleanup()
+        assert adapter._sessions == []
+
+
 class TestCLIAgentAdapter:
     """测试 CLIAgentAdapter"""
 
@@ -214,6 +268,147 @@ class TestCLIAgentAdapter:
         call_args = mock_run.call_args[0][0]
         assert call_args == ["./agent", "--mode=debug", "test prompt"]
 
+    @patch('subprocess.run')
+    def test_args_template_matches_str_format(self, mock_run):
+        """测试预解析的参数模板与 str.format 结果一致"""
+        mock_result = Mock()
+        mock_result.returncode = 0
+        mock_result.stdout = "output"
+        mock_run.return_value = mock_result
+
+        template = ["--n={n}", "{{literal}}", "x{prompt}y", "{n:>4}", "{prompt!r}", "plain"]
+        adapter = CLIAgentAdapter("./agent", args_template=template)
+        adapter.invoke("p", n=7)
+
+        expected = [arg.format(prompt="p", n=7) for arg in template]
+        assert mock_run.call_args[0][0] == ["./agent"] + expected
+
+    def test_persistent_workers(self):
+        """测试常驻 worker 进程池复用进程"""
+        worker_script = (
+            "import json, os, sys\n"
+            "for line in sys.stdin:\n"
+            "    request = json.loads(line)\n"
+            "    reply = {'output': request['prompt'].upper() + ':' + str(os.getpid())}\n"
+            "    print(json.dumps(reply), flush=True)\n"
+        )
+        adapter = CLIAgentAdapter(
+            command="python",
+            persistent=True,
+            workers=1,
+            worker_args=["-c", worker_script]
+        )
+
+        with adapter:
+            first = adapter.invoke("hello")
+            second = adapter.invoke("world")
+
+            assert first.startswith("HELLO:")
+            assert second.startswith("WORLD:")
+            # 同一个 worker 处理了两次调用
+            assert first.split(":")[1] == second.split(":")[1]
+            assert len(adapter._workers) == 1
+
+        assert adapter._workers == []
+
+    def test_persistent_worker_exit(self):
+        """测试 worker 退出时抛出异常并被移除"""
+        adapter = CLIAgentAdapter(
+            command="python",
+            persistent=True,
+            worker_args=["-c", "pass"]
+        )
+
+        # 取决于退出时机，可能是读到 EOF 或写入时管道已断开
+        with pytest.raises((RuntimeError, BrokenPipeError)):
+            adapter.invoke("test")
+
+        assert adapter._workers == []
+
+    def test_persistent_worker_timeout(self):
+        """测试常驻 worker 无响应时按 timeout 超时并被移除"""
+        adapter = CLIAgentAdapter(
+            command="python",
+            persistent=True,
+            timeout=1,
+            worker_args=["-c", "import sys, time\nsys.stdin.readline()\ntime.sleep(30)\n"]
+        )
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            adapter.invoke("test")
+
+        assert time.monotonic() - start < 3
+        assert adapter._workers == []
+        assert adapter._worker_lines == {}
+
+    _HANGING_WORKER = (
+        "import json, sys, time\n"
+        "for line in sys.stdin:\n"
+        "    request = json.loads(line)\n"
+        "    if request['prompt'] == 'hang':\n"
+        "        time.sleep(30)\n"
+        "    print(json.dumps({'output': request['prompt']}), flush=True)\n"
+    )
+
+    def test_persistent_worker_discard_wakes_waiter(self):
+        """测试忙碌的 worker 超时被移除后，等待中的调用方会启动新 worker"""
+        adapter = CLIAgentAdapter(
+            command="python",
+            persistent=True,
+            workers=1,
+            timeout=3,
+            worker_args=["-c", self._HANGING_WORKER]
+        )
+
+        with adapter, ThreadPoolExecutor(max_workers=1) as executor:
+            hanging = executor.submit(adapter.invoke, "hang")
+            time.sleep(1)
+
+            # 唯一的 worker 正忙，等待它在约 2 秒后超时被移除
+            start = time.monotonic()
+            assert adapter.invoke("next") == "next"
+            assert time.monotonic() - start < 2.8
+
+            with pytest.raises(TimeoutError):
+                hanging.result()
+
+    def test_persistent_cleanup_wakes_waiter(self):
+        """测试 cleanup 时等待空闲 worker 的调用方被唤醒"""
+        adapter = CLIAgentAdapter(
+            command="python",
+            persistent=True,
+            workers=1,
+            timeout=3,
+            worker_args=["-c", self._HANGING_WORKER]
+        )
+
+        with adapter, ThreadPoolExecutor(max_workers=2) as executor:
+            hanging = executor.submit(adapter.invoke, "hang")
+            time.sleep(0.5)
+            waiting = executor.submit(adapter.invoke, "next")
+            time.sleep(0.5)
+
+            start = time.monotonic()
+            adapter.cleanup()
+            assert waiting.result() == "next"
+            assert time.monotonic() - start < 2
+
+            with pytest.raises(RuntimeError):
+                hanging.result()
+
+
+def _mock_stdio_process(output: bytes):
+    """创建 stdout 为真实管道的模拟进程，管道中预先写入 output"""
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, output)
+    os.close(write_fd)
+
+    mock_process = MagicMock()
+    mock_process.poll.return_value = None
+    mock_process.stdout = os.fdopen(read_fd, "rb", buffering=0)
+    return mock_process
+
 
 class TestSTDIOAgentAdapter:
     """测试 STDIOAgentAdapter"""
@@ -234,23 +429,19 @@ class TestSTDIOAgentAdapter:
     @patch('subprocess.Popen')
     def test_invoke_creates_process(self, mock_popen):
         """测试调用时创建进程"""
-        mock_process = MagicMock()
-        mock_process.poll.return_value = None
-        mock_process.stdout.readline.return_value = "test output\n"
-        mock_popen.return_value = mock_process
+        mock_popen.return_value = _mock_stdio_process(b"test output\n")
 
         adapter = STDIOAgentAdapter("test_command")
         result = adapter.invoke("test prompt")
 
         assert result == "test output"
         mock_popen.assert_called_once()
+        adapter.cleanup()
 
     @patch('subprocess.Popen')
     def test_cleanup(self, mock_popen):
         """测试清理进程"""
-        mock_process = MagicMock()
-        mock_process.poll.return_value = None
-        mock_process.stdout.readline.return_value = "output\n"
+        mock_process = _mock_stdio_process(b"output\n")
         mock_popen.return_value = mock_process
 
         adapter = STDIOAgentAdapter("test_command")
@@ -265,9 +456,7 @@ class TestSTDIOAgentAdapter:
     @patch('subprocess.Popen')
     def test_context_manager(self, mock_popen):
         """测试上下文管理器自动清理"""
-        mock_process = MagicMock()
-        mock_process.poll.return_value = None
-        mock_process.stdout.readline.return_value = "output\n"
+        mock_process = _mock_stdio_process(b"output\n")
         mock_popen.return_value = mock_process
 
         with STDIOAgentAdapter("test_command") as adapter:
@@ -276,6 +465,58 @@ class TestSTDIOAgentAdapter:
         # 验证进程被清理
         mock_process.terminate.assert_called_once()
 
+    def test_response_timeout(self):
+        """测试 Agent 无输出时按 response_timeout 超时"""
+        adapter = STDIOAgentAdapter("sleep 10", response_timeout=0.2)
+
+        start = time.time()
+        with pytest.raises(TimeoutError):
+            adapter.invoke("test")
+
+        assert time.time() - start < 5
+        assert adapter.process is None
+
+    @patch('subprocess.Popen')
+    def test_multiline_response_with_end_marker(self, mock_popen):
+        """测试按 end_marker 读取多行响应"""
+        mock_popen.return_value = _mock_stdio_process(
+            "第一行\n第二行\n<END>\nnext\n<END>\n".encode()
+        )
+
+        with STDIOAgentAdapter("test_command", end_marker="<END>\n") as adapter:
+            assert adapter.invoke("test") == "第一行\n第二行"
+            assert adapter.invoke("test") == "next"
+
+    def test_ready_marker(self):
+        """测试等待就绪标记后再发送请求"""
+        script = (
+            "import sys, time\n"
+            "print('loading...', flush=True)\n"
+            "time.sleep(0.2)\n"
+            "print('READY', flush=True)\n"
+            "for line in sys.stdin:\n"
+            "    print(line.strip().upper(), flush=True)\n"
+        )
+        command = f"{shlex.quote(sys.executable)} -c {shlex.quote(script)}"
+
+        with STDIOAgentAdapter(command, ready_marker="READY\n", init_timeout=5) as adapter:
+            assert adapter.invoke("hello") == "HELLO"
+
+    def test_ready_marker_timeout(self):
+        """测试就绪标记超时后清理进程"""
+        adapter = STDIOAgentAdapter("sleep 10", ready_marker="READY\n", init_timeout=0.2)
+
+        with pytest.raises(TimeoutError):
+            adapter.invoke("test")
+
+        assert adapter.process is None
+
+    def test_real_process_roundtrip(self):
+        """测试与真实进程的多次交互"""
+        with STDIOAgentAdapter("cat", response_timeout=5) as adapter:
+            assert adapter.invoke("第一行") == "第一行"
+            assert adapter.invoke("second") == "second"
+
 
 class TestUniversalAgentTester:
     """测试 UniversalAgentTester"""
@@ -357,6 +598,101 @@ class TestUniversalAgentTester:
         assert len(results) == 3
         assert all(r["success"] for r in results)
 
+    def test_batch_tests_concurrent(self):
+        """测试并发批量测试保持顺序且事件写入各自的 trace"""
+        store = TraceStore(storage_path="./test_traces", auto_save=False)
+
+        def invoke(prompt):
+            time.sleep(0.05)
+            return f"{prompt} 完成"
+
+        adapter = Mock(spec=AgentAdapter)
+        adapter.invoke.side_effect = invoke
+
+        tester = UniversalAgentTester(adapter, store)
+        tasks = [{"prompt": f"任务{i}", "assertions": []} for i in range(1, 9)]
+
+        start = time.time()
+        results = tester.test_batch(tasks, agent_name="batch_agent", concurrency=4)
+        elapsed = time.time() - start
+
+        assert [r["output"] for r in results] == [f"任务{i} 完成" for i in range(1, 9)]
+        assert all(r["success"] for r in results)
+        assert elapsed < 0.05 * 8
+
+        for i, result in enumerate(results, 1):
+            trace = store.get_trace(result["trace_id"])
+            assert trace.task_id == f"batch_{i}"
+            assert len(trace.events) == 3
+            assert trace.events[0].data["content"] == f"任务{i}"
+
+    def test_async_writes(self):
+        """测试后台线程写入 trace，flush 后可读取"""
+        store = TraceStore(storage_path="./test_traces", auto_save=False)
+        adapter = Mock(spec=AgentAdapter)
+        adapter.invoke.side_effect = ["结果1", "结果2"]
+
+        tester = UniversalAgentTester(adapter, store, async_writes=True)
+        results = tester.test_batch(
+            [{"prompt": "任务1"}, {"prompt": "任务2"}],
+            agent_name="async_agent"
+        )
+        tester.flush()
+
+        for result in results:
+            trace = store.get_trace(result["trace_id"])
+            assert trace.end_time is not None
+            assert [e.event_type for e in trace.events] == ["prompt", "model_response", "custom"]
+
+    @pytest.mark.parametrize("async_writes", [False, True])
+    def test_store_without_write_events(self, async_writes):
+        """测试只实现 write_event 的 store 仍可使用"""
+        class MinimalStore:
+            def __init__(self):
+                self.events = []
+                self.ended = []
+
+            def start_trace(self, agent_name, task_id=None, metadata=None):
+                return "trace-1"
+
+            def write_event(self, event_data, trace_id=None, event_type=None, metadata=None):
+                self.events.append((trace_id, event_type))
+
+            def end_trace(self, trace_id):
+                self.ended.append(trace_id)
+
+        store = MinimalStore()
+        adapter = Mock(spec=AgentAdapter)
+        adapter.invoke.return_value = "结果"
+
+        with UniversalAgentTester(adapter, store, async_writes=async_writes) as tester:
+            result = tester.test({"prompt": "任务"}, agent_name="minimal_agent")
+
+        assert result["success"] is True
+        assert store.events == [
+            ("trace-1", EventType.PROMPT),
+            ("trace-1", EventType.MODEL_RESPONSE),
+            ("trace-1", EventType.CUSTOM),
+        ]
+        assert store.ended == ["trace-1"]
+
+    def test_close_stops_async_writer(self):
+        """测试退出 with 时写完排队的 trace 并停止后台线程"""
+        store = TraceStore(storage_path="./test_traces", auto_save=False)
+        adapter = Mock(spec=AgentAdapter)
+        adapter.invoke.side_effect = ["结果1", "结果2"]
+
+        with UniversalAgentTester(adapter, store, async_writes=True) as tester:
+            writer_thread = tester._writer._thread
+            first = tester.test({"prompt": "任务1"}, agent_name="async_agent")
+
+        assert not writer_thread.is_alive()
+        assert store.get_trace(first["trace_id"]).end_time is not None
+
+        # 关闭后同步写入
+        second = tester.test({"prompt": "任务2"}, agent_name="async_agent")
+        assert store.get_trace(second["trace_id"]).end_time is not None
+
     def test_generate_report(self):
         """测试生成报告"""
         store = TraceStore(storage_path="./test_traces")
@@ -395,6 +731,120 @@ class TestUniversalAgentTester:
         assert report["total_duration"] == pytest.approx(0.6, 0.01)
 
 
+class TestTesterCache:
+    """测试 TesterCache"""
+
+    def test_get_set(self, tmp_path):
+        """测试写入与读取"""
+        cache = TesterCache(str(tmp_path))
+        key = cache.make_key("agent", "prompt", "CLIAgentAdapter")
+
+        assert cache.get(key) is None
+        assert cache.set(key, "输出") is True
+        assert cache.get(key) == "输出"
+
+        # 键与各字段相关
+        assert key != cache.make_key("agent", "prompt", "HTTPAgentAdapter")
+        assert cache.clear() == 1
+        assert cache.get(key) is None
+
+    def test_ttl_expiry(self, tmp_path):
+        """测试过期条目不会命中"""
+        cache = TesterCache(str(tmp_path), ttl_seconds=60)
+        key = cache.make_key("agent", "prompt", "Mock")
+        cache.set(key, "output")
+
+        path = tmp_path / f"{key}.json"
+        old = path.stat().st_mtime - 120
+        os.utime(path, (old, old))
+
+        assert cache.get(key) is None
+
+    def test_tool_calls_not_cached(self, tmp_path):
+        """测试包含工具调用的输出不缓存"""
+        cache = TesterCache(str(tmp_path))
+        key = cache.make_key("agent", "prompt", "Mock")
+
+        assert cache.set(key, '{"tool_calls": [{"name": "search"}]}') is False
+        assert cache.get(key) is None
+
+    def test_tester_cache_hit(self, tmp_path):
+        """测试命中缓存时跳过 adapter 调用"""
+        store = TraceStore(storage_path="./test_traces")
+        adapter = Mock(spec=AgentAdapter)
+        adapter.invoke.return_value = "计算结果是 13"
+
+        tester = UniversalAgentTester(adapter, store, cache=TesterCache(str(tmp_path)))
+        task = {
+            "prompt": "计算 6 + 7",
+            "assertions": [{"type": "contains", "expected": "13"}]
+        }
+
+        first = tester.test(task, agent_name="cached_agent")
+        second = tester.test(task, agent_name="cached_agent")
+
+        assert first["output"] == second["output"] == "计算结果是 13"
+        assert second["passed"] == 1
+        adapter.invoke.assert_called_once_with("计算 6 + 7")
+
+        events = store.get_trace(second["trace_id"]).events
+        response = [e for e in events if e.event_type == "model_response"][0]
+        assert response.data["cache"] == "HIT"
+
+        # 跳过缓存时重新调用
+        tester.test(task, agent_name="cached_agent", cache_bypass=True)
+        assert adapter.invoke.call_count == 2
+
+
+def _char_embedding(text):
+    """按字符计数的简易 embedding"""
+    vector = [0.0] * 64
+    for ch in text.lower():
+        if not ch.isspace():
+            vector[ord(ch) % 64] += 1.0
+    return vector
+
+
+class TestSemanticCache:
+    """测试 SemanticCache"""
+
+    def test_lookup_similar_prompt(self):
+        """测试相似提示命中、不相关提示未命中"""
+        pytest.importorskip("numpy")
+        cache = SemanticCache(_char_embedding, threshold=0.9, initial_capacity=1)
+
+        cache.add(cache.embed("compute 1 + 1"), "2")
+        cache.add(cache.embed("list all files"), "a.txt b.txt")
+
+        assert len(cache) == 2
+        assert cache.lookup(cache.embed("Compute 1+1")) == "2"
+        assert cache.lookup(cache.embed("zzz")) is None
+
+        cache.clear()
+        assert cache.lookup(cache.embed("compute 1 + 1")) is None
+
+    def test_tester_semantic_hit(self):
+        """测试语义命中时跳过 adapter 调用"""
+        pytest.importorskip("numpy")
+        store = TraceStore(storage_path="./test_traces")
+        adapter = Mock(spec=AgentAdapter)
+        adapter.invoke.return_value = "2"
+
+        tester = UniversalAgentTester(
+            adapter, store, semantic_cache=SemanticCache(_char_embedding, threshold=0.9)
+        )
+
+        tester.test({"prompt": "compute 1 + 1"}, agent_name="semantic_agent")
+        result = tester.test({"prompt": "Compute 1+1"}, agent_name="semantic_agent")
+
+        assert result["output"] == "2"
+        adapter.invoke.assert_called_once_with("compute 1 + 1")
+
+        events = store.get_trace(result["trace_id"]).events
+        response = [e for e in events if e.event_type == "model_response"][0]
+        assert response.data["cache"] == "SEMANTIC-HIT"
+
+
 class TestIntegration:
     """集成测试"""
 
@@ -0,0 +1,48 @@
+"""
+Tests for AgentRegistry
+"""
+
+import pytest
+
+from tigerhill.agent.registry import AgentRegistry
+
+
+class _BetaAgent:
+    name = "beta"
+
+
+class _AlphaAgent:
+    name = "alpha"
+
+
+def test_register_and_lookup():
+    """Registered agents are found by name and listed in sorted order"""
+    registry = AgentRegistry()
+    registry.register(_BetaAgent)
+    registry.register(_AlphaAgent)
+
+    assert registry.get_agent("beta") is _BetaAgent
+    assert "alpha" in registry
+    assert "gamma" not in registry
+    assert registry.list_agents() == ["alpha", "beta"]
+
+    with pytest.raises(ValueError, match="not found"):
+        registry.get_agent("gamma")
+
+
+def test_freeze():
+    """A frozen registry keeps serving lookups but rejects registration"""
+    registry = AgentRegistry()
+    registry.register(_BetaAgent)
+    registry.freeze()
+
+    assert registry.frozen
+    assert registry.get_agent("beta") is _BetaAgent
+    assert registry.list_agents() == ["beta"]
+
+    names = registry.list_agents()
+    names.append("gamma")
+    assert registry.list_agents() == ["beta"]
+
+    with pytest.raises(RuntimeError, match="frozen"):
+        registry.register(_AlphaAgent)
@@ -0,0 +1,442 @@
+"""
+AgentBayClient / AsyncAgentBayClient 测试
+
+使用伪造的 agentbay SDK 模块，不需要真实的 API Key 或网络。
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from tigerhill.agentbay.client import (
+    PREV_RESULT,
+    AgentBayClient,
+    AsyncAgentBayClient,
+    ToolCall,
+    _agentbay_cls,
+)
+
+
+class _FakeCommand:
+    def __init__(self, sdk):
+        self._sdk = sdk
+
+    def execute_command(self, command):
+        sdk = self._sdk
+        with sdk.lock:
+            sdk.active += 1
+            sdk.max_active = max(sdk.max_active, sdk.active)
+        time.sleep(sdk.delay)
+        with sdk.lock:
+            sdk.active -= 1
+        sdk.commands.append(command)
+        return SimpleNamespace(output=f"ran: {command}", exit_code=0, error=None)
+
+
+class _FakeAgentBay:
+    # 每次 SDK 调用的模拟往返延迟（秒）
+    delay = 0.0
+
+    def __init__(self):
+        self.created = 0
+        self.deleted = []
+        self.commands = []
+        # 同时执行中的命令数及其峰值
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def create(self):
+        time.sleep(self.delay)
+        self.created += 1
+        return SimpleNamespace(session=SimpleNamespace(command=_FakeCommand(self)))
+
+    def delete(self, session):
+        time.sleep(self.delay)
+        self.deleted.append(session)
+
+
+@pytest.fixture
+def fake_sdk(monkeypatch):
+    """安装伪造的 agentbay 模块"""
+    module = types.ModuleType("agentbay")
+    module.AgentBay = _FakeAgentBay
+    monkeypatch.setitem(sys.modules, "agentbay", module)
+    monkeypatch.setenv("AGENTBAY_API_KEY", "test-key")
+    monkeypatch.setattr(_FakeAgentBay, "delay", 0.0)
+    _agentbay_cls.cache_clear()
+    yield _FakeAgentBay
+    _agentbay_cls.cache_clear()
+
+
+class TestAgentBayClient:
+    """同步客户端测试"""
+
+    def test_missing_sdk(self, monkeypatch):
+        """测试未安装 SDK 时给出安装提示"""
+        monkeypatch.setitem(sys.modules, "agentbay", None)
+        monkeypatch.setenv("AGENTBAY_API_KEY", "test-key")
+        _agentbay_cls.cache_clear()
+
+        with pytest.raises(ImportError, match="wuying-agentbay-sdk"):
+            AgentBayClient()
+
+    def test_session_lifecycle(self, fake_sdk):
+        """测试会话创建、执行命令与删除"""
+        client = AgentBayClient()
+        before = time.time()
+        session = client.create_session()
+        session_id = session["session_id"]
+
+        assert before <= session["created_at"] <= time.time()
+        assert client.get_session_status(session_id)["age_seconds"] >= 0
+
+        result = client.execute_command(session_id, "echo hi")
+        assert result == {"output": "ran: echo hi", "exit_code": 0, "error": None}
+
+        assert client.delete_session(session_id) is True
+        assert client.get_session_status(session_id)["error"] == "Session not found"
+
+    def test_tool_cache(self, fake_sdk):
+        """测试幂等工具的结果缓存：相同参数复用，非幂等工具不缓存"""
+        client = AgentBayClient(tool_cache_size=2)
+
+        first = client.execute_tool("file_read", {"path": "/a"})
+        first["result"] = "modified by caller"
+        assert client.execute_tool("file_read", {"path": "/a"})["result"] != "modified by caller"
+        assert client._sdk.created == 1
+
+        client.execute_tool("bash", {"command": "ls"})
+        client.execute_tool("bash", {"command": "ls"})
+        assert client._sdk.created == 3
+
+        client.cache_clear()
+        client.execute_tool("file_read", {"path": "/a"})
+        assert client._sdk.created == 4
+
+    def test_tool_cache_invalidated_by_mutations(self, fake_sdk):
+        """测试写操作、命令和删除会话使该会话的缓存失效"""
+        client = AgentBayClient(tool_cache_size=8)
+        session_id = client.create_session()["session_id"]
+        other_id = client.create_session()["session_id"]
+        client.execute_tool("file_read", {"path": "/b"}, other_id)
+
+        def cached():
+            return sum(1 for key in client._tool_cache if key[0] == session_id)
+
+        client.execute_tool("file_read", {"path": "/a"}, session_id)
+        assert cached() == 1
+        client.execute_tool("file_write", {"path": "/a"}, session_id)
+        assert cached() == 0
+
+        client.execute_tool("file_read", {"path": "/a"}, session_id)
+        client.execute_tool("shell", {"command": "rm /a"}, session_id)
+        assert cached() == 0
+
+        client.execute_tool("file_read", {"path": "/a"}, session_id)
+        client.execute_command(session_id, "touch /a")
+        assert cached() == 0
+
+        client.execute_tool("file_read", {"path": "/a"}, session_id)
+        client.delete_session(session_id)
+        assert cached() == 0
+
+        assert len(client._tool_cache) == 1
+
+    def test_command_result_fallbacks(self, fake_sdk):
+        """测试 SDK 结果缺少字段时的默认值"""
+        client = AgentBayClient()
+        session_id = client.create_session()["session_id"]
+        session = client._sessions[session_id].session
+        session.command.execute_command = lambda command: "plain text"
+
+        assert client.execute_command(session_id, "x") == {
+            "output": "plain text", "exit_code": 0, "error": None
+        }
+
+    def test_load_tools(self, fake_sdk):
+        """测试加载标准工具集"""
+        client = AgentBayClient()
+
+        assert [t["name"] for t in client.load_tools("command")] == ["execute_command"]
+        assert len(client.load_tools("unknown")) == 0
+
+    def test_request_environment(self, fake_sdk):
+        """测试环境类型名称不区分大小写，未知类型使用默认环境"""
+        client = AgentBayClient()
+
+        assert client.request_environment("Browser")["env_type"] == "browser"
+        assert client.request_environment("spaceship")["env_type"] == "default"
+
+    def test_session_ids_are_unique(self, fake_sdk):
+        """测试会话 ID 不会因对象地址复用而重复"""
+        client = AgentBayClient()
+        seen = set()
+        for _ in range(20):
+            session_id = client.create_session()["session_id"]
+            assert session_id not in seen
+            seen.add(session_id)
+            client.delete_session(session_id)
+
+    def test_execute_command_timeout(self, fake_sdk):
+        """测试命令超时后会话被标记并删除"""
+        client = AgentBayClient()
+        session_id = client.create_session()["session_id"]
+        fake_sdk.delay = 0.5
+
+        with pytest.raises(RuntimeError, match="timed out"):
+            client.execute_command(session_id, "sleep", timeout=0.05)
+
+        assert session_id not in client._sessions
+        assert len(client._sdk.deleted) == 1
+
+    def test_execute_commands(self, fake_sdk):
+        """测试批量执行命令按顺序返回结果"""
+        client = AgentBayClient()
+        session_id = client.create_session()["session_id"]
+
+        results = client.execute_commands(session_id, ["a", "b", "c"])
+
+        assert [r["output"] for r in results] == ["ran: a", "ran: b", "ran: c"]
+
+    def test_cleanup_all_sessions_parallel(self, fake_sdk):
+        """测试同步清理并行删除会话"""
+        client = AgentBayClient()
+        for _ in range(4):
+            client.create_session()
+        fake_sdk.delay = 0.2
+
+        start = time.monotonic()
+        with client:
+            pass
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.6
+        assert len(client._sdk.deleted) == 4
+        assert not client._sessions
+
+    def test_execute_tool_temporary_session(self, fake_sdk):
+        """测试未指定会话时使用临时会话"""
+        client = AgentBayClient()
+        result = client.execute_tool("bash", {"command": "ls"})
+
+        assert result == {"tool_name": "bash", "result": "ran: ls"}
+        assert client._sdk.created == 1
+        assert len(client._sdk.deleted) == 1
+
+
+class TestAsyncAgentBayClient:
+    """异步客户端测试"""
+
+    def test_concurrent_sessions(self, fake_sdk):
+        """测试并发创建与清理会话的耗时接近单次往返"""
+        fake_sdk.delay = 0.2
+
+        async def run():
+            async with AsyncAgentBayClient() as client:
+                start = time.monotonic()
+                sessions = await asyncio.gather(
+                    *(client.create_session() for _ in range(4))
+                )
+                elapsed = time.monotonic() - start
+                results = await asyncio.gather(
+                    *(client.execute_command(s["session_id"], "pwd") for s in sessions)
+                )
+                cleaned = await client.cleanup_all_sessions()
+            return client, elapsed, results, cleaned
+
+        client, elapsed, results, cleaned = asyncio.run(run())
+
+        assert elapsed < 0.6
+        assert [r["output"] for r in results] == ["ran: pwd"] * 4
+        assert cleaned == 4
+        assert len(client._client._sdk.deleted) == 4
+
+    def test_execute_commands(self, fake_sdk):
+        """测试批量命令并发执行且结果保持输入顺序"""
+        fake_sdk.delay = 0.2
+
+        async def run():
+            client = AsyncAgentBayClient()
+            session_id = (await client.create_session())["session_id"]
+            start = time.monotonic()
+            results = await client.execute_commands(session_id, ["a", "b", "c", "d"])
+            return results, time.monotonic() - start
+
+        results, elapsed = asyncio.run(run())
+
+        assert [r["output"] for r in results] == ["ran: a", "ran: b", "ran: c", "ran: d"]
+        assert elapsed < 0.6
+
+    def test_execute_command_timeout(self, fake_sdk):
+        """测试异步命令超时后会话被删除"""
+        async def run():
+            client = AsyncAgentBayClient()
+            session_id = (await client.create_session())["session_id"]
+            fake_sdk.delay = 0.3
+            start = time.monotonic()
+            with pytest.raises(RuntimeError, match="timed out"):
+                await client.execute_command(session_id, "sleep", timeout=0.05)
+            elapsed = time.monotonic() - start
+            # 删除在后台进行，调用方无需等待
+            assert client.get_session_status(session_id)["status"] == "error"
+            await client.cleanup_all_sessions()
+            return client, session_id, elapsed
+
+        client, session_id, elapsed = asyncio.run(run())
+
+        assert elapsed < 0.3
+        assert client.get_session_status(session_id)["error"] == "Session not found"
+        assert len(client._client._sdk.deleted) == 1
+
+    def test_timeout_excludes_queue_wait(self, fake_sdk):
+        """测试等待并发槽位的时间不计入命令超时"""
+        async def run():
+            client = AsyncAgentBayClient(max_inflight=1)
+            first = (await client.create_session())["session_id"]
+            second = (await client.create_session())["session_id"]
+            fake_sdk.delay = 0.2
+            # second 排在 first 之后，总耗时约 0.4s，但自身执行只需 0.2s
+            results = await asyncio.gather(
+                client.execute_command(first, "a"),
+                client.execute_command(second, "b", timeout=0.3)
+            )
+            return client, second, results
+
+        client, second, results = asyncio.run(run())
+
+        assert [r["output"] for r in results] == ["ran: a", "ran: b"]
+        assert client.get_session_status(second)["status"] == "active"
+
+    def test_timeout_keeps_slot_until_call_finishes(self, fake_sdk):
+        """测试超时后并发槽位在工作线程结束前不会释放"""
+        async def run():
+            client = AsyncAgentBayClient(max_inflight=1)
+            first = (await client.create_session())["session_id"]
+            second = (await client.create_session())["session_id"]
+            fake_sdk.delay = 0.2
+            with pytest.raises(RuntimeError, match="timed out"):
+                await client.execute_command(first, "slow", timeout=0.05)
+            result = await client.execute_command(second, "next")
+            await client.cleanup_all_sessions()
+            return client, result
+
+        client, result = asyncio.run(run())
+
+        assert result["output"] == "ran: next"
+        assert client._client._sdk.max_active == 1
+
+    def test_wraps_existing_client(self, fake_sdk):
+        """测试包装已有的同步客户端时共享 SDK 实例与会话"""
+        sync_client = AgentBayClient()
+        session_id = sync_client.create_session()["session_id"]
+
+        async def run():
+            async with AsyncAgentBayClient(client=sync_client) as client:
+                assert client._client._sdk is sync_client._sdk
+                own_id = (await client.create_session())["session_id"]
+                await client.execute_tool("bash", {"command": "ls"})
+                result = await client.execute_command(session_id, "pwd")
+            return own_id, result
+
+        own_id, result = asyncio.run(run())
+        assert result["output"] == "ran: pwd"
+        # 退出时只清理本包装器创建的会话（含池中会话），同步代码的会话保留
+        assert list(sync_client._sessions) == [session_id]
+        assert own_id not in sync_client._sessions
+
+    def test_max_inflight(self, fake_sdk):
+        """测试并发 SDK 调用数受 max_inflight 限制"""
+        fake_sdk.delay = 0.1
+
+        async def run():
+            client = AsyncAgentBayClient(max_inflight=2)
+            start = time.monotonic()
+            await asyncio.gather(*(client.create_session() for _ in range(4)))
+            return time.monotonic() - start
+
+        # 4 个调用、每次最多 2 个并发：至少两轮往返
+        assert asyncio.run(run()) >= 0.2
+
+    def test_set_concurrency_rejects_zero(self, fake_sdk):
+        """测试并发上限必须至少为 1"""
+        client = AsyncAgentBayClient()
+
+        with pytest.raises(ValueError):
+            client.set_concurrency(0)
+
+    def test_execute_tool(self, fake_sdk):
+        """测试异步执行工具"""
+        async def run():
+            client = AsyncAgentBayClient()
+            return client, await client.execute_tool("shell", {"cmd": "whoami"})
+
+        client, result = asyncio.run(run())
+
+        assert result == {"tool_name": "shell", "result": "ran: whoami"}
+        assert client._client._sdk.created == 1
+
+    def test_session_pool_reuse(self, fake_sdk):
+        """测试未指定会话的工具调用复用池中的会话"""
+        async def run():
+            async with AsyncAgentBayClient() as client:
+                for i in range(3):
+                    await client.execute_tool("bash", {"command": str(i)})
+                created = client._client._sdk.created
+            return client, created
+
+        client, created = asyncio.run(run())
+
+        assert created == 1
+        # 退出时清理池中的会话
+        assert len(client._client._sdk.deleted) == 1
+
+    def test_session_pool_ttl(self, fake_sdk):
+        """测试空闲超过 pool_ttl 的会话被后台任务删除"""
+        async def run():
+            client = AsyncAgentBayClient(pool_ttl=0.1)
+            await client.execute_tool("bash", {"command": "ls"})
+            await asyncio.sleep(0.3)
+            return client
+
+        client = asyncio.run(run())
+
+        assert len(client._client._sdk.deleted) == 1
+        assert not client._client._sessions
+
+    def test_execute_tool_batch(self, fake_sdk):
+        """测试依赖批量执行：按层并发，失败调用的依赖项被标记为无效"""
+        fake_sdk.delay = 0.1
+        calls = [
+            ToolCall("bash", {"command": "first"}),
+            ToolCall("bash", {"command": "second"}),
+            ToolCall("bash", {"command": PREV_RESULT}, input_from=0),
+            ToolCall("unknown_tool", {}),
+            ToolCall("bash", {"command": PREV_RESULT}, input_from=3),
+        ]
+
+        async def run():
+            client = AsyncAgentBayClient()
+            session_id = (await client.create_session())["session_id"]
+            return await client.execute_tool_batch(calls, session_id=session_id)
+
+        results = asyncio.run(run())
+
+        assert results[0]["result"] == "ran: first"
+        assert results[1]["result"] == "ran: second"
+        assert results[2]["result"] == "ran: ran: first"
+        assert "Unsupported tool" in results[3]["error"]
+        assert results[4]["error"].startswith("INVALID_ARGUMENT")
+
+    def test_execute_tool_batch_rejects_forward_reference(self, fake_sdk):
+        """测试 input_from 引用后续调用时报错"""
+        client = AsyncAgentBayClient()
+        calls = [ToolCall("bash", {"command": PREV_RESULT}, input_from=1), ToolCall("bash", {"command": "x"})]
+
+        with pytest.raises(ValueError):
+            asyncio.run(client.execute_tool_batch(calls))
@@ -0,0 +1,106 @@
+"""
+测试ArrowTraceStore列式事件存储
+"""
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from tigerhill.storage.arrow_trace_store import ArrowTraceStore
+from tigerhill.storage.trace_store import TraceEvent, EventType
+
+
+def _make_events(trace_id="trace-001"):
+    return [
+        TraceEvent(
+            event_id="e1",
+            trace_id=trace_id,
+            event_type=EventType.PROMPT,
+            timestamp=1234567890.0,
+            data={"prompt": "hi", "total_tokens": 50, "cost_usd": 0.001}
+        ),
+        TraceEvent(
+            event_id="e2",
+            trace_id=trace_id,
+            event_type=EventType.MODEL_RESPONSE,
+            timestamp=1234567891.0,
+            data={"response": "hello", "total_tokens": 100, "cost_usd": 0.002},
+            metadata={"model": "gpt-4"}
+        ),
+        TraceEvent(
+            event_id="e3",
+            trace_id=trace_id,
+            event_type=EventType.TOOL_CALL,
+            timestamp=1234567892.0,
+            data={"tool": "calculator", "total_tokens": 999}
+        ),
+    ]
+
+
+def test_get_stats():
+    """测试列式聚合统计"""
+    store = ArrowTraceStore()
+    assert store.append_events(_make_events()) == 3
+    store.append_events(_make_events("trace-002")[:1])
+
+    stats = store.get_stats("trace-001")
+
+    assert stats['total_events'] == 3
+    assert stats['llm_calls_count'] == 2
+    assert stats['total_tokens'] == 150  # 非LLM事件不计入
+    assert stats['total_cost_usd'] == pytest.approx(0.003)
+    assert stats['event_counts'] == {"prompt": 1, "model_response": 1, "tool_call": 1}
+    assert stats['duration_seconds'] == 2.0
+
+    assert store.get_stats()['total_events'] == 4
+
+
+def test_iter_events_round_trip():
+    """测试从列重建TraceEvent"""
+    store = ArrowTraceStore()
+    original = _make_events()
+    store.append_events(original)
+
+    restored = list(store.iter_events("trace-001"))
+
+    assert restored == original
+
+
+def test_timestamps_stored_as_microseconds():
+    """测试时间戳以整数微秒存储"""
+    store = ArrowTraceStore()
+    event = _make_events()[0]
+    event.timestamp = 1234567890.123456
+    store.append_events([event])
+
+    table = store.to_table()
+    assert table['timestamp'].type == pa.timestamp('us')
+    assert table['timestamp'].cast(pa.int64()).to_pylist() == [1234567890123456]
+    assert next(store.iter_events()).timestamp == pytest.approx(1234567890.123456, abs=1e-6)
+
+
+def test_save_and_load(tmp_path):
+    """测试IPC文件持久化，并延续sequence_number"""
+    path = tmp_path / "events.arrow"
+    store = ArrowTraceStore(str(path))
+    store.append_events(_make_events())
+    store.save()
+
+    reloaded = ArrowTraceStore(str(path))
+    reloaded.append_events(_make_events()[:1])
+
+    table = reloaded.to_table("trace-001")
+    assert table['sequence_number'].to_pylist() == [0, 1, 2, 3]
+    assert reloaded.get_stats()['total_tokens'] == 200
+
+
+def test_empty_store():
+    """测试空存储"""
+    store = ArrowTraceStore()
+
+    assert store.append_events([]) == 0
+    stats = store.get_stats()
+    assert stats['total_events'] == 0
+    assert stats['total_tokens'] == 0
+    assert stats['duration_seconds'] is None
+    assert list(store.iter_events()) == []
@@ -0,0 +1,43 @@
+"""
+测试 AsyncTraceWriter
+"""
+
+import threading
+
+from tigerhill.storage import AsyncTraceWriter, EventType, TraceStore
+
+
+def test_submit_and_join(tmp_path):
+    """测试提交的事件按顺序写入并结束 trace"""
+    store = TraceStore(storage_path=str(tmp_path))
+    writer = AsyncTraceWriter(store, lock=threading.Lock())
+
+    trace_id = store.start_trace(agent_name="writer-agent")
+    writer.submit(trace_id, [
+        ({"type": "prompt", "content": "hi"}, EventType.PROMPT, 1.0),
+        ({"type": "model_response", "text": "hello"}, EventType.MODEL_RESPONSE, 2.0),
+    ])
+    writer.join()
+
+    trace = store.get_trace(trace_id)
+    assert [e.timestamp for e in trace.events] == [1.0, 2.0]
+    assert trace.end_time is not None
+    assert list(tmp_path.glob(f"trace_{trace_id}_*.json"))
+
+    writer.close()
+
+
+def test_failed_write_does_not_stop_writer(tmp_path):
+    """测试单个 trace 写入失败不影响后续 trace"""
+    store = TraceStore(storage_path=str(tmp_path), auto_save=False)
+    writer = AsyncTraceWriter(store)
+
+    writer.submit("missing-trace", [({"type": "custom"}, None, None)])
+
+    trace_id = store.start_trace(agent_name="writer-agent")
+    writer.submit(trace_id, [({"type": "custom"}, None, None)], end_trace=False)
+    writer.close()
+
+    trace = store.get_trace(trace_id)
+    assert len(trace.events) == 1
+    assert trace.end_time is None
@@ -415,3 +415,22 @@ def test_unique_constraint(temp_db):
     # 尝试插入相同trace_id应该抛出异常
     with pytest.raises(sqlite3.IntegrityError):
         temp_db.insert('traces', data)
+
+
+def test_fetch_rows(temp_db):
+    """测试查询返回行对象"""
+    temp_db.insert('traces', {
+        'trace_id': 'test-trace-rows-001',
+        'agent_name': 'rows-agent',
+        'start_time': 1234567890.0,
+        'status': 'running'
+    })
+
+    rows = temp_db.fetch_rows(
+        "SELECT trace_id, agent_name FROM traces WHERE agent_name = ?", ('rows-agent',)
+    )
+
+    assert len(rows) == 1
+    trace_id, agent_name = rows[0]
+    assert trace_id == 'test-trace-rows-001'
+    assert rows[0]['agent_name'] == agent_name == 'rows-agent'
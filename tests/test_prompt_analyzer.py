@@ -6,6 +6,8 @@ import pytest
 from tigerhill.analyzer.prompt_analyzer import PromptAnalyzer
 from tigerhill.analyzer.diff_engine import DiffEngine
 from tigerhill.analyzer.models import (
+    IntentType,
+    IntentUnit,
     PromptComponentType,
     PromptComponent,
     PromptStructure
@@ -270,6 +272,116 @@ class TestDiffEngine:
         assert diff.to_turn == 2
         assert diff.total_changes > 0
 
+    def test_compute_diff_added_and_removed(self):
+        """Test that components are matched by type and content"""
+        engine = DiffEngine()
+
+        def structure(turn, *components):
+            return PromptStructure(
+                turn_index=turn,
+                total_tokens=sum(c.tokens for c in components),
+                components=list(components)
+            )
+
+        system = PromptComponent(type=PromptComponentType.SYSTEM, content="Be helpful", tokens=3)
+        old_input = PromptComponent(type=PromptComponentType.NEW_USER_INPUT, content="Hi", tokens=1)
+        history = PromptComponent(type=PromptComponentType.HISTORY, content="Hi", tokens=1)
+        new_input = PromptComponent(type=PromptComponentType.NEW_USER_INPUT, content="Bye", tokens=2)
+
+        diff = engine.compute_diff(
+            structure(1, system, old_input),
+            structure(2, system, history, new_input)
+        )
+
+        assert diff.added_components == [history, new_input]
+        assert diff.removed_components == [old_input]
+        assert diff.added_tokens == 3
+        assert diff.removed_tokens == 1
+
+    def test_intent_units_diff(self):
+        """Test added, removed and modified intent unit detection"""
+        engine = DiffEngine()
+
+        def unit(intent_type, keywords, confidence=0.8, tokens=5):
+            return IntentUnit(
+                intent_type=intent_type,
+                content="x",
+                confidence=confidence,
+                tokens=tokens,
+                keywords=keywords,
+                context_dependencies=[],
+                metadata={}
+            )
+
+        from_units = [
+            unit(IntentType.INFORMATION_SEEKING, ["what", "why"]),
+            unit(IntentType.CLARIFICATION, ["mean"]),
+            unit(IntentType.VALIDATION, ["check"]),
+        ]
+        to_units = [
+            unit(IntentType.INFORMATION_SEEKING, ["why", "what"]),
+            unit(IntentType.CLARIFICATION, ["mean", "exactly"]),
+            unit(IntentType.TASK_EXECUTION, ["run"]),
+        ]
+
+        result = engine._analyze_intent_units_diff(from_units, to_units)
+
+        assert result["added_intents"] == [IntentType.TASK_EXECUTION]
+        assert result["removed_intents"] == [IntentType.VALIDATION]
+        assert result["total_modified"] == 1
+        modified = result["modified_intents"][0]
+        assert modified["intent_type"] == "clarification"
+        assert modified["keywords_added"] == ["exactly"]
+        assert modified["keywords_removed"] == []
+
+        summary = engine._analyze_intent_units_diff(from_units, to_units, "summary")
+        assert summary["total_added"] == 1
+        assert summary["total_removed"] == 1
+        assert summary["total_modified"] == 1
+        assert summary["modified_intents"] == []
+
+        unchanged = engine._analyze_intent_units_diff(from_units, list(from_units))
+        assert unchanged["total_added"] == 0
+        assert unchanged["total_removed"] == 0
+        assert unchanged["modified_intents"] == []
+
+    def test_extract_intent_changes(self):
+        """Test keyword-level intent change detection across indicator types"""
+        engine = DiffEngine()
+
+        changes = engine._extract_intent_changes(
+            "there is a problem with the build",
+            "what is the solution and how do we fix it"
+        )
+
+        assert changes["problem_words"]["removed"] == ["problem"]
+        assert sorted(changes["question_words"]["added"]) == ["how", "what"]
+        assert sorted(changes["solution_words"]["added"]) == ["fix", "solution"]
+        assert changes["primary_changes"]["primary_change_type"] == "solution_words"
+        assert changes["coherence_analysis"]["coherence_score"] == 2
+        predicted = [p["predicted_intent"] for p in changes["predicted_transitions"]]
+        assert predicted == ["solution_words", "confirmation_words"]
+
+    def test_invalid_detail_level(self):
+        """Test that an unknown detail level is rejected"""
+        engine = DiffEngine()
+        structure = PromptStructure(turn_index=0, components=[], total_tokens=0)
+
+        with pytest.raises(ValueError):
+            engine.compute_diff(structure, structure, detail_level="verbose")
+
+    def test_calculate_variance(self):
+        """Test population variance for short and long value lists"""
+        engine = DiffEngine()
+
+        assert engine._calculate_variance([]) == 0
+        assert engine._calculate_variance([1.0, 2.0, 3.0, 4.0]) == pytest.approx(1.25)
+
+        values = [(i % 7) * 0.1 for i in range(1000)]
+        mean = sum(values) / len(values)
+        expected = sum((x - mean) ** 2 for x in values) / len(values)
+        assert engine._calculate_variance(values) == pytest.approx(expected)
+
     def test_compute_all_diffs(self):
         """Test computing all diffs for a session"""
         engine = DiffEngine()
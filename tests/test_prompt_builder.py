@@ -0,0 +1,79 @@
+"""
+Tests for PromptBuilder
+"""
+
+from tigerhill.agent.prompt_builder import CACHE_CONTROL_EPHEMERAL, PromptBuilder
+
+
+def test_build_without_tools():
+    """System prompt is a cacheable prefix; user input is not cached"""
+    messages = PromptBuilder("You are a helpful assistant.").build("hi")
+
+    assert [m.role for m in messages] == ["system", "user"]
+    assert messages[0].content == "You are a helpful assistant."
+    assert messages[0].cache_control == CACHE_CONTROL_EPHEMERAL
+    assert messages[1].content == "hi"
+    assert messages[1].cache_control is None
+
+
+def test_build_with_tools():
+    """Tool list goes into its own cacheable system message"""
+    messages = PromptBuilder("sys").build("hi", [{"name": "search"}, {}])
+
+    assert [m.role for m in messages] == ["system", "system", "user"]
+    assert messages[1].content == "Tools available:\n- search\n- tool"
+    assert messages[1].cache_control == CACHE_CONTROL_EPHEMERAL
+
+
+def test_cacheable_prefix_is_stable():
+    """Repeated builds produce an identical cacheable prefix"""
+    builder = PromptBuilder("sys")
+    tools = [{"name": "a"}, {"name": "b"}]
+
+    first = builder.build("one", tools)
+    second = builder.build("two", tools)
+
+    assert [m.model_dump() for m in first[:-1]] == [m.model_dump() for m in second[:-1]]
+    assert "cache_control" not in first[-1].model_dump(exclude_none=True)
+
+
+def test_tool_order_does_not_change_prefix():
+    """Tool names are sorted, so load order does not affect the prompt"""
+    builder = PromptBuilder("sys")
+
+    first = builder.build("hi", [{"name": "write"}, {"name": "read"}])
+    second = builder.build("hi", [{"name": "read"}, {"name": "write"}])
+
+    assert first[1].content == "Tools available:\n- read\n- write"
+    assert second[1].content == first[1].content
+
+
+def test_prefix_text_is_reused():
+    """Builds with the same tools reuse the prefix text, not the Message objects"""
+    builder = PromptBuilder("sys")
+
+    first = builder.build("one", [{"name": "a"}])
+    first[0].cache_control["type"] = "modified"
+    first[1].content = "modified"
+    second = builder.build("two", [{"name": "a"}])
+    third = builder.build("three", [{"name": "b"}])
+
+    assert second[0] is not first[0]
+    assert second[0].cache_control == CACHE_CONTROL_EPHEMERAL
+    assert second[1].content == "Tools available:\n- a"
+    assert third[1].content == "Tools available:\n- b"
+    assert CACHE_CONTROL_EPHEMERAL == {"type": "ephemeral"}
+
+    builder.system_prompt = "changed"
+    assert builder.build("four")[0].content == "changed"
+
+
+def test_blank_system_prompt_is_skipped():
+    """A blank system prompt does not produce an empty system message"""
+    builder = PromptBuilder("  ")
+
+    assert [m.role for m in builder.build("hi")] == ["user"]
+
+    messages = builder.build("hi", [{"name": "search"}])
+    assert [m.role for m in messages] == ["system", "user"]
+    assert messages[0].content == "Tools available:\n- search"
@@ -3,6 +3,7 @@
 """
 
 import pytest
+import sqlite3
 import tempfile
 import time
 from pathlib import Path
@@ -449,3 +450,88 @@ def test_concurrent_traces(temp_store):
         assert trace is not None
         assert len(trace.events) == 1
         assert trace.events[0].data['index'] == i
+
+
+def test_enqueue_event_batches_inserts(temp_store):
+    """测试enqueue_event批量写入事件"""
+    temp_store.event_batch_size = 3
+    trace_id = temp_store.start_trace(agent_name="test-agent")
+
+    for i in range(4):
+        temp_store.enqueue_event({"type": "custom", "index": i})
+
+    # 前3个事件已按批次写入，第4个仍在缓冲区
+    rows = temp_store.db.fetch_all(
+        "SELECT sequence_number FROM events WHERE trace_id = ? ORDER BY sequence_number",
+        (trace_id,)
+    )
+    assert [r['sequence_number'] for r in rows] == [0, 1, 2]
+    assert len(temp_store._pending_events) == 1
+
+    # write_event会先写入缓冲区中的事件，保持顺序
+    temp_store.write_event({"type": "custom", "index": 4})
+
+    # 读取时会先flush缓冲区
+    temp_store.enqueue_event({"type": "custom", "index": 5})
+    events = temp_store.get_events(trace_id)
+    assert [e.data["index"] for e in events] == [0, 1, 2, 3, 4, 5]
+    assert temp_store.flush_events() == 0
+
+
+def test_flush_events_keeps_batch_on_error(temp_store, monkeypatch):
+    """测试批量写入失败时事件保留在缓冲区"""
+    trace_id = temp_store.start_trace(agent_name="test-agent")
+    temp_store.enqueue_event({"type": "custom", "index": 0})
+
+    def fail(sql, params_list):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(temp_store.db, "execute_many", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        temp_store.flush_events()
+    assert len(temp_store._pending_events) == 1
+
+    monkeypatch.undo()
+    assert temp_store.flush_events() == 1
+    assert [e.data["index"] for e in temp_store.get_events(trace_id)] == [0]
+
+
+def test_close_flushes_pending_events(temp_store):
+    """测试close()与上下文管理器退出时写入缓冲区中的事件"""
+    with temp_store as store:
+        trace_id = store.start_trace(agent_name="test-agent")
+        store.enqueue_event({"type": "custom", "index": 0})
+
+    assert temp_store._pending_events == []
+    rows = temp_store.db.fetch_all(
+        "SELECT sequence_number FROM events WHERE trace_id = ?", (trace_id,)
+    )
+    assert len(rows) == 1
+
+
+def test_enqueue_event_unknown_trace(temp_store):
+    """测试向不存在的trace缓冲事件"""
+    with pytest.raises(ValueError, match="does not exist"):
+        temp_store.enqueue_event({"data": "test"}, trace_id="missing-trace")
+
+
+def test_write_events(temp_store):
+    """测试write_events一次写入多个事件"""
+    trace_id = temp_store.start_trace(agent_name="test-agent")
+
+    event_ids = temp_store.write_events(
+        [
+            ({"type": "prompt", "content": "hi"}, EventType.PROMPT, 1000.0),
+            ({"type": "custom", "index": 1}, None, None),
+        ],
+        trace_id=trace_id
+    )
+
+    assert len(event_ids) == 2
+    assert temp_store._pending_events == []
+
+    events = temp_store.get_events(trace_id)
+    assert [e.event_id for e in events] == event_ids
+    assert events[0].event_type == EventType.PROMPT.value
+    assert events[0].timestamp == 1000.0
+    assert events[1].event_type == EventType.CUSTOM.value
@@ -8,6 +8,12 @@ from pathlib import Path
 from tigerhill.template_engine.cli import TemplateWizard
 
 
+def _grep(path, needle: bytes) -> bool:
+    """Stream the file line by line and stop at the first line containing needle"""
+    with open(path, 'rb') as f:
+        return any(needle in line for line in f)
+
+
 class TestCLIIntegration:
     """Test CLI wizard integration"""
 
@@ -86,11 +92,8 @@ class TestCLIIntegration:
         test_file = Path(temp_output_dir) / "test_test-api.py"
         assert test_file.exists()
 
-        with open(test_file, 'r') as f:
-            content = f.read()
-
-        assert "https://api.example.com" in content
-        assert "pytest" in content
+        assert _grep(test_file, b"https://api.example.com")
+        assert _grep(test_file, b"pytest")
 
     def test_multiple_templates_generation(self, wizard, temp_output_dir):
         """Test generating different types of templates"""
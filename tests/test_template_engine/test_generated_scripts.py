@@ -2,8 +2,6 @@
 测试所有模板生成的代码语法正确性和基本可执行性
 """
 
-import ast
-import subprocess
 import tempfile
 import pytest
 from pathlib import Path
@@ -28,7 +26,7 @@ class TestGeneratedScriptsSyntax:
 
     def _get_default_params(self, template):
         """获取模板的默认参数"""
-        validator = TemplateValidator(template)
+        validator = TemplateValidator.for_template(template)
         params = {}
 
         for param_def in template.parameters:
@@ -85,8 +83,8 @@ class TestGeneratedScriptsSyntax:
         "llm/llm-cost-validation",
         "integration/integration-e2e"
     ])
-    def test_template_generates_valid_syntax(self, loader, temp_output_dir, template_id):
-        """测试每个模板生成的代码语法正确"""
+    def test_template_generates_valid_syntax(self, loader, template_id):
+        """测试每个模板生成的代码语法正确（内存中编译，不写磁盘）"""
         # 加载模板
         template = loader.load_template(f"{template_id}.yaml")
         assert template is not None, f"Failed to load template: {template_id}"
@@ -95,79 +93,28 @@ class TestGeneratedScriptsSyntax:
         params = self._get_default_params(template)
 
         # 验证参数
-        validator = TemplateValidator(template)
+        validator = TemplateValidator.for_template(template)
         is_valid, errors = validator.validate(params)
         assert is_valid, f"Parameter validation failed for {template_id}: {errors}"
 
-        # 生成代码
+        # 渲染代码（不写文件）
         generator = CodeGenerator(template)
-        generated_files = generator.generate(
-            params=params,
-            output_dir=temp_output_dir,
-            overwrite=True
-        )
+        previews = generator.preview(params)
 
-        assert len(generated_files) > 0, f"No files generated for {template_id}"
+        assert len(previews) > 0, f"No files generated for {template_id}"
 
-        # 验证每个生成的Python文件的语法
-        for file_path in generated_files:
-            if file_path.endswith('.py'):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    code = f.read()
-
-                # 使用ast.parse验证语法
+        # 使用内置compile验证每个Python文件（与py_compile相同的解析器，无需子进程）
+        for name, content in previews.items():
+            if name.endswith('.py'):
                 try:
-                    ast.parse(code)
-                    print(f"✅ Syntax valid: {Path(file_path).name}")
+                    compile(content, f"<{template_id}:{name}>", 'exec')
                 except SyntaxError as e:
                     pytest.fail(
-                        f"Syntax error in {file_path} (template: {template_id}):\n"
+                        f"Syntax error in {name} (template: {template_id}):\n"
                         f"  Line {e.lineno}: {e.msg}\n"
                         f"  {e.text}"
                     )
 
-    @pytest.mark.parametrize("template_id", [
-        "http/http-api-test",
-        "cli/cli-basic",
-        "llm/llm-prompt-response"
-    ])
-    def test_generated_script_can_import(self, loader, temp_output_dir, template_id):
-        """测试生成的脚本可以被导入（验证import语句正确）"""
-        # 加载模板
-        template = loader.load_template(f"{template_id}.yaml")
-        params = self._get_default_params(template)
-
-        # 生成代码
-        generator = CodeGenerator(template)
-        generated_files = generator.generate(
-            params=params,
-            output_dir=temp_output_dir,
-            overwrite=True
-        )
-
-        # 找到主测试文件
-        test_file = None
-        for file_path in generated_files:
-            if file_path.endswith('.py') and 'test_' in Path(file_path).name:
-                test_file = file_path
-                break
-
-        assert test_file is not None, f"No test file found for {template_id}"
-
-        # 尝试执行Python语法检查（不运行测试）
-        result = subprocess.run(
-            ["python", "-m", "py_compile", test_file],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            pytest.fail(
-                f"Failed to compile {test_file} (template: {template_id}):\n"
-                f"  stdout: {result.stdout}\n"
-                f"  stderr: {result.stderr}"
-            )
-
     def test_all_templates_generate_required_files(self, loader, temp_output_dir):
         """测试所有模板生成必需的文件"""
         templates = loader.list_templates()
@@ -224,16 +171,13 @@ class TestGeneratedScriptsSyntax:
         params = self._get_default_params(template)
 
         generator = CodeGenerator(template)
-        generated_files = generator.generate(
-            params=params,
-            output_dir=temp_output_dir,
-            overwrite=True
-        )
+        rendered = generator.generate_to_dict(params)
+        generated_files = generator.write_files(rendered, temp_output_dir, overwrite=True)
+        contents = dict(zip(generated_files, rendered.values()))
 
         for file_path in generated_files:
             if file_path.endswith('.py'):
-                with open(file_path, 'r') as f:
-                    first_line = f.readline()
+                first_line = contents[file_path].split('\n', 1)[0]
 
                 # 测试文件通常有shebang
                 if 'test_' in Path(file_path).name:
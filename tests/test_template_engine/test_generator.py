@@ -73,17 +73,17 @@ class TestCodeGenerator:
             "validate_response": True
         }
 
-        generated_files = generator.generate(
-            params=params,
-            output_dir=temp_output_dir
-        )
+        rendered = generator.generate_to_dict(params)
+        generated_files = generator.write_files(rendered, temp_output_dir)
+        contents = dict(zip(generated_files, rendered.values()))
 
         # Find the main test file
         test_file = next(f for f in generated_files if f.endswith(".py"))
+        content = contents[test_file]
 
-        # Read content
-        with open(test_file, 'r') as f:
-            content = f.read()
+        # Returned content matches what was written
+        with open(test_file, 'r', encoding='utf-8') as f:
+            assert f.read() == content
 
         # Check that parameters were substituted
         assert "my-weather-api" in content or "MyWeatherApi" in content or "my_weather_api" in content
@@ -144,6 +144,31 @@ class TestCodeGenerator:
             if path.endswith(".py"):
                 assert "import pytest" in content
 
+    def test_generate_to_dict(self, generator, temp_output_dir):
+        """Test generating content in memory without writing files"""
+        params = {
+            "agent_name": "test-api",
+            "api_url": "https://api.example.com",
+            "http_method": "GET",
+            "expected_status": 200,
+            "request_body": "{}",
+            "validate_response": True
+        }
+
+        rendered = generator.generate_to_dict(params)
+
+        assert set(rendered) == {"test_test-api.py", "requirements.txt", "README.md"}
+        assert "import pytest" in rendered["test_test-api.py"]
+        assert "https://api.example.com" in rendered["test_test-api.py"]
+
+        # Nothing is written to disk
+        assert list(Path(temp_output_dir).iterdir()) == []
+
+    def test_generate_to_dict_raises_on_render_error(self, generator):
+        """Test that in-memory generation raises instead of embedding errors"""
+        with pytest.raises(CodeGenerationError):
+            generator.generate_to_dict({})
+
     def test_get_file_list(self, generator):
         """Test getting list of files that will be generated"""
         params = {
@@ -203,17 +228,15 @@ class TestCodeGenerator:
             "expected_keywords": "Paris"
         }
 
-        generated_files = generator.generate(
-            params=params,
-            output_dir=temp_output_dir
-        )
+        rendered = generator.generate_to_dict(params)
+        generated_files = generator.write_files(rendered, temp_output_dir)
+        contents = dict(zip(generated_files, rendered.values()))
 
         assert len(generated_files) == 3
 
         # Check that model and prompt were substituted
         test_file = next(f for f in generated_files if f.endswith(".py"))
-        with open(test_file, 'r') as f:
-            content = f.read()
+        content = contents[test_file]
 
         assert "gpt-4" in content
         assert "What is the capital of France?" in content
@@ -232,17 +255,15 @@ class TestCodeGenerator:
             "timeout": 60
         }
 
-        generated_files = generator.generate(
-            params=params,
-            output_dir=temp_output_dir
-        )
+        rendered = generator.generate_to_dict(params)
+        generated_files = generator.write_files(rendered, temp_output_dir)
+        contents = dict(zip(generated_files, rendered.values()))
 
         assert len(generated_files) == 3
 
         # Check content
         test_file = next(f for f in generated_files if f.endswith(".py"))
-        with open(test_file, 'r') as f:
-            content = f.read()
+        content = contents[test_file]
 
         assert "python my_tool.py" in content
         assert "--verbose --debug" in content
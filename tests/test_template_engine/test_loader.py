@@ -50,6 +50,21 @@ class TestTemplateLoader:
         assert len(http_templates) >= 3  # http-api-test, http-rest-crud, http-auth-test
         assert all("http/" in t for t in http_templates)
 
+    def test_list_templates_cached_until_cleared(self, tmp_path):
+        """Test that listings are cached until clear_cache() is called"""
+        (tmp_path / "http").mkdir()
+        (tmp_path / "http" / "a.yaml").write_text("metadata: {}\ntemplates: {}\n")
+        (tmp_path / "catalog.yaml").write_text("version: 1\n")
+        loader = TemplateLoader(templates_dir=str(tmp_path))
+
+        assert loader.list_templates() == [str(Path("http") / "a.yaml")]
+
+        (tmp_path / "http" / "b.yaml").write_text("metadata: {}\ntemplates: {}\n")
+        assert len(loader.list_templates()) == 1
+
+        loader.clear_cache()
+        assert len(loader.list_templates()) == 2
+
     def test_search_templates_by_query(self, loader):
         """Test searching templates by query"""
         results = loader.search_templates(query="API")
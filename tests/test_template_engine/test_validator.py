@@ -2,6 +2,8 @@
 Tests for TemplateValidator
 """
 
+import copy
+import gc
 import pytest
 from pathlib import Path
 from tigerhill.template_engine.loader import TemplateLoader
@@ -11,22 +13,22 @@ from tigerhill.template_engine.validator import TemplateValidator, ParameterVali
 class TestTemplateValidator:
     """Test TemplateValidator functionality"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def loader(self):
         """Create a template loader"""
         project_root = Path(__file__).parent.parent.parent
         templates_dir = project_root / "templates"
         return TemplateLoader(templates_dir=str(templates_dir))
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def http_template(self, loader):
         """Load HTTP API test template"""
         return loader.load_template("http/http-api-test.yaml")
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def validator(self, http_template):
         """Create validator for HTTP template"""
-        return TemplateValidator(http_template)
+        return TemplateValidator.for_template(http_template)
 
     def test_validate_valid_params(self, validator):
         """Test validation with valid parameters"""
@@ -110,6 +112,46 @@ class TestTemplateValidator:
         assert is_valid is False
         assert any("api_url" in error for error in errors)
 
+    @pytest.mark.parametrize("url", [
+        " https://api.example.com",
+        "https://api.example.com\n",
+        "https://api example.com",
+        "http://[abc",
+        "https://",
+        "//api.example.com",
+    ])
+    def test_validate_url_rejects_malformed(self, validator, url):
+        """Test that whitespace, empty hosts and malformed IPv6 hosts are rejected"""
+        params = {
+            "agent_name": "test-api",
+            "api_url": url,
+            "http_method": "GET",
+            "expected_status": 200,
+            "validate_response": True
+        }
+
+        is_valid, errors = validator.validate(params)
+        assert is_valid is False
+        assert any("api_url" in error for error in errors)
+
+    @pytest.mark.parametrize("url", [
+        "https://api.example.com/v1/items?limit=10#top",
+        "http://[::1]:8080/health",
+        "HTTP://user@localhost:3000",
+    ])
+    def test_validate_url_accepts_valid(self, validator, url):
+        """Test that well-formed URLs pass"""
+        params = {
+            "agent_name": "test-api",
+            "api_url": url,
+            "http_method": "GET",
+            "expected_status": 200,
+            "validate_response": True
+        }
+
+        is_valid, errors = validator.validate(params)
+        assert is_valid is True, errors
+
     def test_validate_integer_range(self, validator):
         """Test integer range validation"""
         params = {
@@ -153,6 +195,27 @@ class TestTemplateValidator:
         assert is_valid is False
         assert any("validate_response" in error for error in errors)
 
+    def test_for_template_reuses_instance(self, http_template, validator):
+        """Test that for_template returns one shared validator per template"""
+        assert TemplateValidator.for_template(http_template) is validator
+
+        other = TemplateLoader().load_template("cli/cli-basic.yaml")
+        assert TemplateValidator.for_template(other) is not validator
+
+    def test_for_template_releases_collected_templates(self, http_template):
+        """Test that the shared validator does not keep its template alive"""
+        template = copy.deepcopy(http_template)
+        validator = TemplateValidator.for_template(template)
+        assert validator.template is template
+        assert template in TemplateValidator._instances
+
+        size = len(TemplateValidator._instances)
+        del template
+        gc.collect()
+
+        assert len(TemplateValidator._instances) == size - 1
+        assert validator.template is None
+
     def test_validate_json(self, loader):
         """Test JSON parameter validation"""
         template = loader.load_template("http/http-api-test.yaml")
@@ -6,7 +6,7 @@ import pytest
 import json
 import time
 
-from tigerhill.storage.trace_store import Trace, TraceEvent, EventType
+from tigerhill.storage.trace_store import Trace, TraceEvent, EventType, EVENT_ROW_COLUMNS
 
 
 def test_trace_event_to_db_dict():
@@ -33,7 +33,7 @@ def test_trace_event_to_db_dict():
     # Parse and verify data content
     data = json.loads(db_dict['data'])
     assert data['event_id'] == "event-001"
-    assert data['event_type'] == "prompt"
+    assert 'event_type' not in data  # Stored only in the event_type column
     assert data['data'] == {"prompt": "test prompt", "model": "gpt-4"}
     assert data['metadata'] == {"user": "test_user"}
 
@@ -116,7 +116,7 @@ def test_trace_to_db_dict_running():
     assert db_dict['total_cost_usd'] == 0.0
 
     # Tags should be JSON string
-    assert db_dict['tags'] == json.dumps(["test", "demo"])
+    assert json.loads(db_dict['tags']) == ["test", "demo"]
 
 
 def test_trace_to_db_dict_completed():
@@ -422,3 +422,310 @@ def test_trace_event_from_db_dict_invalid_json():
     assert event.event_type == EventType.CUSTOM
     assert event.timestamp == 1234567890.0
     assert event.data == {}  # Fallback to empty dict
+
+
+def test_trace_event_from_db_dict_bytes_payload():
+    """测试从BLOB(bytes)形式的data字段反序列化TraceEvent"""
+    original = TraceEvent(
+        event_id="event-001",
+        trace_id="trace-001",
+        event_type=EventType.TOOL_CALL,
+        timestamp=1234567890.0,
+        data={"tool": "search", "args": {"q": "天气"}},
+        metadata={"user": "test_user"}
+    )
+
+    db_dict = original.to_db_dict(sequence_number=0, as_bytes=True)
+    assert isinstance(db_dict['data'], bytes)
+    assert db_dict['data'] == original.to_db_dict(sequence_number=0)['data'].encode('utf-8')
+
+    restored = TraceEvent.from_db_dict(db_dict)
+
+    assert restored.event_id == "event-001"
+    assert restored.data == {"tool": "search", "args": {"q": "天气"}}
+    assert restored.metadata == {"user": "test_user"}
+
+
+def test_trace_to_db_dict_tracks_appended_events():
+    """测试统计数据随事件增量更新（add_event与直接append）"""
+    trace = Trace(
+        trace_id="trace-001",
+        agent_name="test-agent",
+        task_id=None,
+        start_time=1234567890.0,
+        end_time=1234567900.0,
+        events=[]
+    )
+
+    trace.add_event(TraceEvent(
+        event_id="e1",
+        trace_id="trace-001",
+        event_type=EventType.PROMPT,
+        timestamp=1234567890.0,
+        data={"total_tokens": 50, "cost_usd": 0.001}
+    ))
+    db_dict = trace.to_db_dict()
+    assert db_dict['total_events'] == 1
+    assert db_dict['total_tokens'] == 50
+    assert db_dict['status'] == 'completed'
+
+    # 直接append到events列表也会在下次序列化时被统计
+    trace.events.append(TraceEvent(
+        event_id="e2",
+        trace_id="trace-001",
+        event_type=EventType.ERROR,
+        timestamp=1234567891.0,
+        data={"error": "boom"}
+    ))
+    db_dict = trace.to_db_dict()
+    assert db_dict['total_events'] == 2
+    assert db_dict['llm_calls_count'] == 1
+    assert db_dict['status'] == 'failed'
+
+    # 替换events列表会触发重新统计
+    trace.events = []
+    db_dict = trace.to_db_dict()
+    assert db_dict['total_events'] == 0
+    assert db_dict['total_tokens'] == 0
+    assert db_dict['status'] == 'completed'
+
+
+def test_encode_metadata_cached_matches_json():
+    """测试metadata编码缓存与直接JSON编码结果一致"""
+    from tigerhill.storage.trace_store import _encode_metadata_cached, _json_dumps
+
+    for metadata in (
+        {"user": "test_user", "count": 1},
+        {"user": "test_user", "count": 1.0},
+        {"user": "test_user", "count": True},
+        {"nested": {"a": [1, 2]}},
+        {"ratio": None, "name": "中文"},
+        {"x": 0.0},
+        {"x": -0.0},
+        {"x": float("nan")},
+    ):
+        # 重复调用以命中缓存
+        for _ in range(2):
+            assert _encode_metadata_cached(metadata) == _json_dumps(metadata)
+
+
+def test_trace_event_to_db_dict_without_orjson(monkeypatch):
+    """测试未安装orjson时事件payload与json.dumps结果一致"""
+    from tigerhill.storage import trace_store
+
+    def stdlib_dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+    monkeypatch.setattr(trace_store, "orjson", None)
+    monkeypatch.setattr(trace_store, "_json_dumps", stdlib_dumps)
+    monkeypatch.setattr(trace_store, "_encode_metadata", trace_store._encode_metadata_cached)
+    trace_store._encode_scalar_items.cache_clear()
+
+    event = TraceEvent(
+        event_id="event-001",
+        trace_id="trace-001",
+        event_type=EventType.PROMPT,
+        timestamp=1234567890.5,
+        data={"prompt": "中文 prompt", "tokens": [1, 2]},
+        metadata={"user": "test_user", "count": 1}
+    )
+
+    try:
+        for _ in range(2):
+            db_dict = event.to_db_dict(sequence_number=0)
+            assert db_dict['data'] == stdlib_dumps({
+                'event_id': "event-001",
+                'data': {"prompt": "中文 prompt", "tokens": [1, 2]},
+                'metadata': {"user": "test_user", "count": 1}
+            })
+            assert event.to_db_dict(0, as_bytes=True)['data'] == db_dict['data'].encode('utf-8')
+    finally:
+        trace_store._encode_scalar_items.cache_clear()
+
+
+def test_encode_metadata_cached_keeps_negative_zero(monkeypatch):
+    """测试未安装orjson时缓存不会把-0.0编码成0.0"""
+    from tigerhill.storage import trace_store
+
+    def stdlib_dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+    monkeypatch.setattr(trace_store, "_json_dumps", stdlib_dumps)
+    trace_store._encode_scalar_items.cache_clear()
+
+    try:
+        assert trace_store._encode_metadata_cached({"x": 0.0}) == '{"x":0.0}'
+        assert trace_store._encode_metadata_cached({"x": -0.0}) == '{"x":-0.0}'
+    finally:
+        trace_store._encode_scalar_items.cache_clear()
+
+
+def test_trace_event_from_db_dict_event_type_code():
+    """测试从字典编码(整数)的event_type反序列化"""
+    from tigerhill.storage.trace_store import _EVENT_TYPE_TO_ID
+
+    db_dict = TraceEvent(
+        event_id="event-001",
+        trace_id="trace-001",
+        event_type=EventType.TOOL_RESULT,
+        timestamp=1234567890.0,
+        data={"result": 42}
+    ).to_db_dict(sequence_number=0)
+    db_dict['event_type'] = _EVENT_TYPE_TO_ID[EventType.TOOL_RESULT]
+
+    event = TraceEvent.from_db_dict(db_dict)
+    assert event.event_type == EventType.TOOL_RESULT
+
+    db_dict['event_type'] = len(EventType)
+    with pytest.raises(ValueError):
+        TraceEvent.from_db_dict(db_dict)
+
+
+def test_trace_event_to_db_dict_empty_payload():
+    """测试空data且无metadata的事件序列化"""
+    for event_type in EventType:
+        event = TraceEvent(
+            event_id='event-"001"',
+            trace_id="trace-001",
+            event_type=event_type,
+            timestamp=1234567890.0,
+            data={}
+        )
+
+        db_dict = event.to_db_dict(sequence_number=0)
+
+        assert json.loads(db_dict['data']) == {
+            'event_id': 'event-"001"',
+            'data': {},
+            'metadata': {}
+        }
+        assert TraceEvent.from_db_dict(db_dict) == TraceEvent(
+            event_id='event-"001"',
+            trace_id="trace-001",
+            event_type=event_type,
+            timestamp=1234567890.0,
+            data={},
+            metadata={}
+        )
+
+
+def test_trace_event_from_rows():
+    """测试TraceEvent.from_rows批量反序列化位置行"""
+    originals = [
+        TraceEvent(
+            event_id=f"event-{i}",
+            trace_id="trace-001",
+            event_type=EventType.MODEL_RESPONSE,
+            timestamp=1234567890.0 + i,
+            data={"index": i},
+            metadata={"user": "test_user"} if i else None
+        )
+        for i in range(3)
+    ]
+    rows = [
+        tuple(event.to_db_dict(sequence_number=i)[c] for c in EVENT_ROW_COLUMNS)
+        for i, event in enumerate(originals)
+    ]
+    rows.append(("trace-001", "custom", 1234567899.0, "invalid json string"))
+
+    events = TraceEvent.from_rows(rows)
+
+    assert len(events) == 4
+    for restored, db_dict in zip(events, (e.to_db_dict(0) for e in originals)):
+        assert restored == TraceEvent.from_db_dict(db_dict)
+    assert events[3].event_type == EventType.CUSTOM
+    assert events[3].data == {}
+
+
+@pytest.mark.parametrize("raw_data", [None, "", b"", "null", "[1, 2]", "{broken", b"\x00\x01"])
+def test_trace_event_from_db_dict_non_object_payload(raw_data):
+    """测试非JSON对象的data字段都走回退逻辑"""
+    db_data = {
+        'trace_id': 'trace-001',
+        'event_type': 'custom',
+        'timestamp': 1234567890.0,
+        'sequence_number': 0,
+        'data': raw_data
+    }
+
+    event = TraceEvent.from_db_dict(db_data)
+    assert event.data == {}
+    assert event.metadata == {}
+
+    [row_event] = TraceEvent.from_rows([('trace-001', 'custom', 1234567890.0, raw_data)])
+    assert row_event.data == {}
+
+
+def test_trace_to_db_dict_sees_in_place_changes():
+    """测试原地替换事件或修改事件数据并调用 invalidate_stats 后统计数据随之更新"""
+    trace = Trace(
+        trace_id="trace-001",
+        agent_name="test-agent",
+        task_id=None,
+        start_time=1234567890.0,
+        end_time=1234567900.0,
+        events=[]
+    )
+    trace.add_event(TraceEvent(
+        event_id="e1",
+        trace_id="trace-001",
+        event_type=EventType.PROMPT,
+        timestamp=1234567890.0,
+        data={"total_tokens": 5, "cost_usd": 0.001}
+    ))
+    assert trace.to_db_dict()['total_tokens'] == 5
+
+    # 修改已有事件的数据
+    trace.events[0].data["total_tokens"] = 7
+    trace.invalidate_stats()
+    assert trace.to_db_dict()['total_tokens'] == 7
+
+    # 原地替换事件
+    trace.events[0] = TraceEvent(
+        event_id="e2",
+        trace_id="trace-001",
+        event_type=EventType.ERROR,
+        timestamp=1234567891.0,
+        data={"error": "boom"}
+    )
+    trace.invalidate_stats()
+    db_dict = trace.to_db_dict()
+    assert db_dict['total_events'] == 1
+    assert db_dict['llm_calls_count'] == 0
+    assert db_dict['total_tokens'] == 0
+    assert db_dict['total_cost_usd'] == 0.0
+    assert db_dict['status'] == 'failed'
+
+
+def test_trace_to_db_dict_tracks_appends_and_reassignment():
+    """测试直接追加或重新赋值 events 时统计数据无需显式失效"""
+    def llm_event(event_id, tokens):
+        return TraceEvent(
+            event_id=event_id,
+            trace_id="trace-001",
+            event_type=EventType.MODEL_RESPONSE,
+            timestamp=1234567890.0,
+            data={"total_tokens": tokens}
+        )
+
+    trace = Trace(
+        trace_id="trace-001",
+        agent_name="test-agent",
+        task_id=None,
+        start_time=1234567890.0,
+        end_time=None,
+        events=[llm_event("e1", 1)]
+    )
+    trace.add_event(llm_event("e2", 2))
+    assert trace.to_db_dict()['total_tokens'] == 3
+
+    trace.events.append(llm_event("e3", 4))
+    db_dict = trace.to_db_dict()
+    assert db_dict['total_events'] == 3
+    assert db_dict['total_tokens'] == 7
+
+    trace.events = [llm_event("e4", 10)]
+    db_dict = trace.to_db_dict()
+    assert db_dict['total_events'] == 1
+    assert db_dict['llm_calls_count'] == 1
+    assert db_dict['total_tokens'] == 10
@@ -12,6 +12,7 @@ from .multi_language import (
     STDIOAgentAdapter,
     UniversalAgentTester
 )
+from .cache import TesterCache, SemanticCache
 
 __all__ = [
     "AgentAdapter",
@@ -19,5 +20,7 @@ __all__ = [
     "CLIAgentAdapter",
     "AgentBayAdapter",
     "STDIOAgentAdapter",
-    "UniversalAgentTester"
+    "UniversalAgentTester",
+    "TesterCache",
+    "SemanticCache"
 ]
@@ -0,0 +1,267 @@
+"""
+Agent Response Cache
+
+为 UniversalAgentTester 提供响应缓存，重复的提示无需再次调用 Agent。
+
+- TesterCache: 精确匹配，基于文件
+- SemanticCache: 语义匹配，基于 embedding 余弦相似度（需要 numpy）
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class TesterCache:
+    """
+    精确匹配的响应缓存
+
+    以 (agent_name, prompt, adapter 类型) 的 SHA-256 作为键，每个条目保存为
+    缓存目录下的一个 JSON 文件，按文件修改时间判断是否过期。
+
+    Example:
+        >>> cache = TesterCache("./.tigerhill_cache", ttl_seconds=3600)
+        >>> tester = UniversalAgentTester(adapter, store, cache=cache)
+    """
+
+    # 类名以 Test 开头，避免被 pytest 当作测试类收集
+    __test__ = False
+
+    def __init__(
+        self,
+        cache_dir: str = "./.tigerhill_cache",
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        初始化响应缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 条目有效期（秒），None 表示永不过期
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(agent_name: str, prompt: str, adapter_type: str) -> str:
+        """
+        计算缓存键
+
+        Args:
+            agent_name: Agent 名称
+            prompt: 输入提示
+            adapter_type: 适配器类名
+
+        Returns:
+            十六进制 SHA-256 摘要
+        """
+        payload = json.dumps(
+            {"agent": agent_name, "prompt": prompt, "adapter": adapter_type},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的输出
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的输出；不存在、已过期或无法读取时返回 None
+        """
+        path = self._path(key)
+        try:
+            if self.ttl_seconds is not None:
+                if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                    return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["output"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key: str, output: str) -> bool:
+        """
+        写入缓存
+
+        包含工具调用状态的输出不会被缓存，因为它依赖于外部工具的执行结果。
+
+        Args:
+            key: 缓存键
+            output: Agent 输出
+
+        Returns:
+            是否已写入
+        """
+        if not isinstance(output, str) or '"tool_calls"' in output:
+            return False
+
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"output": output}, f, ensure_ascii=False)
+            # 原子替换，避免并发读取到半写入的文件
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"缓存写入失败: {e}")
+            return False
+
+        return True
+
+    def clear(self) -> int:
+        """
+        清空缓存
+
+        Returns:
+            删除的条目数
+        """
+        count = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                path.unlink()
+                count += 1
+            except OSError:
+                pass
+        return count
+
+
+class SemanticCache:
+    """
+    语义相似度响应缓存
+
+    保存提示的 L2 归一化 embedding 矩阵（float32）与对应输出。查询时通过一次
+    矩阵-向量乘法得到与所有已缓存提示的余弦相似度，最大值不低于阈值即命中，
+    因此改写过措辞的重复提示也能复用结果。
+
+    Example:
+        >>> cache = SemanticCache(embed_fn=my_model.encode, threshold=0.92)
+        >>> tester = UniversalAgentTester(adapter, store, semantic_cache=cache)
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Sequence[float]],
+        threshold: float = 0.92,
+        initial_capacity: int = 64
+    ):
+        """
+        初始化语义缓存
+
+        Args:
+            embed_fn: 将文本转换为 embedding 向量的函数
+            threshold: 命中所需的最小余弦相似度
+            initial_capacity: embedding 矩阵的初始行数，不足时按倍数扩容
+
+        Raises:
+            ImportError: 未安装 numpy 时
+        """
+        if np is None:
+            raise ImportError("SemanticCache 需要安装 numpy: pip install tigerhill[semantic]")
+
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self._initial_capacity = max(1, initial_capacity)
+
+        self._matrix = None  # (capacity, dim) float32，前 _size 行有效
+        self._outputs: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def embed(self, prompt: str) -> "np.ndarray":
+        """
+        计算提示的归一化 embedding
+
+        Args:
+            prompt: 输入提示
+
+        Returns:
+            L2 归一化后的 float32 向量
+        """
+        vector = np.asarray(self.embed_fn(prompt), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def lookup(self, embedding: "np.ndarray") -> Optional[str]:
+        """
+        查找相似度最高的缓存输出
+
+        Args:
+            embedding: embed() 返回的向量
+
+        Returns:
+            相似度不低于阈值时返回缓存输出，否则返回 None
+        """
+        with self._lock:
+            size = len(self._outputs)
+            if size == 0:
+                return None
+
+            sims = self._matrix[:size] @ embedding
+            best = int(sims.argmax())
+            if sims[best] >= self.threshold:
+                return self._outputs[best]
+
+        return None
+
+    def add(self, embedding: "np.ndarray", output: str) -> bool:
+        """
+        加入一条缓存
+
+        与 TesterCache 相同，包含工具调用状态的输出不会被缓存。
+
+        Args:
+            embedding: embed() 返回的向量
+            output: Agent 输出
+
+        Returns:
+            是否已加入
+        """
+        if not isinstance(output, str) or '"tool_calls"' in output:
+            return False
+
+        with self._lock:
+            size = len(self._outputs)
+            if self._matrix is None:
+                self._matrix = np.empty(
+                    (self._initial_capacity, embedding.shape[0]), dtype=np.float32
+                )
+            elif size == self._matrix.shape[0]:
+                grown = np.empty((size * 2, self._matrix.shape[1]), dtype=np.float32)
+                grown[:size] = self._matrix
+                self._matrix = grown
+
+            self._matrix[size] = embedding
+            self._outputs.append(output)
+
+        return True
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._matrix = None
+            self._outputs = []
+
+
+__all__ = ["TesterCache", "SemanticCache"]
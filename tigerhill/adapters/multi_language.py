@@ -6,14 +6,45 @@ Multi-Language Agent Adapters
 
 import json
 import logging
+import os
+import queue
+import selectors
+import shlex
+import string
 import subprocess
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# orjson 为可选依赖；其 JSONDecodeError 是 json.JSONDecodeError 的子类
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# POSIX 上 Python 创建的文件描述符默认不可继承（PEP 446），
+# 因此可以跳过 close_fds 的逐个关闭，子进程启动更快
+_CLOSE_FDS = os.name == "nt"
+
+# Windows 的 select 不支持管道，只能退回阻塞读取
+_SELECT_PIPES = os.name != "nt"
+
+from tigerhill.eval.assertions import run_assertions
+from tigerhill.storage.async_writer import AsyncTraceWriter, _write_events
 from tigerhill.storage.trace_store import EventType
+from tigerhill.adapters.cache import SemanticCache, TesterCache
 
 
 class AgentAdapter(ABC):
@@ -63,6 +94,9 @@ class HTTPAgentAdapter(AgentAdapter):
 
     适用于提供 HTTP 接口的 Agent（Node.js、Python Flask/FastAPI、Go HTTP 等）。
 
+    requests.Session 不保证线程安全，因此每个线程使用各自的 Session，
+    可在 UniversalAgentTester.test_batch(concurrency>1) 中并发调用。
+
     Example:
         >>> adapter = HTTPAgentAdapter("http://localhost:3000", endpoint="/api/agent")
         >>> response = adapter.invoke("计算 1+1")
@@ -75,7 +109,8 @@ class HTTPAgentAdapter(AgentAdapter):
         endpoint: str = "/api/agent",
         method: str = "POST",
         headers: Optional[Dict[str, str]] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        pool_maxsize: int = 16
     ):
         """
         初始化 HTTP Agent 适配器
@@ -86,15 +121,43 @@ class HTTPAgentAdapter(AgentAdapter):
             method: HTTP 方法（GET/POST）
             headers: 自定义 HTTP 头
             timeout: 请求超时时间（秒）
+            pool_maxsize: 连接池中保持的最大 keep-alive 连接数
         """
         self.base_url = base_url.rstrip('/')
         self.endpoint = endpoint
         self.method = method.upper()
         self.headers = headers or {}
         self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+
+        # 每个线程复用各自的 requests.Session（首次调用时创建），保持 keep-alive 连接；
+        # 所有已创建的 Session 记录在 _sessions 中，cleanup 时统一关闭
+        self._local = threading.local()
+        self._sessions: List[Any] = []
+        self._sessions_lock = threading.Lock()
 
         logger.info(f"Initialized HTTP adapter: {self.base_url}{self.endpoint}")
 
+    def _get_session(self):
+        """获取（必要时创建）当前线程带连接池的 requests.Session"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            try:
+                import requests
+                from requests.adapters import HTTPAdapter
+            except ImportError:
+                raise ImportError("需要安装 requests 库: pip install requests")
+
+            session = requests.Session()
+            pool = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+            session.mount("http://", pool)
+            session.mount("https://", pool)
+            with self._sessions_lock:
+                self._sessions.append(session)
+            self._local.session = session
+
+        return session
+
     def invoke(self, prompt: str, **kwargs) -> str:
         """
         通过 HTTP 调用 Agent
@@ -106,10 +169,8 @@ class HTTPAgentAdapter(AgentAdapter):
         Returns:
             Agent 响应文本
         """
-        try:
-            import requests
-        except ImportError:
-            raise ImportError("需要安装 requests 库: pip install requests")
+        session = self._get_session()
+        import requests
 
         url = f"{self.base_url}{self.endpoint}"
         payload = {"prompt": prompt, **kwargs}
@@ -119,14 +180,14 @@ class HTTPAgentAdapter(AgentAdapter):
 
         try:
             if self.method == "POST":
-                response = requests.post(
+                response = session.post(
                     url,
                     json=payload,
                     headers=self.headers,
                     timeout=self.timeout
                 )
             elif self.method == "GET":
-                response = requests.get(
+                response = session.get(
                     url,
                     params=payload,
                     headers=self.headers,
@@ -137,7 +198,8 @@ class HTTPAgentAdapter(AgentAdapter):
 
             response.raise_for_status()
 
-            data = response.json()
+            # 直接解析响应字节，跳过 requests 的编码探测与解码
+            data = _json_loads(response.content)
 
             # 尝试从多种可能的响应格式中提取输出
             if isinstance(data, str):
@@ -149,12 +211,54 @@ class HTTPAgentAdapter(AgentAdapter):
             elif "result" in data:
                 return data["result"]
             else:
-                return json.dumps(data)
+                return _json_dumps(data)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"HTTP 请求失败: {e}")
             raise
 
+    def cleanup(self):
+        """关闭所有线程的 Session，释放连接池中的连接"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+            self._local = threading.local()
+
+        for session in sessions:
+            session.close()
+
+
+_ARG_FORMATTER = string.Formatter()
+
+
+def _compile_arg_template(arg: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+    """
+    预解析参数模板
+
+    Returns:
+        (字面量, 字段名) 列表，字段名为 None 表示纯字面量；模板含格式说明、
+        转换符、位置参数或属性/下标访问时返回 None，由 str.format 处理
+    """
+    parts = []
+    for literal, field_name, format_spec, conversion in _ARG_FORMATTER.parse(arg):
+        if field_name is not None and (
+            not field_name.isidentifier() or format_spec or conversion
+        ):
+            return None
+        parts.append((literal, field_name))
+    return parts
+
+
+def _pump_lines(stream, lines: queue.Queue):
+    """后台线程：逐行读取 worker 输出放入队列，输出关闭时放入 None"""
+    try:
+        for line in stream:
+            lines.put(line)
+    except (OSError, ValueError):
+        # 管道在读取过程中被关闭
+        pass
+    finally:
+        lines.put(None)
+
 
 class CLIAgentAdapter(AgentAdapter):
     """
@@ -162,10 +266,18 @@ class CLIAgentAdapter(AgentAdapter):
 
     适用于命令行工具形式的 Agent（Go、Rust、C++ 等编译型语言）。
 
+    默认每次调用启动一个新进程。persistent=True 时改为常驻 worker 进程池：
+    worker 以 ``[command] + worker_args`` 启动，从 STDIN 逐行读取 JSON 请求
+    ``{"prompt": ..., ...}``，并向 STDOUT 逐行写回响应（NDJSON）。
+
     Example:
         >>> adapter = CLIAgentAdapter("./my_agent")
         >>> response = adapter.invoke("分析代码")
         >>> print(response)
+        >>>
+        >>> pool = CLIAgentAdapter("./my_agent", persistent=True, workers=4, worker_args=["--serve"])
+        >>> response = pool.invoke("分析代码")  # 复用已启动的 worker
+        >>> pool.cleanup()
     """
 
     def __init__(
@@ -173,7 +285,10 @@ class CLIAgentAdapter(AgentAdapter):
         command: str,
         args_template: Optional[List[str]] = None,
         timeout: int = 30,
-        encoding: str = "utf-8"
+        encoding: str = "utf-8",
+        persistent: bool = False,
+        workers: int = 1,
+        worker_args: Optional[List[str]] = None
     ):
         """
         初始化 CLI Agent 适配器
@@ -183,11 +298,34 @@ class CLIAgentAdapter(AgentAdapter):
             args_template: 参数模板，{prompt} 会被替换为实际提示
             timeout: 执行超时时间（秒）
             encoding: 输出编码
+            persistent: 是否使用常驻 worker 进程池
+            workers: 常驻模式下的最大 worker 数
+            worker_args: 常驻模式下启动 worker 的参数
         """
+        if workers < 1:
+            raise ValueError("workers 必须大于等于 1")
+
         self.command = command
         self.args_template = args_template or ["{prompt}"]
         self.timeout = timeout
         self.encoding = encoding
+        self.persistent = persistent
+        self.workers = workers
+        self.worker_args = worker_args or []
+
+        # 参数模板在此一次性解析，invoke 时只做拼接
+        self._prompt_only = self.args_template == ["{prompt}"]
+        self._compiled_args = [
+            (arg, _compile_arg_template(arg)) for arg in self.args_template
+        ]
+
+        # 常驻模式：已启动的 worker 与空闲队列（首次调用时按需启动）。
+        # 队列中的 None 表示有 worker 被移除、空出了名额，唤醒等待者启动新 worker
+        self._workers: List[subprocess.Popen] = []
+        self._idle_workers: "queue.Queue[Optional[subprocess.Popen]]" = queue.Queue()
+        self._workers_lock = threading.Lock()
+        # 每个 worker 的输出行队列，由后台读取线程填充，调用方按超时等待
+        self._worker_lines: "Dict[subprocess.Popen, queue.Queue]" = {}
 
         logger.info(f"Initialized CLI adapter: {self.command}")
 
@@ -202,11 +340,23 @@ class CLIAgentAdapter(AgentAdapter):
         Returns:
             Agent 响应文本
         """
+        if self.persistent:
+            return self._invoke_worker(prompt, **kwargs)
+
         # 构建命令参数
-        args = [
-            arg.format(prompt=prompt, **kwargs)
-            for arg in self.args_template
-        ]
+        if self._prompt_only:
+            args = [prompt]
+        else:
+            values = {"prompt": prompt, **kwargs}
+            args = []
+            for arg, parts in self._compiled_args:
+                if parts is None:
+                    args.append(arg.format(**values))
+                else:
+                    args.append("".join(
+                        literal if name is None else literal + format(values[name])
+                        for literal, name in parts
+                    ))
 
         cmd = [self.command] + args
         logger.debug(f"Executing: {' '.join(cmd)}")
@@ -217,7 +367,8 @@ class CLIAgentAdapter(AgentAdapter):
                 capture_output=True,
                 text=True,
                 timeout=self.timeout,
-                encoding=self.encoding
+                encoding=self.encoding,
+                close_fds=_CLOSE_FDS
             )
 
             if result.returncode != 0:
@@ -230,7 +381,7 @@ class CLIAgentAdapter(AgentAdapter):
 
             # 尝试解析 JSON 输出
             try:
-                data = json.loads(output)
+                data = _json_loads(output)
                 if isinstance(data, dict) and "output" in data:
                     return data["output"]
             except json.JSONDecodeError:
@@ -246,6 +397,127 @@ class CLIAgentAdapter(AgentAdapter):
             logger.error(f"命令执行失败: {e}")
             raise
 
+    def _spawn_worker(self) -> subprocess.Popen:
+        """启动一个常驻 worker 进程"""
+        cmd = [self.command] + self.worker_args
+        logger.debug(f"Starting worker: {' '.join(cmd)}")
+        worker = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            encoding=self.encoding,
+            close_fds=_CLOSE_FDS
+        )
+
+        # 阻塞的 readline 放到后台线程，调用方即可带超时等待响应行
+        lines: queue.Queue = queue.Queue()
+        threading.Thread(
+            target=_pump_lines,
+            args=(worker.stdout, lines),
+            name="tigerhill-cli-worker-reader",
+            daemon=True
+        ).start()
+        self._worker_lines[worker] = lines
+        return worker
+
+    def _acquire_worker(self) -> subprocess.Popen:
+        """取出一个空闲 worker；未达上限时启动新 worker，否则等待归还"""
+        while True:
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                with self._workers_lock:
+                    if len(self._workers) < self.workers:
+                        worker = self._spawn_worker()
+                        self._workers.append(worker)
+                        return worker
+                try:
+                    worker = self._idle_workers.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"等待空闲 worker 超时 ({self.timeout}秒)")
+
+            if worker is None:
+                # 有名额空出，重新尝试启动 worker
+                continue
+
+            if worker.poll() is None:
+                return worker
+
+            # worker 已退出，丢弃后重新获取
+            self._discard_worker(worker)
+
+    def _discard_worker(self, worker: subprocess.Popen):
+        """终止并移除一个 worker"""
+        with self._workers_lock:
+            freed = worker in self._workers
+            if freed:
+                self._workers.remove(worker)
+            self._worker_lines.pop(worker, None)
+        if freed:
+            self._idle_workers.put(None)
+        try:
+            if worker.stdin:
+                worker.stdin.close()
+            worker.terminate()
+            worker.wait(timeout=5)
+        except Exception as e:
+            logger.warning(f"进程清理警告: {e}")
+            worker.kill()
+
+    def _invoke_worker(self, prompt: str, **kwargs) -> str:
+        """通过常驻 worker 调用 Agent"""
+        worker = self._acquire_worker()
+
+        try:
+            request = _json_dumps({"prompt": prompt, **kwargs})
+            worker.stdin.write(request + "\n")
+            worker.stdin.flush()
+
+            try:
+                line = self._worker_lines[worker].get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(f"命令执行超时 ({self.timeout}秒)") from None
+            if line is None:
+                raise RuntimeError(f"worker 进程已退出 (exit code {worker.poll()})")
+        except Exception as e:
+            logger.error(f"worker 通信失败: {e}")
+            self._discard_worker(worker)
+            raise
+
+        self._idle_workers.put(worker)
+
+        output = line.rstrip("\n")
+        logger.debug(f"Output: {output[:200]}...")
+
+        # 尝试解析 JSON 输出
+        try:
+            data = _json_loads(output)
+            if isinstance(data, dict) and "output" in data:
+                return data["output"]
+        except json.JSONDecodeError:
+            pass
+
+        return output
+
+    def cleanup(self):
+        """终止所有常驻 worker 进程"""
+        with self._workers_lock:
+            workers, self._workers = self._workers, []
+
+        # 清空而不替换空闲队列：等待中的调用方仍阻塞在这个队列上
+        while True:
+            try:
+                self._idle_workers.get_nowait()
+            except queue.Empty:
+                break
+
+        for worker in workers:
+            self._discard_worker(worker)
+            self._idle_workers.put(None)
+
 
 class STDIOAgentAdapter(AgentAdapter):
     """
@@ -254,7 +526,7 @@ class STDIOAgentAdapter(AgentAdapter):
     适用于通过 STDIN/STDOUT 交互的 Agent，支持长期运行的进程。
 
     Example:
-        >>> adapter = STDIOAgentAdapter("java -jar agent.jar")
+        >>> adapter = STDIOAgentAdapter("java -jar agent.jar", ready_marker="READY\n")
         >>> response = adapter.invoke("问题1")
         >>> response = adapter.invoke("问题2")  # 复用同一进程
         >>> adapter.cleanup()
@@ -266,7 +538,8 @@ class STDIOAgentAdapter(AgentAdapter):
         end_marker: str = "\n",
         init_timeout: int = 10,
         response_timeout: int = 30,
-        encoding: str = "utf-8"
+        encoding: str = "utf-8",
+        ready_marker: Optional[str] = None
     ):
         """
         初始化 STDIO Agent 适配器
@@ -277,30 +550,103 @@ class STDIOAgentAdapter(AgentAdapter):
             init_timeout: 初始化超时时间（秒）
             response_timeout: 响应超时时间（秒）
             encoding: 编码格式
+            ready_marker: Agent 启动完成后输出的就绪标记（可选）。设置后，
+                启动进程时会等待该标记出现（最长 init_timeout 秒），
+                标记之前的输出会被丢弃
         """
         self.command = command
         self.end_marker = end_marker
         self.init_timeout = init_timeout
         self.response_timeout = response_timeout
         self.encoding = encoding
+        self.ready_marker = ready_marker
         self.process: Optional[subprocess.Popen] = None
 
+        # 命令只解析一次，进程重启时直接复用
+        self._argv = shlex.split(command, posix=os.name != "nt")
+
+        # stdout 以无缓冲字节流读取，由 selector 等待可读，数据累积在 _read_buffer
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._read_buffer = bytearray()
+        self._end_marker_bytes = (end_marker or "\n").encode(encoding)
+        self._ready_marker_bytes = ready_marker.encode(encoding) if ready_marker else None
+
         logger.info(f"Initialized STDIO adapter: {self.command}")
 
     def _ensure_process(self):
         """确保进程已启动"""
         if self.process is None or self.process.poll() is not None:
             logger.debug("Starting agent process...")
+            self._close_selector()
+            self._read_buffer.clear()
             self.process = subprocess.Popen(
-                self.command.split(),
+                self._argv,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                encoding=self.encoding
+                bufsize=0
             )
-            time.sleep(0.5)  # 等待进程启动
+            if _SELECT_PIPES:
+                self._selector = selectors.DefaultSelector()
+                self._selector.register(self.process.stdout, selectors.EVENT_READ)
+
+            if self._ready_marker_bytes is not None:
+                try:
+                    self._wait_ready()
+                except Exception:
+                    self.cleanup()
+                    raise
+
+    def _wait_ready(self):
+        """等待 Agent 输出就绪标记"""
+        deadline = time.monotonic() + self.init_timeout
+        self._read_until(self._ready_marker_bytes, deadline, self.init_timeout)
+
+        if self.process.poll() is not None:
+            raise RuntimeError(
+                f"Agent 进程在就绪前退出 (exit code {self.process.returncode})"
+            )
+
+    def _close_selector(self):
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+
+    def _read_until(self, marker: bytes, deadline: float, timeout: float) -> bytes:
+        """
+        读取输出直到 marker 出现，返回 marker 之前的数据
+
+        数据累积在同一个 bytearray 中，多行响应无需逐行拼接。每次读取前都在
+        剩余时间内等待 stdout 可读，因此 Agent 无响应时也能按时超时。进程关闭
+        输出时返回已读取的剩余数据。
+        """
+        buffer = self._read_buffer
+        stdout = self.process.stdout
+        search_from = 0
+
+        while True:
+            end = buffer.find(marker, search_from)
+            if end >= 0:
+                response = bytes(buffer[:end])
+                del buffer[:end + len(marker)]
+                return response
+            # 标记可能跨越两次读取，只需从末尾 len(marker) - 1 字节处继续查找
+            search_from = max(0, len(buffer) - len(marker) + 1)
+
+            if self._selector is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._selector.select(remaining):
+                    raise TimeoutError(f"响应超时 ({timeout}秒)")
+                chunk = os.read(stdout.fileno(), 65536)
+            else:
+                chunk = stdout.readline()
+
+            if not chunk:
+                response = bytes(buffer)
+                buffer.clear()
+                return response
+
+            buffer += chunk
 
     def invoke(self, prompt: str, **kwargs) -> str:
         """
@@ -322,33 +668,19 @@ class STDIOAgentAdapter(AgentAdapter):
         try:
             if kwargs:
                 data = {"prompt": prompt, **kwargs}
-                input_str = json.dumps(data, ensure_ascii=False) + self.end_marker
+                input_str = _json_dumps(data) + self.end_marker
             else:
                 input_str = prompt + self.end_marker
 
             logger.debug(f"Sending: {input_str[:200]}...")
-            self.process.stdin.write(input_str)
+            self.process.stdin.write(input_str.encode(self.encoding))
             self.process.stdin.flush()
 
             # 读取响应
-            output_lines = []
-            start_time = time.time()
-
-            while True:
-                if time.time() - start_time > self.response_timeout:
-                    raise TimeoutError(f"响应超时 ({self.response_timeout}秒)")
-
-                line = self.process.stdout.readline()
-                if not line:
-                    break
-
-                output_lines.append(line.rstrip('\n'))
-
-                # 检查是否是完整响应
-                if line.endswith('\n'):
-                    break
+            deadline = time.monotonic() + self.response_timeout
+            response = self._read_until(self._end_marker_bytes, deadline, self.response_timeout)
 
-            output = '\n'.join(output_lines)
+            output = response.decode(self.encoding).rstrip('\n')
             logger.debug(f"Received: {output[:200]}...")
 
             return output
@@ -360,6 +692,8 @@ class STDIOAgentAdapter(AgentAdapter):
 
     def cleanup(self):
         """终止 Agent 进程"""
+        self._close_selector()
+        self._read_buffer.clear()
         if self.process:
             logger.debug("Terminating agent process...")
             try:
@@ -488,27 +822,51 @@ class UniversalAgentTester:
         ...     agent_name="nodejs_agent"
         ... )
         >>> print(f"通过: {result['passed']}/{result['total']}")
+
+    启用 async_writes 时，使用完毕后需调用 close()（或使用 with 语句），
+    以写完排队中的 trace 并停止后台写入线程。
     """
 
-    def __init__(self, adapter: AgentAdapter, store: Any):
+    def __init__(
+        self,
+        adapter: AgentAdapter,
+        store: Any,
+        cache: Optional[TesterCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        async_writes: bool = False
+    ):
         """
         初始化通用测试器
 
         Args:
             adapter: Agent 适配器实例
             store: TraceStore 实例
+            cache: 响应缓存（可选），命中时跳过 Agent 调用
+            semantic_cache: 语义缓存（可选），在精确缓存未命中后查询
+            async_writes: 是否由后台线程写入 trace。启用后 test() 不等待
+                trace 写入完成，读取 store 前需调用 flush()，结束时需调用
+                close()
         """
         self.adapter = adapter
         self.store = store
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+
+        # TraceStore 不是线程安全的，并发测试时串行化对 store 的访问
+        self._store_lock = threading.Lock()
+        self._writer = AsyncTraceWriter(store, lock=self._store_lock) if async_writes else None
+
+        self._adapter_type_name = type(adapter).__name__
 
-        logger.info(f"Initialized UniversalAgentTester with {type(adapter).__name__}")
+        logger.info(f"Initialized UniversalAgentTester with {self._adapter_type_name}")
 
     def test(
         self,
         task: Dict[str, Any],
         agent_name: str,
         task_id: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        cache_bypass: bool = False
     ) -> Dict[str, Any]:
         """
         执行单个测试
@@ -518,6 +876,7 @@ class UniversalAgentTester:
             agent_name: Agent 名称
             task_id: 任务 ID（可选）
             metadata: 额外元数据（可选）
+            cache_bypass: 是否跳过响应缓存，强制调用 Agent
 
         Returns:
             测试结果字典，包含:
@@ -528,8 +887,6 @@ class UniversalAgentTester:
                 - results: 详细断言结果
                 - duration: 执行时长（秒）
         """
-        from tigerhill.eval.assertions import run_assertions
-
         prompt = task.get("prompt", "")
         assertions = task.get("assertions", [])
 
@@ -539,13 +896,17 @@ class UniversalAgentTester:
         # 开始追踪
         metadata = metadata or task.get("trace_metadata")
 
-        trace_id = self.store.start_trace(
-            agent_name=agent_name,
-            task_id=task_id,
-            metadata=metadata
-        )
+        with self._store_lock:
+            trace_id = self.store.start_trace(
+                agent_name=agent_name,
+                task_id=task_id,
+                metadata=metadata
+            )
 
-        start_time = time.time()
+        start_time = time.monotonic()
+
+        # 事件先缓存在本地，结束时一次性写入 store
+        events: List[Tuple[Dict[str, Any], EventType, float]] = []
 
         try:
             # 记录提示
@@ -557,33 +918,52 @@ class UniversalAgentTester:
             if messages:
                 prompt_event["messages"] = messages
 
-            self.store.write_event(
-                prompt_event,
-                event_type=EventType.PROMPT
-            )
+            events.append((prompt_event, EventType.PROMPT, time.time()))
 
-            # 调用 Agent
+            # 调用 Agent（启用缓存时优先读取缓存）
             logger.info(f"Testing {agent_name}: {prompt[:50]}...")
-            output = self.adapter.invoke(prompt)
+            adapter_type = self._adapter_type_name
+            cache = None if cache_bypass else self.cache
+            semantic_cache = None if cache_bypass else self.semantic_cache
+            cache_status = None
+            output = None
+
+            if cache is not None:
+                cache_key = cache.make_key(agent_name, prompt, adapter_type)
+                output = cache.get(cache_key)
+                cache_status = "MISS" if output is None else "HIT"
+
+            if output is None and semantic_cache is not None:
+                embedding = semantic_cache.embed(prompt)
+                output = semantic_cache.lookup(embedding)
+                cache_status = "MISS" if output is None else "SEMANTIC-HIT"
+
+            if output is None:
+                output = self.adapter.invoke(prompt)
+                if cache is not None:
+                    cache.set(cache_key, output)
+                if semantic_cache is not None:
+                    semantic_cache.add(embedding, output)
 
             # 记录响应
-            self.store.write_event(
-                {
-                    "type": "model_response",
-                    "text": output,
-                    "adapter_type": type(self.adapter).__name__
-                },
-                event_type=EventType.MODEL_RESPONSE
-            )
+            response_event = {
+                "type": "model_response",
+                "text": output,
+                "adapter_type": adapter_type
+            }
+            if cache_status is not None:
+                response_event["cache"] = cache_status
+
+            events.append((response_event, EventType.MODEL_RESPONSE, time.time()))
 
             # 评估断言
             results = run_assertions(output, assertions) if assertions else []
             passed = sum(1 for r in results if r.get("ok", False))
 
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
 
             # 记录评估结果
-            self.store.write_event(
+            events.append((
                 {
                     "type": "evaluation",
                     "passed": passed,
@@ -591,8 +971,9 @@ class UniversalAgentTester:
                     "duration_seconds": duration,
                     "assertions": results,
                 },
-                event_type=EventType.CUSTOM
-            )
+                EventType.CUSTOM,
+                time.time()
+            ))
 
             logger.info(f"Test completed: {passed}/{len(results)} passed in {duration:.2f}s")
 
@@ -607,19 +988,20 @@ class UniversalAgentTester:
             }
 
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.monotonic() - start_time
 
             logger.error(f"Test failed: {e}")
 
             # 记录错误
-            self.store.write_event(
+            events.append((
                 {
                     "type": "error",
                     "error": str(e),
                     "error_type": type(e).__name__
                 },
-                event_type=EventType.ERROR
-            )
+                EventType.ERROR,
+                time.time()
+            ))
 
             return {
                 "trace_id": trace_id,
@@ -633,29 +1015,83 @@ class UniversalAgentTester:
             }
 
         finally:
-            self.store.end_trace(trace_id)
+            # 显式传入 trace_id，不依赖 store 的当前 trace
+            if self._writer is not None:
+                self._writer.submit(trace_id, events)
+            else:
+                with self._store_lock:
+                    _write_events(self.store, events, trace_id)
+                    self.store.end_trace(trace_id)
+
+    def flush(self):
+        """等待后台线程写完所有 trace（未启用 async_writes 时无操作）"""
+        if self._writer is not None:
+            self._writer.join()
+
+    def close(self):
+        """写完所有排队中的 trace 并停止后台写入线程；之后的测试同步写入"""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
 
     def test_batch(
         self,
         tasks: List[Dict[str, Any]],
         agent_name: str,
-        cleanup_between_tests: bool = False
+        cleanup_between_tests: bool = False,
+        concurrency: int = 1
     ) -> List[Dict[str, Any]]:
         """
         批量测试多个任务
 
+        concurrency > 1 时使用线程池并发执行，适合 I/O 密集的 adapter。可并发
+        调用的 adapter：HTTPAgentAdapter（每个线程一个 Session）、CLIAgentAdapter
+        （每次调用一个进程，或从 worker 池中独占一个 worker）与 AgentBayAdapter。
+        STDIOAgentAdapter 只有一个进程，以及需要在测试间清理 adapter 时，始终
+        顺序执行；自定义 adapter 的 invoke 需自行保证线程安全。
+
         Args:
             tasks: 任务列表
             agent_name: Agent 名称
             cleanup_between_tests: 是否在测试间清理 adapter
+            concurrency: 最大并发测试数
 
         Returns:
-            测试结果列表
+            测试结果列表（与 tasks 顺序一致）
         """
+        total = len(tasks)
+
+        if (
+            concurrency > 1
+            and total > 1
+            and not cleanup_between_tests
+            and not isinstance(self.adapter, STDIOAgentAdapter)
+        ):
+            logger.info(f"Running {total} tests with concurrency={concurrency}")
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [
+                    executor.submit(
+                        self.test,
+                        task=task,
+                        agent_name=agent_name,
+                        task_id=f"batch_{i}"
+                    )
+                    for i, task in enumerate(tasks, 1)
+                ]
+                return [future.result() for future in futures]
+
         results = []
 
         for i, task in enumerate(tasks, 1):
-            logger.info(f"Running test {i}/{len(tasks)}")
+            logger.info(f"Running test {i}/{total}")
 
             result = self.test(
                 task=task,
@@ -681,10 +1117,19 @@ class UniversalAgentTester:
             汇总报告
         """
         total_tests = len(results)
-        successful_tests = sum(1 for r in results if r.get("success", False))
-        total_passed = sum(r.get("passed", 0) for r in results)
-        total_assertions = sum(r.get("total", 0) for r in results)
-        total_duration = sum(r.get("duration", 0) for r in results)
+        successful_tests = 0
+        total_passed = 0
+        total_assertions = 0
+        total_duration = 0
+
+        # 单次遍历汇总所有字段
+        for r in results:
+            get = r.get
+            if get("success", False):
+                successful_tests += 1
+            total_passed += get("passed", 0)
+            total_assertions += get("total", 0)
+            total_duration += get("duration", 0)
 
         return {
             "total_tests": total_tests,
@@ -1,6 +1,7 @@
 from typing import Any, Dict, List, Optional
+from pydantic import TypeAdapter
 from tigerhill.core.models import Agent, AgentOutput, Task, Environment
-from tigerhill.gateway.base import LLMClient, Message, ModelResponse
+from tigerhill.gateway.base import LLMClient, Message, ModelResponse, ToolCall
 from tigerhill.tools.mcp_shim import ToolShimMCP
 from tigerhill.storage.trace_store import TraceStore
 from tigerhill.otel.telemetry import get_tracer
@@ -8,6 +9,10 @@ from tigerhill.agentbay.client import AgentBayClient
 from .registry import agent_registry
 from .prompt_builder import PromptBuilder
 
+# Dump whole lists in one pydantic-core call instead of model_dump() per item
+_MESSAGES_ADAPTER = TypeAdapter(List[Message])
+_TOOL_CALLS_ADAPTER = TypeAdapter(List[ToolCall])
+
 
 class DynamicAgent(Agent):
     name: str = "dynamic_agent"
@@ -17,6 +22,8 @@ class DynamicAgent(Agent):
         self.client = client
         self.agentbay_client = agentbay_client
         self.system_prompt = system_prompt
+        # Reused across runs so the system/tools prefix is built only when the tool set changes
+        self._prompt_builder = PromptBuilder(system_prompt)
         # If tools are not provided, initialize ToolShimMCP, potentially with AgentBayClient
         if tools is None:
             self.tools = ToolShimMCP(mode="agentbay_live" if agentbay_client else "replay", agentbay_client=agentbay_client)
@@ -50,14 +57,14 @@ class DynamicAgent(Agent):
                                 print(f"WARNING: AgentBay tool {t} is missing 'name' or 'schema' and cannot be registered.")
 
             # For now, we'll assume a simple system prompt. This could be part of the Task or Agent config.
-            pb = PromptBuilder(self.system_prompt)
+            self._prompt_builder.system_prompt = self.system_prompt
             # Pass the tools obtained from AgentBay (if any) to the prompt builder
-            messages = pb.build(task.prompt, agentbay_tools_list)
+            messages = self._prompt_builder.build(task.prompt, agentbay_tools_list)
 
-            self.store.write_event({"type": "prompt", "messages": [m.model_dump() for m in messages]})
+            self.store.write_event({"type": "prompt", "messages": _MESSAGES_ADAPTER.dump_python(messages, exclude_none=True)})
 
             mr: ModelResponse = self.client.chat(messages)
-            self.store.write_event({"type": "model_response", "text": mr.text, "tool_calls": [tc.model_dump() for tc in mr.tool_calls]})
+            self.store.write_event({"type": "model_response", "text": mr.text, "tool_calls": _TOOL_CALLS_ADAPTER.dump_python(mr.tool_calls) if mr.tool_calls else []})
 
             # Execute tool calls
             tool_results: List[Dict[str, Any]] = []
@@ -1,19 +1,46 @@
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from tigerhill.gateway.base import Message
 
 
+# Marks a message as the end of a cacheable prompt prefix (Anthropic-style
+# breakpoint). Only static content may carry it: any dynamic value in a
+# cached message changes the prefix and defeats provider prompt caching.
+# Read-only; each Message gets its own copy.
+CACHE_CONTROL_EPHEMERAL: Mapping[str, Any] = MappingProxyType({"type": "ephemeral"})
+
+
 class PromptBuilder:
     def __init__(self, system_prompt: str):
         self.system_prompt = system_prompt
+        # Contents of the last built static prefix, keyed by system prompt and
+        # sorted tool names
+        self._prefix_key: Optional[Tuple[str, Tuple[str, ...]]] = None
+        self._prefix: Tuple[str, ...] = ()
+
+    def _prefix_contents(self, tools: Optional[List[Dict[str, Any]]]) -> Tuple[str, ...]:
+        # Sorted so the cached prefix does not depend on tool load order
+        names = tuple(sorted(t.get("name", "tool") for t in tools)) if tools else ()
+        key = (self.system_prompt, names)
+        if key != self._prefix_key:
+            prefix = []
+            # Providers reject empty system messages
+            system_content = self.system_prompt.strip()
+            if system_content:
+                prefix.append(system_content)
+            if names:
+                prefix.append("Tools available:\n" + "\n".join(f"- {name}" for name in names))
+            self._prefix = tuple(prefix)
+            self._prefix_key = key
+        return self._prefix
 
     def build(self, user_input: str, tools: Optional[List[Dict[str, Any]]] = None) -> List[Message]:
-        tool_desc = ""
-        if tools:
-            names = [t.get("name", "tool") for t in tools]
-            tool_names = [f"- {name}" for name in names]
-            tool_desc = "\n\nTools available:\n" + "\n".join(tool_names)
-        system_content = f"{self.system_prompt}{tool_desc}".strip()
-        return [
-            Message(role="system", content=system_content),
-            Message(role="user", content=user_input),
+        # Static prefix first: system prompt, then the tool list, each marked
+        # cacheable; the per-request user input comes last, uncached. Only the
+        # prefix text is reused, so callers may modify the returned messages.
+        messages = [
+            Message(role="system", content=content, cache_control=dict(CACHE_CONTROL_EPHEMERAL))
+            for content in self._prefix_contents(tools)
         ]
+        messages.append(Message(role="user", content=user_input))
+        return messages
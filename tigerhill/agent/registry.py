@@ -1,21 +1,48 @@
-from typing import Dict, Type
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Type
 from tigerhill.core.models import Agent
 
 
 class AgentRegistry:
     def __init__(self):
         self._agents: Dict[str, Type[Agent]] = {}
+        # Mapping lookups go through: _agents itself, or a read-only copy once frozen
+        self._lookup: Mapping[str, Type[Agent]] = self._agents
+        self._sorted_names: Optional[Tuple[str, ...]] = None
+        self._frozen = False
 
     def register(self, agent_class: Type[Agent]):
+        if self._frozen:
+            raise RuntimeError(f"Cannot register agent '{agent_class.name}': registry is frozen.")
         self._agents[agent_class.name] = agent_class
+        self._sorted_names = None
+
+    def freeze(self):
+        # Call once all agent modules are imported; lookups then go through a
+        # read-only view and further registration is rejected
+        if not self._frozen:
+            self._lookup = MappingProxyType(dict(self._agents))
+            self._sorted_names = tuple(sorted(self._agents))
+            self._frozen = True
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
 
     def get_agent(self, name: str) -> Type[Agent]:
-        if name not in self._agents:
-            raise ValueError(f"Agent '{name}' not found in registry.")
-        return self._agents[name]
+        try:
+            return self._lookup[name]
+        except KeyError:
+            raise ValueError(f"Agent '{name}' not found in registry.") from None
+
+    def list_agents(self) -> List[str]:
+        # Sorted by name; a new list each call, so callers may modify it
+        if self._sorted_names is None:
+            self._sorted_names = tuple(sorted(self._agents))
+        return list(self._sorted_names)
 
-    def list_agents(self) -> list[str]:
-        return list(self._agents.keys())
+    def __contains__(self, name: str) -> bool:
+        return name in self._lookup
 
 
 agent_registry = AgentRegistry()
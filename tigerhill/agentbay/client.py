@@ -6,13 +6,38 @@ a TigerHill-specific interface for managing AgentBay sessions,
 environments, and tool execution.
 """
 
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
 import os
 import logging
-from typing import Any, Dict, List, Optional
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Coroutine, Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# dataclass(slots=True) needs Python 3.10+; older interpreters keep __dict__
+_DATACLASS_OPTIONS: Dict[str, Any] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+if sys.version_info >= (3, 9):
+    _to_thread = asyncio.to_thread
+else:
+    async def _to_thread(func, *args, **kwargs):
+        # asyncio.to_thread() needs Python 3.9+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
 
 class EnvironmentType(str, Enum):
     """Supported AgentBay environment types."""
@@ -30,6 +55,132 @@ class SessionStatus(str, Enum):
     ERROR = "error"
 
 
+def _command_result(result: Any) -> Dict[str, Any]:
+    # One attribute access per field; only a result without .output (the
+    # unusual case) pays for the exception
+    try:
+        output = result.output
+    except AttributeError:
+        output = str(result)
+    return {
+        "output": output,
+        "exit_code": getattr(result, "exit_code", 0),
+        "error": getattr(result, "error", None)
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _agentbay_cls():
+    # Imported once per process; a failed import is not cached and is retried
+    try:
+        from agentbay import AgentBay
+    except ImportError as e:
+        raise ImportError(
+            "Failed to import wuying-agentbay-sdk. "
+            "Please install it: pip install wuying-agentbay-sdk"
+        ) from e
+    return AgentBay
+
+
+def preload_sdk() -> None:
+    """
+    Imports wuying-agentbay-sdk ahead of the first client.
+
+    Call at application startup so the first request that creates an
+    AgentBayClient does not pay the SDK import time.
+
+    Raises:
+        ImportError: If wuying-agentbay-sdk is not installed.
+    """
+    _agentbay_cls()
+
+
+# Environment types by value, so unknown names are a dict miss, not an exception
+_ENV_BY_NAME: Dict[str, EnvironmentType] = {e.value: e for e in EnvironmentType}
+
+# Standard AgentBay tools, by tool set ID. Shared by every load_tools() call,
+# hence read-only.
+_STANDARD_TOOLS: Mapping[str, Sequence[Dict[str, Any]]] = MappingProxyType({
+    "browser": (
+        {
+            "name": "browser_navigate",
+            "description": "Navigate to a URL in the browser",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string"}
+                },
+                "required": ["url"]
+            }
+        },
+    ),
+    "command": (
+        {
+            "name": "execute_command",
+            "description": "Execute a shell command",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "command": {"type": "string"}
+                },
+                "required": ["command"]
+            }
+        },
+    ),
+    "file": (
+        {
+            "name": "file_read",
+            "description": "Read a file",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "path": {"type": "string"}
+                },
+                "required": ["path"]
+            }
+        },
+    )
+})
+
+
+@dataclass(**_DATACLASS_OPTIONS)
+class SessionRecord:
+    """Local bookkeeping for an AgentBay session."""
+    id: str
+    session: Any
+    env_type: Optional[EnvironmentType]
+    config: Optional[Dict[str, Any]]
+    status: SessionStatus
+    created_at: float  # time.monotonic()
+
+
+# Read-only tools whose result depends only on their arguments (and session),
+# eligible for the tool result cache. Any other tool, and any command, may
+# change the session and drops its cached results.
+IDEMPOTENT_TOOLS = frozenset({"file_read"})
+
+
+# Tool argument value replaced by the result of the call named in input_from
+PREV_RESULT = "$prev"
+
+
+@dataclass
+class ToolCall:
+    """
+    One call in an AsyncAgentBayClient.execute_tool_batch request.
+
+    Attributes:
+        tool_name: The name of the tool to execute.
+        tool_args: The arguments for the tool. Values equal to PREV_RESULT are
+            replaced by the result of the call at index input_from.
+        input_from: Index of an earlier call in the batch this call depends
+            on, or -1 if it is independent.
+    """
+    tool_name: str
+    tool_args: Dict[str, Any] = field(default_factory=dict)
+    input_from: int = -1
+
+
 class AgentBayClient:
     """
     Client for interacting with the AgentBay platform.
@@ -39,13 +190,16 @@ class AgentBayClient:
     capabilities for TigerHill's evaluation workflows.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, tool_cache_size: int = 0):
         """
         Initializes the AgentBayClient.
 
         Args:
             api_key: The API key for AgentBay. If not provided, it will try to
                     read from AGENTBAY_API_KEY environment variable.
+            tool_cache_size: Maximum number of cached results of
+                    IDEMPOTENT_TOOLS calls, evicted least recently used
+                    first. 0 disables the cache.
 
         Raises:
             ValueError: If no API key is provided or found in environment.
@@ -62,17 +216,16 @@ class AgentBayClient:
         # Set environment variable for SDK
         os.environ["AGENTBAY_API_KEY"] = self.api_key
 
-        # Import and initialize SDK
-        try:
-            from agentbay import AgentBay
-            self._sdk = AgentBay()
-            self._sessions: Dict[str, Any] = {}  # session_id -> session object
-            logger.info("AgentBay SDK initialized successfully")
-        except ImportError as e:
-            raise ImportError(
-                "Failed to import wuying-agentbay-sdk. "
-                "Please install it: pip install wuying-agentbay-sdk"
-            ) from e
+        # (session_id, tool_name, args digest) -> result, least recently used first
+        self.tool_cache_size = tool_cache_size
+        self._tool_cache: "OrderedDict[Tuple[Optional[str], str, str], Dict[str, Any]]" = OrderedDict()
+        self._tool_cache_lock = threading.Lock()
+
+        self._sdk = _agentbay_cls()()
+        self._sessions: Dict[str, SessionRecord] = {}
+        # Runs commands that have a timeout; created on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
+        logger.info("AgentBay SDK initialized successfully")
 
     def create_session(
         self,
@@ -93,40 +246,42 @@ class AgentBayClient:
                 "session": object,  # Internal session object
                 "status": str,
                 "env_type": str,
-                "created_at": str
+                "created_at": float  # Unix timestamp
             }
 
         Raises:
             RuntimeError: If session creation fails.
         """
         try:
-            logger.info(f"Creating AgentBay session with env_type={env_type}, config={config}")
+            logger.info("Creating AgentBay session with env_type=%s, config=%s", env_type, config)
 
             # Create session using SDK
             session_result = self._sdk.create()
             session = session_result.session
-            session_id = id(session)  # Use object id as session identifier
-
-            # Store session
-            self._sessions[str(session_id)] = {
-                "session": session,
-                "env_type": env_type,
-                "config": config,
-                "status": SessionStatus.ACTIVE
-            }
+            # Not id(session): object ids are reused once a session is freed
+            session_id = uuid.uuid4().hex
+
+            self._sessions[session_id] = SessionRecord(
+                id=session_id,
+                session=session,
+                env_type=env_type,
+                config=config,
+                status=SessionStatus.ACTIVE,
+                created_at=time.monotonic()
+            )
 
-            logger.info(f"Session created successfully: {session_id}")
+            logger.info("Session created successfully: %s", session_id)
 
             return {
-                "session_id": str(session_id),
+                "session_id": session_id,
                 "session": session,
                 "status": SessionStatus.ACTIVE,
                 "env_type": env_type.value if env_type else "default",
-                "created_at": "now"  # TODO: Add actual timestamp
+                "created_at": time.time()
             }
 
         except Exception as e:
-            logger.error(f"Failed to create AgentBay session: {e}")
+            logger.error("Failed to create AgentBay session: %s", e)
             raise RuntimeError(f"Session creation failed: {e}") from e
 
     def delete_session(self, session_id: str) -> bool:
@@ -140,25 +295,24 @@ class AgentBayClient:
             True if deletion was successful, False otherwise.
         """
         try:
-            if session_id not in self._sessions:
-                logger.warning(f"Session {session_id} not found")
+            record = self._sessions.get(session_id)
+            if record is None:
+                logger.warning("Session %s not found", session_id)
                 return False
 
-            session_data = self._sessions[session_id]
-            session = session_data["session"]
-
-            logger.info(f"Deleting session {session_id}")
-            self._sdk.delete(session)
+            logger.info("Deleting session %s", session_id)
+            self._sdk.delete(record.session)
 
             # Update status and remove from cache
-            session_data["status"] = SessionStatus.TERMINATED
-            del self._sessions[session_id]
+            record.status = SessionStatus.TERMINATED
+            self._sessions.pop(session_id, None)
+            self._tool_cache_invalidate(session_id)
 
-            logger.info(f"Session {session_id} deleted successfully")
+            logger.info("Session %s deleted successfully", session_id)
             return True
 
         except Exception as e:
-            logger.error(f"Failed to delete session {session_id}: {e}")
+            logger.error("Failed to delete session %s: %s", session_id, e)
             return False
 
     def execute_command(
@@ -173,7 +327,9 @@ class AgentBayClient:
         Args:
             session_id: The ID of the session.
             command: The command to execute.
-            timeout: Optional timeout in seconds.
+            timeout: Optional timeout in seconds. On timeout the session is
+                    marked as errored and deleted, since the command may still
+                    be running in it.
 
         Returns:
             A dictionary containing command execution result:
@@ -187,27 +343,80 @@ class AgentBayClient:
             ValueError: If session not found.
             RuntimeError: If command execution fails.
         """
-        if session_id not in self._sessions:
+        record = self._sessions.get(session_id)
+        if record is None:
             raise ValueError(f"Session {session_id} not found")
 
         try:
-            session_data = self._sessions[session_id]
-            session = session_data["session"]
+            session = record.session
 
-            logger.info(f"Executing command in session {session_id}: {command}")
+            logger.debug("Executing command in session %s: %s", session_id, command)
 
-            result = session.command.execute_command(command)
+            if timeout is None:
+                result = session.command.execute_command(command)
+            else:
+                future = self._get_executor().submit(session.command.execute_command, command)
+                result = future.result(timeout=timeout)
 
-            return {
-                "output": result.output if hasattr(result, 'output') else str(result),
-                "exit_code": getattr(result, 'exit_code', 0),
-                "error": getattr(result, 'error', None)
-            }
+            return _command_result(result)
+
+        except FutureTimeoutError:
+            logger.error("Command timed out after %ss in session %s", timeout, session_id)
+            self._fail_session(session_id)
+            raise RuntimeError(f"Command timed out after {timeout}s") from None
 
         except Exception as e:
-            logger.error(f"Command execution failed in session {session_id}: {e}")
+            logger.error("Command execution failed in session %s: %s", session_id, e)
             raise RuntimeError(f"Command execution failed: {e}") from e
 
+        finally:
+            # The command may have changed what cached tool results read
+            self._tool_cache_invalidate(session_id)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="agentbay-command")
+        return self._executor
+
+    def _mark_error(self, session_id: str) -> bool:
+        # The session may still be busy with an abandoned call: mark it so it
+        # is not reused
+        record = self._sessions.get(session_id)
+        if record is None:
+            return False
+        record.status = SessionStatus.ERROR
+        return True
+
+    def _fail_session(self, session_id: str) -> None:
+        if self._mark_error(session_id):
+            self.delete_session(session_id)
+
+    def execute_commands(
+        self,
+        session_id: str,
+        commands: List[str],
+        timeout: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Executes several commands in an AgentBay session, in order.
+
+        The SDK has no batch endpoint, so this issues one call per command;
+        use AsyncAgentBayClient.execute_commands to overlap them.
+
+        Args:
+            session_id: The ID of the session.
+            commands: The commands to execute.
+            timeout: Optional timeout in seconds for each command.
+
+        Returns:
+            One result dictionary per command (see execute_command), in order.
+
+        Raises:
+            ValueError: If session not found.
+            RuntimeError: If a command execution fails.
+        """
+        return [self.execute_command(session_id, command, timeout) for command in commands]
+
     def execute_tool(
         self,
         tool_name: str,
@@ -218,6 +427,10 @@ class AgentBayClient:
         Executes a specific tool within an AgentBay environment.
 
         This method maps TigerHill tool calls to AgentBay SDK operations.
+        When the tool cache is enabled, results of IDEMPOTENT_TOOLS calls are
+        reused for the same tool, arguments and session_id (calls without a
+        session_id share entries, as each runs in a fresh session). Any other
+        tool drops the cached results of its session_id.
 
         Args:
             tool_name: The name of the tool to execute.
@@ -230,6 +443,12 @@ class AgentBayClient:
         Raises:
             ValueError: If tool_name is not supported.
         """
+        cache_key = self._tool_cache_key(tool_name, tool_args, session_id)
+        if cache_key is not None:
+            cached = self._tool_cache_get(cache_key)
+            if cached is not None:
+                return cached
+
         # Determine if we need to create a temporary session
         temp_session = False
         if session_id is None:
@@ -239,31 +458,63 @@ class AgentBayClient:
             temp_session = True
 
         try:
-            # Map tool names to AgentBay operations
-            if tool_name in ["command", "terminal", "bash", "shell"]:
-                # Execute as shell command
-                cmd = tool_args.get("command") or tool_args.get("cmd")
-                if not cmd:
-                    raise ValueError(f"Missing 'command' argument for tool {tool_name}")
-
-                result = self.execute_command(session_id, cmd)
-                return {"tool_name": tool_name, "result": result["output"]}
-
-            elif tool_name in ["file", "file_read", "file_write"]:
-                # File operations
-                logger.warning(f"File tool '{tool_name}' not yet fully implemented")
-                return {
-                    "tool_name": tool_name,
-                    "result": f"File operation {tool_name} with args {tool_args}"
-                }
-
-            else:
-                raise ValueError(f"Unsupported tool: {tool_name}")
-
+            result = self._run_tool(tool_name, tool_args, session_id)
         finally:
             # Clean up temporary session
             if temp_session:
                 self.delete_session(session_id)
+            if cache_key is None:
+                self._tool_cache_invalidate(None if temp_session else session_id)
+
+        if cache_key is not None:
+            self._tool_cache_put(cache_key, result)
+        return result
+
+    def _run_tool(self, tool_name: str, tool_args: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+        handler = _TOOL_DISPATCH.get(tool_name)
+        if handler is None:
+            raise ValueError(f"Unsupported tool: {tool_name}")
+        return handler(self, tool_name, tool_args, session_id)
+
+    def _tool_cache_key(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        session_id: Optional[str]
+    ) -> Optional[Tuple[Optional[str], str, str]]:
+        if self.tool_cache_size <= 0 or tool_name not in IDEMPOTENT_TOOLS:
+            return None
+        payload = json.dumps(tool_args, sort_keys=True, default=str)
+        digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+        return (session_id, tool_name, digest)
+
+    def _tool_cache_get(self, key: Tuple[Optional[str], str, str]) -> Optional[Dict[str, Any]]:
+        with self._tool_cache_lock:
+            result = self._tool_cache.get(key)
+            if result is None:
+                return None
+            self._tool_cache.move_to_end(key)
+        # Copy, so callers cannot modify the cached entry
+        return dict(result)
+
+    def _tool_cache_put(self, key: Tuple[Optional[str], str, str], result: Dict[str, Any]) -> None:
+        with self._tool_cache_lock:
+            self._tool_cache[key] = dict(result)
+            self._tool_cache.move_to_end(key)
+            while len(self._tool_cache) > self.tool_cache_size:
+                self._tool_cache.popitem(last=False)
+
+    def _tool_cache_invalidate(self, session_id: Optional[str]) -> None:
+        # Drops the cached results of one session (None: of session-less calls)
+        with self._tool_cache_lock:
+            stale = [key for key in self._tool_cache if key[0] == session_id]
+            for key in stale:
+                del self._tool_cache[key]
+
+    def cache_clear(self) -> None:
+        """Clears the tool result cache."""
+        with self._tool_cache_lock:
+            self._tool_cache.clear()
 
     def request_environment(
         self,
@@ -282,15 +533,13 @@ class AgentBayClient:
         Returns:
             A dictionary containing environment details.
         """
-        try:
-            env_type = EnvironmentType(env_id.lower())
-        except ValueError:
-            logger.warning(f"Unknown environment type: {env_id}, using default")
-            env_type = None
+        env_type = _ENV_BY_NAME.get(env_id.lower())
+        if env_type is None:
+            logger.warning("Unknown environment type: %s, using default", env_id)
 
         return self.create_session(env_type=env_type, config=config)
 
-    def load_tools(self, tool_set_id: str) -> List[Dict[str, Any]]:
+    def load_tools(self, tool_set_id: str) -> Sequence[Dict[str, Any]]:
         """
         Loads a set of tools from AgentBay.
 
@@ -300,52 +549,10 @@ class AgentBayClient:
             tool_set_id: The ID of the tool set to load.
 
         Returns:
-            A list of dictionaries, each representing a tool with name and schema.
-        """
-        # Standard AgentBay tools
-        standard_tools = {
-            "browser": [
-                {
-                    "name": "browser_navigate",
-                    "description": "Navigate to a URL in the browser",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "url": {"type": "string"}
-                        },
-                        "required": ["url"]
-                    }
-                }
-            ],
-            "command": [
-                {
-                    "name": "execute_command",
-                    "description": "Execute a shell command",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "command": {"type": "string"}
-                        },
-                        "required": ["command"]
-                    }
-                }
-            ],
-            "file": [
-                {
-                    "name": "file_read",
-                    "description": "Read a file",
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "path": {"type": "string"}
-                        },
-                        "required": ["path"]
-                    }
-                }
-            ]
-        }
-
-        return standard_tools.get(tool_set_id, [])
+            A read-only sequence of dictionaries, each representing a tool
+            with name and schema. The definitions are shared: do not modify them.
+        """
+        return _STANDARD_TOOLS.get(tool_set_id, ())
 
     def get_session_status(self, session_id: str) -> Dict[str, Any]:
         """
@@ -357,32 +564,41 @@ class AgentBayClient:
         Returns:
             A dictionary containing session status information.
         """
-        if session_id not in self._sessions:
+        record = self._sessions.get(session_id)
+        if record is None:
             return {"session_id": session_id, "status": SessionStatus.ERROR, "error": "Session not found"}
 
-        session_data = self._sessions[session_id]
         return {
             "session_id": session_id,
-            "status": session_data["status"],
-            "env_type": session_data.get("env_type"),
-            "config": session_data.get("config")
+            "status": record.status,
+            "env_type": record.env_type,
+            "config": record.config,
+            "age_seconds": time.monotonic() - record.created_at
         }
 
     def cleanup_all_sessions(self) -> int:
         """
         Cleans up all active sessions.
 
+        Sessions are deleted in parallel on up to 16 threads, so teardown
+        takes about one round trip rather than one per session.
+
         Returns:
             Number of sessions successfully cleaned up.
         """
         session_ids = list(self._sessions.keys())
-        cleaned = 0
 
-        for session_id in session_ids:
-            if self.delete_session(session_id):
-                cleaned += 1
-
-        logger.info(f"Cleaned up {cleaned}/{len(session_ids)} sessions")
+        if len(session_ids) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(16, len(session_ids)),
+                thread_name_prefix="agentbay-cleanup"
+            ) as pool:
+                results = list(pool.map(self.delete_session, session_ids))
+        else:
+            results = [self.delete_session(session_id) for session_id in session_ids]
+        cleaned = sum(1 for result in results if result)
+
+        logger.info("Cleaned up %s/%s sessions", cleaned, len(session_ids))
         return cleaned
 
     def __enter__(self):
@@ -392,4 +608,500 @@ class AgentBayClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit - cleanup all sessions."""
         self.cleanup_all_sessions()
-        return False
\ No newline at end of file
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """Releases client resources. Sessions are left untouched."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _handle_command(
+    client: AgentBayClient,
+    tool_name: str,
+    tool_args: Dict[str, Any],
+    session_id: str
+) -> Dict[str, Any]:
+    # Execute as shell command
+    cmd = tool_args.get("command") or tool_args.get("cmd")
+    if not cmd:
+        raise ValueError(f"Missing 'command' argument for tool {tool_name}")
+
+    result = client.execute_command(session_id, cmd)
+    return {"tool_name": tool_name, "result": result["output"]}
+
+
+def _handle_file(
+    client: AgentBayClient,
+    tool_name: str,
+    tool_args: Dict[str, Any],
+    session_id: str
+) -> Dict[str, Any]:
+    # File operations
+    logger.warning("File tool '%s' not yet fully implemented", tool_name)
+    return {
+        "tool_name": tool_name,
+        "result": f"File operation {tool_name} with args {tool_args}"
+    }
+
+
+# Tool name -> handler(client, tool_name, tool_args, session_id), mapping
+# TigerHill tool calls to AgentBay operations
+_TOOL_DISPATCH: Dict[str, Callable[[AgentBayClient, str, Dict[str, Any], str], Dict[str, Any]]] = {
+    **{name: _handle_command for name in ("command", "terminal", "bash", "shell")},
+    **{name: _handle_file for name in ("file", "file_read", "file_write")},
+}
+
+
+def _release_slot(semaphore: asyncio.Semaphore, task: "asyncio.Future") -> None:
+    # Done callback of an SDK call: frees its concurrency slot and retrieves
+    # the exception of a call nobody awaits any more (timed out or cancelled)
+    semaphore.release()
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncAgentBayClient:
+    """
+    Asyncio client for the AgentBay platform.
+
+    The wuying-agentbay-sdk is synchronous, so every SDK call is offloaded to
+    a worker thread. Sessions, commands and deletes awaited concurrently
+    (e.g. with asyncio.gather) are in flight at the same time, so k calls
+    take roughly the slowest round trip instead of the sum of all of them.
+
+    Session bookkeeping and the SDK instance are those of a wrapped
+    AgentBayClient. Pass an existing client to share its SDK instance (and
+    the connections it keeps) and its sessions with synchronous code.
+
+    execute_tool calls without a session_id borrow a session from a pool
+    kept per environment type instead of creating and deleting a temporary
+    session each time. Idle sessions are deleted after pool_ttl seconds by a
+    background reaper task.
+
+    At most max_inflight SDK calls run at a time; further calls wait, so a
+    large gather() does not flood the AgentBay backend into throttling.
+
+    Example:
+        >>> async with AsyncAgentBayClient() as client:
+        ...     sessions = await asyncio.gather(
+        ...         *(client.create_session() for _ in range(4))
+        ...     )
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_ttl: Optional[float] = 300.0,
+        max_pool_size: int = 8,
+        max_inflight: Optional[int] = None,
+        tool_cache_size: int = 0,
+        client: Optional[AgentBayClient] = None
+    ):
+        """
+        Initializes the AsyncAgentBayClient.
+
+        Args:
+            api_key: The API key for AgentBay. If not provided, it will try to
+                    read from AGENTBAY_API_KEY environment variable.
+            pool_ttl: Seconds an idle pooled session is kept before it is
+                    deleted. None keeps idle sessions until cleanup.
+            max_pool_size: Maximum number of idle sessions kept per
+                    environment type; extra sessions are deleted on release.
+            max_inflight: Maximum number of concurrent SDK calls. Defaults to
+                    the AGENTBAY_MAX_INFLIGHT environment variable, or 32.
+            tool_cache_size: Size of the tool result cache, see AgentBayClient.
+            client: Existing AgentBayClient to wrap. api_key and
+                    tool_cache_size are then ignored, the client is not
+                    closed on exit, and only sessions created through this
+                    wrapper are deleted on cleanup.
+
+        Raises:
+            ValueError: If no API key is provided or found in environment.
+            ImportError: If wuying-agentbay-sdk is not installed.
+        """
+        self._owns_client = client is None
+        if client is None:
+            client = AgentBayClient(api_key=api_key, tool_cache_size=tool_cache_size)
+        self._client = client
+        self.api_key = self._client.api_key
+
+        self.pool_ttl = pool_ttl
+        self.max_pool_size = max_pool_size
+        # Idle sessions per environment type as (session_id, last_used),
+        # oldest on the left
+        self._pool: Dict[Optional[EnvironmentType], Deque[Tuple[str, float]]] = {}
+        self._reaper: Optional["asyncio.Task"] = None
+        # Background tasks started by _spawn()
+        self._pending: Set["asyncio.Task"] = set()
+        # Sessions created through this wrapper, pooled ones included
+        self._created: Set[str] = set()
+
+        if max_inflight is None:
+            max_inflight = int(os.getenv("AGENTBAY_MAX_INFLIGHT", "32"))
+        self._max_inflight = max_inflight
+        # Created on first use, inside the event loop that uses it
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def set_concurrency(self, max_inflight: int) -> None:
+        """
+        Changes the maximum number of concurrent SDK calls.
+
+        Calls already in flight finish under the previous limit.
+
+        Args:
+            max_inflight: New maximum, at least 1.
+
+        Raises:
+            ValueError: If max_inflight is less than 1.
+        """
+        if max_inflight < 1:
+            raise ValueError(f"max_inflight must be at least 1, got {max_inflight}")
+        self._max_inflight = max_inflight
+        self._semaphore = None
+
+    async def _call(self, func, *args, timeout: Optional[float] = None):
+        # Every SDK call goes through here: bounded by the semaphore, run in a
+        # worker thread. The timeout starts once a slot is acquired, so time
+        # spent queued does not count, and the slot is held until the thread
+        # finishes even if the caller stopped waiting for it.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_inflight)
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            task = asyncio.ensure_future(_to_thread(func, *args))
+        except BaseException:
+            semaphore.release()
+            raise
+        task.add_done_callback(functools.partial(_release_slot, semaphore))
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+
+    async def create_session(
+        self,
+        env_type: Optional[EnvironmentType] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Creates a new AgentBay session. See AgentBayClient.create_session.
+
+        Raises:
+            RuntimeError: If session creation fails.
+        """
+        result = await self._call(self._client.create_session, env_type, config)
+        self._created.add(result["session_id"])
+        return result
+
+    async def delete_session(self, session_id: str) -> bool:
+        """
+        Deletes an AgentBay session. See AgentBayClient.delete_session.
+
+        Returns:
+            True if deletion was successful, False otherwise.
+        """
+        deleted = await self._call(self._client.delete_session, session_id)
+        self._created.discard(session_id)
+        return deleted
+
+    async def execute_command(
+        self,
+        session_id: str,
+        command: str,
+        timeout: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Executes a command in an AgentBay session. See AgentBayClient.execute_command.
+
+        On timeout the session is marked as errored and deleted.
+
+        Raises:
+            ValueError: If session not found.
+            RuntimeError: If command execution fails or times out.
+        """
+        try:
+            return await self._call(
+                self._client.execute_command, session_id, command, timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error("Command timed out after %ss in session %s", timeout, session_id)
+            if self._client._mark_error(session_id):
+                self._spawn(self.delete_session(session_id))
+            raise RuntimeError(f"Command timed out after {timeout}s") from None
+
+    async def execute_commands(
+        self,
+        session_id: str,
+        commands: List[str],
+        timeout: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Executes several commands in an AgentBay session concurrently.
+
+        All commands are in flight at once, so the batch costs about one round
+        trip. Their execution order is not guaranteed: only batch commands
+        that do not depend on each other.
+
+        Returns:
+            One result dictionary per command, in the order of commands.
+
+        Raises:
+            ValueError: If session not found.
+            RuntimeError: If a command execution fails.
+        """
+        return list(await asyncio.gather(
+            *(self.execute_command(session_id, command, timeout) for command in commands)
+        ))
+
+    async def execute_tool(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Executes a tool within an AgentBay environment. See AgentBayClient.execute_tool.
+
+        Raises:
+            ValueError: If tool_name is not supported.
+        """
+        if session_id is not None:
+            return await self._call(self._client.execute_tool, tool_name, tool_args, session_id)
+
+        # Cached under session_id None, not under the pooled session's ID
+        cache_key = self._client._tool_cache_key(tool_name, tool_args, None)
+        if cache_key is not None:
+            cached = self._client._tool_cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            async with self._pooled_session() as pooled_id:
+                result = await self._call(self._client._run_tool, tool_name, tool_args, pooled_id)
+        finally:
+            if cache_key is None:
+                self._client._tool_cache_invalidate(None)
+
+        if cache_key is not None:
+            self._client._tool_cache_put(cache_key, result)
+        return result
+
+    def cache_clear(self) -> None:
+        """Clears the tool result cache."""
+        self._client.cache_clear()
+
+    @contextlib.asynccontextmanager
+    async def _pooled_session(
+        self,
+        env_type: Optional[EnvironmentType] = None
+    ) -> AsyncIterator[str]:
+        session_id = await self._acquire(env_type)
+        healthy = True
+        try:
+            yield session_id
+        except RuntimeError:
+            # SDK failure: the session may be broken, do not reuse it
+            healthy = False
+            raise
+        finally:
+            await self._release(env_type, session_id, healthy)
+
+    async def _acquire(self, env_type: Optional[EnvironmentType]) -> str:
+        idle = self._pool.get(env_type)
+        while idle:
+            # Most recently used first
+            session_id, last_used = idle.pop()
+            if self._is_reusable(session_id, last_used):
+                return session_id
+            self._spawn(self.delete_session(session_id))
+
+        self._start_reaper()
+        logger.info("No pooled session available, creating one")
+        return (await self.create_session(env_type))["session_id"]
+
+    async def _release(
+        self,
+        env_type: Optional[EnvironmentType],
+        session_id: str,
+        healthy: bool
+    ) -> None:
+        if self._client.get_session_status(session_id)["status"] != SessionStatus.ACTIVE:
+            # Already failed and being deleted, or gone
+            return
+        idle = self._pool.setdefault(env_type, deque())
+        if healthy and len(idle) < self.max_pool_size:
+            idle.append((session_id, time.monotonic()))
+        else:
+            self._spawn(self.delete_session(session_id))
+
+    def _spawn(self, coro: Coroutine[Any, Any, Any]) -> None:
+        # Fire-and-forget (e.g. session deletes the caller need not wait
+        # for); the set keeps a reference until the task is done
+        task = asyncio.get_running_loop().create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _is_reusable(self, session_id: str, last_used: float) -> bool:
+        if self.pool_ttl is not None and time.monotonic() - last_used > self.pool_ttl:
+            return False
+        return self._client.get_session_status(session_id)["status"] == SessionStatus.ACTIVE
+
+    def _start_reaper(self) -> None:
+        if self.pool_ttl is not None and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_idle_sessions())
+
+    async def _reap_idle_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(self.pool_ttl / 2)
+            expired = []
+            now = time.monotonic()
+            for idle in self._pool.values():
+                while idle and now - idle[0][1] > self.pool_ttl:
+                    expired.append(idle.popleft()[0])
+            if expired:
+                logger.info("Deleting %s idle pooled sessions", len(expired))
+                await asyncio.gather(
+                    *(self.delete_session(session_id) for session_id in expired),
+                    return_exceptions=True
+                )
+
+    async def execute_tool_batch(
+        self,
+        calls: List[ToolCall],
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Executes a batch of tool calls, running independent calls concurrently.
+
+        Calls are grouped into layers by dependency depth: a call runs in the
+        layer after the call it takes input from, and all calls in a layer run
+        concurrently. A chain of N dependent calls therefore costs N round
+        trips, while N independent calls cost one.
+
+        A failed call is reported as {"tool_name", "error"}. Calls depending
+        on it (directly or not) are not executed and get an error starting
+        with "INVALID_ARGUMENT".
+
+        Args:
+            calls: The tool calls. input_from must reference an earlier call.
+            session_id: Optional session ID used for every call.
+
+        Returns:
+            One result dictionary per call, in the order of calls.
+
+        Raises:
+            ValueError: If a call's input_from does not reference an earlier call.
+        """
+        layers: List[List[int]] = []
+        depth: List[int] = []
+        for i, call in enumerate(calls):
+            if call.input_from < 0:
+                level = 0
+            elif call.input_from < i:
+                level = depth[call.input_from] + 1
+            else:
+                raise ValueError(
+                    f"Call {i} ({call.tool_name}) takes input from call {call.input_from}, "
+                    "which is not an earlier call"
+                )
+            depth.append(level)
+            if level == len(layers):
+                layers.append([])
+            layers[level].append(i)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+
+        async def run_call(i: int) -> None:
+            call = calls[i]
+            tool_args = call.tool_args
+            if call.input_from >= 0:
+                source = results[call.input_from]
+                if "error" in source:
+                    results[i] = {
+                        "tool_name": call.tool_name,
+                        "error": f"INVALID_ARGUMENT: input call {call.input_from} failed"
+                    }
+                    return
+                tool_args = {
+                    key: source["result"] if value == PREV_RESULT else value
+                    for key, value in tool_args.items()
+                }
+            try:
+                results[i] = await self.execute_tool(call.tool_name, tool_args, session_id)
+            except Exception as e:
+                logger.error("Batch tool call %s (%s) failed: %s", i, call.tool_name, e)
+                results[i] = {"tool_name": call.tool_name, "error": str(e)}
+
+        for layer in layers:
+            await asyncio.gather(*(run_call(i) for i in layer))
+
+        return results
+
+    async def request_environment(
+        self,
+        env_id: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Requests an environment from AgentBay. See AgentBayClient.request_environment.
+        """
+        return await self._call(self._client.request_environment, env_id, config)
+
+    def load_tools(self, tool_set_id: str) -> Sequence[Dict[str, Any]]:
+        """
+        Loads a set of tools. No SDK call is involved, so this is not a coroutine.
+        """
+        return self._client.load_tools(tool_set_id)
+
+    def get_session_status(self, session_id: str) -> Dict[str, Any]:
+        """
+        Gets the status of an AgentBay session from local bookkeeping.
+        """
+        return self._client.get_session_status(session_id)
+
+    async def cleanup_all_sessions(self) -> int:
+        """
+        Deletes all active sessions, pooled ones included, concurrently.
+
+        When wrapping an existing client, only the sessions created through
+        this wrapper are deleted; those of the synchronous code are kept.
+
+        Returns:
+            Number of sessions successfully cleaned up.
+        """
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        self._pool.clear()
+
+        # Let background deletes finish first, so they are not issued twice
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+        if self._owns_client:
+            session_ids = list(self._client._sessions.keys())
+        else:
+            session_ids = [
+                session_id for session_id in self._created
+                if session_id in self._client._sessions
+            ]
+        results = await asyncio.gather(
+            *(self.delete_session(session_id) for session_id in session_ids),
+            return_exceptions=True
+        )
+        cleaned = sum(1 for result in results if result is True)
+
+        logger.info("Cleaned up %s/%s sessions", cleaned, len(session_ids))
+        return cleaned
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - cleanup all sessions."""
+        await self.cleanup_all_sessions()
+        if self._owns_client:
+            self._client.close()
+        return False
@@ -6,7 +6,14 @@ enabling delta/incremental visualization.
 """
 
 import difflib
-from typing import List, Dict, Set, Tuple, Optional, Any
+from collections import Counter
+from typing import List, Dict, FrozenSet, Literal, Set, Tuple, Optional, Any
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
 from tigerhill.analyzer.models import (
     PromptStructure,
     TurnDiff,
@@ -17,13 +24,160 @@ from tigerhill.analyzer.models import (
 )
 
 
+# 意图指标词表，按指标类型分组，模块加载时构建一次
+_INTENT_INDICATORS: Dict[str, FrozenSet[str]] = {
+    "question_words": frozenset({
+        "what", "how", "why", "when", "where", "who", "which", "whether",
+        "什么", "怎么", "为什么", "何时", "哪里", "谁", "哪个", "是否"
+    }),
+    "action_words": frozenset({
+        "create", "generate", "make", "do", "build", "write", "produce", 
+        "develop", "design", "implement", "写", "创建", "生成", "做", "构建",
+        "开发", "设计", "实现"
+    }),
+    "analysis_words": frozenset({
+        "analyze", "compare", "evaluate", "examine", "study", "assess",
+        "分析", "比较", "评估", "检查", "研究", "审查"
+    }),
+    "problem_words": frozenset({
+        "problem", "issue", "error", "bug", "trouble", "fail", "wrong",
+        "问题", "错误", "故障", "麻烦", "失败"
+    }),
+    "solution_words": frozenset({
+        "solution", "fix", "solve", "resolve", "answer", "help",
+        "解决方案", "修复", "解决", "答案", "帮助"
+    }),
+    "learning_words": frozenset({
+        "learn", "understand", "explain", "teach", "study", "knowledge",
+        "学习", "理解", "解释", "教", "知识"
+    }),
+    "confirmation_words": frozenset({
+        "confirm", "check", "verify", "sure", "correct", "right",
+        "确认", "检查", "验证", "正确"
+    }),
+    "completion_words": frozenset({
+        "done", "complete", "finish", "end", "ready", "finished",
+        "完成", "结束", "准备好"
+    }),
+    "refinement_words": frozenset({
+        "improve", "better", "optimize", "refine", "enhance", "polish",
+        "改进", "更好", "优化", "完善", "提升"
+    })
+}
+
+# 常见的意图转换模式，键为 (源意图, 目标意图)
+_TRANSITION_PATTERNS: Dict[Tuple[str, str], str] = {
+    # 从询问到操作
+    ("INQUIRY", "OPERATION"): "inquiry_to_operation",
+    ("INQUIRY", "CREATION"): "inquiry_to_creation",
+
+    # 从操作到确认
+    ("OPERATION", "CONFIRMATION"): "operation_to_confirmation",
+    ("CREATION", "CONFIRMATION"): "creation_to_confirmation",
+
+    # 从确认到完成
+    ("CONFIRMATION", "COMPLETION"): "confirmation_to_completion",
+
+    # 问题解决流程
+    ("PROBLEM_REPORTING", "ANALYSIS"): "problem_to_analysis",
+    ("ANALYSIS", "SOLUTION"): "analysis_to_solution",
+
+    # 学习流程
+    ("INQUIRY", "LEARNING"): "inquiry_to_learning",
+    ("LEARNING", "APPLICATION"): "learning_to_application",
+
+    # 创造性流程
+    ("BRAINSTORMING", "CREATION"): "brainstorming_to_creation",
+    ("CREATION", "REFINEMENT"): "creation_to_refinement",
+
+    # 反向转换（可能需要关注）
+    ("OPERATION", "INQUIRY"): "operation_to_inquiry",
+    ("COMPLETION", "INQUIRY"): "completion_to_inquiry",
+}
+
+# 视为自然（合理）的意图转换类型
+_NATURAL_TRANSITIONS: FrozenSet[str] = frozenset({
+    "inquiry_to_operation", "inquiry_to_creation",
+    "operation_to_confirmation", "creation_to_confirmation",
+    "confirmation_to_completion", "problem_to_analysis",
+    "analysis_to_solution", "brainstorming_to_creation"
+})
+
+# 各类意图指标变化的权重，用于确定主要变化
+_TRANSITION_WEIGHTS: Dict[str, float] = {
+    "question_words": 1.0,
+    "action_words": 1.2,
+    "analysis_words": 0.8,
+    "problem_words": 1.5,
+    "solution_words": 1.3,
+    "learning_words": 0.9,
+    "confirmation_words": 0.7,
+    "completion_words": 1.1,
+    "refinement_words": 0.8
+}
+
+# 连贯的意图指标转换模式 (源指标, 目标指标)
+_COHERENT_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    ("problem_words", "solution_words"),
+    ("question_words", "action_words"),
+    ("learning_words", "action_words"),
+    ("analysis_words", "action_words"),
+    ("action_words", "confirmation_words"),
+    ("confirmation_words", "completion_words")
+)
+
+# 意图转换预测规则：(触发指标, 排除指标, 预测指标, 概率, 原因)；
+# 出现触发指标且未出现排除指标时给出预测
+_PREDICTION_RULES: Tuple[Tuple[str, Optional[str], str, float, str], ...] = (
+    ("problem_words", None, "solution_words", 0.8,
+     "Problem statements typically lead to solution seeking"),
+    ("question_words", "action_words", "action_words", 0.7,
+     "Questions often precede actions"),
+    ("action_words", "confirmation_words", "confirmation_words", 0.6,
+     "Actions often require confirmation"),
+    ("analysis_words", None, "action_words", 0.5,
+     "Analysis typically leads to action")
+)
+
+
+# IntentUnit 差异的详细程度：summary 只统计数量，full 额外给出每个修改的明细
+DetailLevel = Literal["summary", "full"]
+_DETAIL_LEVELS = ("summary", "full")
+
+# 数值个数达到该值时改用 numpy 计算方差；更短的列表上数组转换的开销超过收益
+_NUMPY_VARIANCE_MIN = 256
+
+
+def _tokenize(text: str) -> Set[str]:
+    """
+    将内容切分为小写词集合
+
+    按空白切分而非正则分词：在 CPython 中 str.split 的速度约为
+    re.findall 的三倍，且与意图指标词表的匹配方式保持一致。
+    """
+    return set(text.lower().split())
+
+
+def _unit_keywords(intent_analysis) -> Set[str]:
+    """汇总意图分析中所有 IntentUnit 的关键词，一次 union 调用完成"""
+    return set().union(*(unit.keywords or () for unit in intent_analysis.intent_units))
+
+
+def _check_detail_level(detail_level: str) -> None:
+    if detail_level not in _DETAIL_LEVELS:
+        raise ValueError(
+            f"detail_level 必须是 {' 或 '.join(_DETAIL_LEVELS)}，当前为 {detail_level!r}"
+        )
+
+
 class DiffEngine:
     """计算两轮之间的差异"""
 
     def compute_diff(
         self,
         from_structure: PromptStructure,
-        to_structure: PromptStructure
+        to_structure: PromptStructure,
+        detail_level: DetailLevel = "full"
     ) -> TurnDiff:
         """
         计算两个 PromptStructure 之间的差异
@@ -31,6 +185,41 @@ class DiffEngine:
         Args:
             from_structure: 源结构（较早的 turn）
             to_structure: 目标结构（较新的 turn）
+            detail_level: IntentUnit 差异的详细程度；"summary" 时
+                modified_intents 为空列表，只保留各项数量
+
+        Returns:
+            TurnDiff 对象
+
+        Raises:
+            ValueError: detail_level 不是 "summary" 或 "full" 时
+        """
+        _check_detail_level(detail_level)
+        return self._diff_structures(
+            from_structure,
+            to_structure,
+            self._component_keys(from_structure),
+            self._component_keys(to_structure),
+            detail_level
+        )
+
+    def _diff_structures(
+        self,
+        from_structure: PromptStructure,
+        to_structure: PromptStructure,
+        from_keys: List[Tuple[str, str]],
+        to_keys: List[Tuple[str, str]],
+        detail_level: DetailLevel = "full"
+    ) -> TurnDiff:
+        """
+        使用预先计算好的组件 key 计算差异
+
+        Args:
+            from_structure: 源结构（较早的 turn）
+            to_structure: 目标结构（较新的 turn）
+            from_keys: 源结构各组件的 key，与 components 一一对应
+            to_keys: 目标结构各组件的 key，与 components 一一对应
+            detail_level: IntentUnit 差异的详细程度
 
         Returns:
             TurnDiff 对象
@@ -40,27 +229,19 @@ class DiffEngine:
             to_turn=to_structure.turn_index
         )
 
-        # 1. 找出新增的组件
-        from_contents = {
-            self._component_key(c): c
-            for c in from_structure.components
-        }
+        # 两侧只需做集合成员判断
+        from_key_set = set(from_keys)
+        to_key_set = set(to_keys)
 
-        for comp in to_structure.components:
-            key = self._component_key(comp)
-            if key not in from_contents:
+        # 1. 找出新增的组件
+        for comp, key in zip(to_structure.components, to_keys):
+            if key not in from_key_set:
                 diff.added_components.append(comp)
                 diff.added_tokens += comp.tokens
 
         # 2. 找出删除的组件
-        to_contents = {
-            self._component_key(c): c
-            for c in to_structure.components
-        }
-
-        for comp in from_structure.components:
-            key = self._component_key(comp)
-            if key not in to_contents:
+        for comp, key in zip(from_structure.components, from_keys):
+            if key not in to_key_set:
                 diff.removed_components.append(comp)
                 diff.removed_tokens += comp.tokens
 
@@ -74,7 +255,8 @@ class DiffEngine:
         # 4. 计算意图差异
         diff.intent_diff = self._compute_intent_diff(
             from_structure.intent_analysis,
-            to_structure.intent_analysis
+            to_structure.intent_analysis,
+            detail_level
         )
 
         diff.total_changes = (
@@ -88,7 +270,8 @@ class DiffEngine:
     def _analyze_intent_units_diff(
         self,
         from_units: List,
-        to_units: List
+        to_units: List,
+        detail_level: DetailLevel = "full"
     ) -> Dict[str, Any]:
         """
         分析IntentUnit列表之间的详细差异
@@ -96,54 +279,70 @@ class DiffEngine:
         Args:
             from_units: 源IntentUnit列表
             to_units: 目标IntentUnit列表
+            detail_level: "summary" 时只计数修改的意图，不构建修改明细
             
         Returns:
             IntentUnit差异分析结果
         """
-        from_dict = {unit.intent_type: unit for unit in from_units}
-        to_dict = {unit.intent_type: unit for unit in to_units}
-        
-        added_intents = set(to_dict.keys()) - set(from_dict.keys())
-        removed_intents = set(from_dict.keys()) - set(to_dict.keys())
-        common_intents = set(from_dict.keys()) & set(to_dict.keys())
-        
         result = {
-            "total_added": len(added_intents),
-            "total_removed": len(removed_intents),
+            "total_added": 0,
+            "total_removed": 0,
             "total_modified": 0,
-            "added_intents": list(added_intents),
-            "removed_intents": list(removed_intents),
+            "added_intents": [],
+            "removed_intents": [],
             "modified_intents": []
         }
         
-        # 分析共同意图的变化
-        for intent_type in common_intents:
-            from_unit = from_dict[intent_type]
-            to_unit = to_dict[intent_type]
+        # 两侧均为空或逐个相同（多轮会话中意图未变化的常见情况）时无需比较；
+        # 列表比较先按对象身份判断，同一批 IntentUnit 只需指针比较
+        if from_units == to_units:
+            return result
+        
+        from_dict = {unit.intent_type: unit for unit in from_units}
+        to_dict = {unit.intent_type: unit for unit in to_units}
+        
+        # 单次遍历目标意图：源中没有的是新增，其余为共同意图；源中剩下的即为删除
+        remaining = dict(from_dict)
+        for intent_type, to_unit in to_dict.items():
+            from_unit = remaining.pop(intent_type, None)
+            if from_unit is None:
+                result["added_intents"].append(intent_type)
+                continue
             
             confidence_change = to_unit.confidence - from_unit.confidence
             tokens_change = to_unit.tokens - from_unit.tokens
             
-            # 检查是否有显著变化（置信度变化超过阈值或关键词变化）
-            has_significant_change = (
+            # 检查是否有显著变化（置信度变化超过阈值或关键词变化）；
+            # 先做数值比较，关键词列表相同时无需构建集合
+            if not (
                 abs(confidence_change) > 0.1 or  # 置信度变化超过10%
                 tokens_change != 0 or
-                set(to_unit.keywords) != set(from_unit.keywords)
-            )
+                (to_unit.keywords != from_unit.keywords and
+                 set(to_unit.keywords) != set(from_unit.keywords))
+            ):
+                continue
             
-            if has_significant_change:
-                result["total_modified"] += 1
-                result["modified_intents"].append({
-                    "intent_type": intent_type.value,
-                    "confidence_change": confidence_change,
-                    "tokens_change": tokens_change,
-                    "keywords_added": list(set(to_unit.keywords) - set(from_unit.keywords)),
-                    "keywords_removed": list(set(from_unit.keywords) - set(to_unit.keywords)),
-                    "context_dependencies_change": {
-                        "old": from_unit.context_dependencies,
-                        "new": to_unit.context_dependencies
-                    }
-                })
+            result["total_modified"] += 1
+            if detail_level == "summary":
+                continue
+            
+            from_keywords = set(from_unit.keywords)
+            to_keywords = set(to_unit.keywords)
+            result["modified_intents"].append({
+                "intent_type": intent_type.value,
+                "confidence_change": confidence_change,
+                "tokens_change": tokens_change,
+                "keywords_added": list(to_keywords - from_keywords),
+                "keywords_removed": list(from_keywords - to_keywords),
+                "context_dependencies_change": {
+                    "old": from_unit.context_dependencies,
+                    "new": to_unit.context_dependencies
+                }
+            })
+        
+        result["removed_intents"] = list(remaining)
+        result["total_added"] = len(result["added_intents"])
+        result["total_removed"] = len(result["removed_intents"])
         
         return result
     
@@ -162,38 +361,9 @@ class DiffEngine:
         Returns:
             转换类型描述
         """
-        # 定义常见的意图转换模式
-        transition_patterns = {
-            # 从询问到操作
-            ("INQUIRY", "OPERATION"): "inquiry_to_operation",
-            ("INQUIRY", "CREATION"): "inquiry_to_creation",
-            
-            # 从操作到确认
-            ("OPERATION", "CONFIRMATION"): "operation_to_confirmation",
-            ("CREATION", "CONFIRMATION"): "creation_to_confirmation",
-            
-            # 从确认到完成
-            ("CONFIRMATION", "COMPLETION"): "confirmation_to_completion",
-            
-            # 问题解决流程
-            ("PROBLEM_REPORTING", "ANALYSIS"): "problem_to_analysis",
-            ("ANALYSIS", "SOLUTION"): "analysis_to_solution",
-            
-            # 学习流程
-            ("INQUIRY", "LEARNING"): "inquiry_to_learning",
-            ("LEARNING", "APPLICATION"): "learning_to_application",
-            
-            # 创造性流程
-            ("BRAINSTORMING", "CREATION"): "brainstorming_to_creation",
-            ("CREATION", "REFINEMENT"): "creation_to_refinement",
-            
-            # 反向转换（可能需要关注）
-            ("OPERATION", "INQUIRY"): "operation_to_inquiry",
-            ("COMPLETION", "INQUIRY"): "completion_to_inquiry",
-        }
-        
-        key = (from_intent.value, to_intent.value)
-        return transition_patterns.get(key, "unknown_transition")
+        return _TRANSITION_PATTERNS.get(
+            (from_intent.value, to_intent.value), "unknown_transition"
+        )
     
     def _analyze_intent_transition(
         self,
@@ -215,12 +385,7 @@ class DiffEngine:
         )
         
         # 分析转换的合理性
-        is_natural = transition_type in [
-            "inquiry_to_operation", "inquiry_to_creation",
-            "operation_to_confirmation", "creation_to_confirmation",
-            "confirmation_to_completion", "problem_to_analysis",
-            "analysis_to_solution", "brainstorming_to_creation"
-        ]
+        is_natural = transition_type in _NATURAL_TRANSITIONS
         
         # 分析转换的复杂度变化
         complexity_change = to_intent.complexity_score - from_intent.complexity_score
@@ -257,6 +422,11 @@ class DiffEngine:
         Returns:
             演化分析结果
         """
+        # 上下文引用集合只构建一次，增删数量由交集大小推出
+        from_references = set(from_intent.context_references)
+        to_references = set(to_intent.context_references)
+        preserved_count = len(from_references & to_references)
+        
         return {
             "intent_type": from_intent.primary_intent.value,
             "confidence_evolution": {
@@ -275,9 +445,9 @@ class DiffEngine:
                 from_intent.intent_units, to_intent.intent_units
             ),
             "context_evolution": {
-                "references_added": len(set(to_intent.context_references) - set(from_intent.context_references)),
-                "references_removed": len(set(from_intent.context_references) - set(to_intent.context_references)),
-                "context_stability": len(set(from_intent.context_references) & set(to_intent.context_references)) / max(len(from_intent.context_references), 1)
+                "references_added": len(to_references) - preserved_count,
+                "references_removed": len(from_references) - preserved_count,
+                "context_stability": preserved_count / max(len(from_intent.context_references), 1)
             }
         }
     
@@ -297,19 +467,18 @@ class DiffEngine:
             意图漂移分析结果
         """
         # 分析关键词的变化
-        from_keywords = set()
-        to_keywords = set()
-        
-        for unit in from_intent.intent_units:
-            from_keywords.update(unit.keywords)
+        from_keywords = _unit_keywords(from_intent)
+        to_keywords = _unit_keywords(to_intent)
         
-        for unit in to_intent.intent_units:
-            to_keywords.update(unit.keywords)
-        
-        keyword_overlap = len(from_keywords & to_keywords) / max(len(from_keywords | to_keywords), 1)
+        # 重叠度 = 交集 / 并集，并集大小由交集推出，无需构建并集
+        common_keywords = len(from_keywords & to_keywords)
+        keyword_overlap = common_keywords / max(len(from_keywords) + len(to_keywords) - common_keywords, 1)
         
         # 分析上下文依赖的变化
-        context_overlap = len(set(from_intent.context_references) & set(to_intent.context_references)) / max(len(set(from_intent.context_references) | set(to_intent.context_references)), 1)
+        from_references = set(from_intent.context_references)
+        to_references = set(to_intent.context_references)
+        common_references = len(from_references & to_references)
+        context_overlap = common_references / max(len(from_references) + len(to_references) - common_references, 1)
         
         # 判断是否发生显著漂移
         significant_drift = keyword_overlap < 0.3 or context_overlap < 0.5
@@ -342,7 +511,11 @@ class DiffEngine:
         
         # 置信度变化奖励
         confidence_change = to_intent.intent_confidence - from_intent.intent_confidence
-        confidence_score = max(0, min(1, 0.5 + confidence_change * 2))
+        confidence_score = 0.5 + confidence_change * 2
+        if confidence_score < 0.0:
+            confidence_score = 0.0
+        elif confidence_score > 1.0:
+            confidence_score = 1.0
         
         # 复杂度稳定性奖励
         complexity_change = abs(to_intent.complexity_score - from_intent.complexity_score)
@@ -374,18 +547,20 @@ class DiffEngine:
         evolution_details = []
         
         # 分析共同意图类型的演化
-        for intent_type in set(from_dict.keys()) & set(to_dict.keys()):
+        for intent_type in from_dict.keys() & to_dict.keys():
             from_unit = from_dict[intent_type]
             to_unit = to_dict[intent_type]
+            from_keywords = set(from_unit.keywords)
+            to_keywords = set(to_unit.keywords)
             
             evolution_details.append({
                 "intent_type": intent_type.value,
                 "confidence_change": to_unit.confidence - from_unit.confidence,
                 "tokens_change": to_unit.tokens - from_unit.tokens,
                 "keywords_evolution": {
-                    "preserved": list(set(from_unit.keywords) & set(to_unit.keywords)),
-                    "added": list(set(to_unit.keywords) - set(from_unit.keywords)),
-                    "removed": list(set(from_unit.keywords) - set(to_unit.keywords))
+                    "preserved": list(from_keywords & to_keywords),
+                    "added": list(to_keywords - from_keywords),
+                    "removed": list(from_keywords - to_keywords)
                 },
                 "context_dependencies_change": {
                     "old": from_unit.context_dependencies,
@@ -406,12 +581,19 @@ class DiffEngine:
 
         Uses (type, content) as key for exact matching.
         """
-        return (comp.type.value if hasattr(comp.type, 'value') else comp.type, comp.content)
+        comp_type = comp.type
+        return (getattr(comp_type, 'value', comp_type), comp.content)
+
+    def _component_keys(self, structure: PromptStructure) -> List[Tuple[str, str]]:
+        """按组件顺序生成结构中所有组件的 key"""
+        component_key = self._component_key
+        return [component_key(c) for c in structure.components]
 
     def _compute_intent_diff(
         self,
         from_intent: Optional,
-        to_intent: Optional
+        to_intent: Optional,
+        detail_level: DetailLevel = "full"
     ) -> Optional[Dict[str, Any]]:
         """
         计算两个轮次之间的意图差异，增强对IntentUnit的详细比较
@@ -419,6 +601,7 @@ class DiffEngine:
         Args:
             from_intent: 源轮次的意图分析
             to_intent: 目标轮次的意图分析
+            detail_level: IntentUnit 差异的详细程度
             
         Returns:
             意图差异字典或 None
@@ -434,7 +617,7 @@ class DiffEngine:
                 "new_complexity": to_intent.complexity_score,
                 "new_intent_units": len(to_intent.intent_units),
                 "intent_diversity": to_intent.intent_diversity,
-                "intent_units_details": self._analyze_intent_units_diff([], to_intent.intent_units)
+                "intent_units_details": self._analyze_intent_units_diff([], to_intent.intent_units, detail_level)
             }
         
         if from_intent and not to_intent:
@@ -445,7 +628,7 @@ class DiffEngine:
                 "old_complexity": from_intent.complexity_score,
                 "old_intent_units": len(from_intent.intent_units),
                 "intent_diversity": from_intent.intent_diversity,
-                "intent_units_details": self._analyze_intent_units_diff(from_intent.intent_units, [])
+                "intent_units_details": self._analyze_intent_units_diff(from_intent.intent_units, [], detail_level)
             }
         
         # 两者都存在，计算详细变化
@@ -484,15 +667,17 @@ class DiffEngine:
         
         # 详细的IntentUnit差异分析
         diff["intent_units_details"] = self._analyze_intent_units_diff(
-            from_intent.intent_units, to_intent.intent_units
+            from_intent.intent_units, to_intent.intent_units, detail_level
         )
         
         # 上下文引用变化分析
+        from_references = set(from_intent.context_references)
+        to_references = set(to_intent.context_references)
         diff["context_references_change"] = {
             "old_count": len(from_intent.context_references),
             "new_count": len(to_intent.context_references),
-            "added_references": list(set(to_intent.context_references) - set(from_intent.context_references)),
-            "removed_references": list(set(from_intent.context_references) - set(to_intent.context_references))
+            "added_references": list(to_references - from_references),
+            "removed_references": list(from_references - to_references)
         }
         
         return diff
@@ -512,57 +697,19 @@ class DiffEngine:
             return None
         
         # 基础关键词分析
-        old_keywords = set(old_content.lower().split())
-        new_keywords = set(new_content.lower().split())
+        old_keywords = _tokenize(old_content)
+        new_keywords = _tokenize(new_content)
         
         added_keywords = new_keywords - old_keywords
         removed_keywords = old_keywords - new_keywords
         
-        # 增强的意图指标检测
-        intent_indicators = {
-            "question_words": {
-                "what", "how", "why", "when", "where", "who", "which", "whether",
-                "什么", "怎么", "为什么", "何时", "哪里", "谁", "哪个", "是否"
-            },
-            "action_words": {
-                "create", "generate", "make", "do", "build", "write", "produce", 
-                "develop", "design", "implement", "写", "创建", "生成", "做", "构建",
-                "开发", "设计", "实现"
-            },
-            "analysis_words": {
-                "analyze", "compare", "evaluate", "examine", "study", "assess",
-                "分析", "比较", "评估", "检查", "研究", "审查"
-            },
-            "problem_words": {
-                "problem", "issue", "error", "bug", "trouble", "fail", "wrong",
-                "问题", "错误", "故障", "麻烦", "失败"
-            },
-            "solution_words": {
-                "solution", "fix", "solve", "resolve", "answer", "help",
-                "解决方案", "修复", "解决", "答案", "帮助"
-            },
-            "learning_words": {
-                "learn", "understand", "explain", "teach", "study", "knowledge",
-                "学习", "理解", "解释", "教", "知识"
-            },
-            "confirmation_words": {
-                "confirm", "check", "verify", "sure", "correct", "right",
-                "确认", "检查", "验证", "正确"
-            },
-            "completion_words": {
-                "done", "complete", "finish", "end", "ready", "finished",
-                "完成", "结束", "准备好"
-            },
-            "refinement_words": {
-                "improve", "better", "optimize", "refine", "enhance", "polish",
-                "改进", "更好", "优化", "完善", "提升"
-            }
-        }
-        
         changes = {}
+        # 构建变化时累计变化数与总强度，评分时无需再遍历 changes
+        total_changes = 0
+        total_intensity = 0
         
         # 分析各类型意图指标的变化
-        for indicator_type, words in intent_indicators.items():
+        for indicator_type, words in _INTENT_INDICATORS.items():
             added_indicators = added_keywords & words
             removed_indicators = removed_keywords & words
             
@@ -578,15 +725,21 @@ class DiffEngine:
                     "change_intensity": change_intensity,
                     "change_significance": "high" if change_intensity >= 3 else "medium" if change_intensity >= 2 else "low"
                 }
+                total_changes += 1
+                total_intensity += change_intensity
         
         # 高级意图变化分析
         if changes:
             # 检测主要的意图转换
             primary_changes = self._detect_primary_intent_changes(changes)
             changes["primary_changes"] = primary_changes
+            # 主要变化同样带有 change_intensity（加权后），一并计入评分
+            if "change_intensity" in primary_changes:
+                total_changes += 1
+                total_intensity += primary_changes["change_intensity"]
             
             # 分析意图变化的连贯性
-            coherence_analysis = self._analyze_intent_coherence(changes)
+            coherence_analysis = self._analyze_indicator_coherence(changes)
             changes["coherence_analysis"] = coherence_analysis
             
             # 预测可能的意图转换
@@ -594,11 +747,11 @@ class DiffEngine:
             changes["predicted_transitions"] = predicted_transitions
             
             # 计算整体意图变化评分
-            overall_score = self._calculate_intent_change_score(changes)
+            overall_score = self._calculate_intent_change_score(total_intensity, total_changes)
             changes["overall_change_score"] = overall_score
         
-        # 语义变化分析（基于关键词的语义相似度）
-        semantic_changes = self._analyze_semantic_changes(old_content, new_content)
+        # 语义变化分析（基于关键词的语义相似度），复用上面已构建的词集合
+        semantic_changes = self._analyze_semantic_changes_from_sets(old_keywords, new_keywords)
         if semantic_changes:
             changes["semantic_changes"] = semantic_changes
         
@@ -610,26 +763,14 @@ class DiffEngine:
         """
         primary_changes = {}
         
-        # 定义意图转换的权重
-        transition_weights = {
-            "question_words": 1.0,
-            "action_words": 1.2,
-            "analysis_words": 0.8,
-            "problem_words": 1.5,
-            "solution_words": 1.3,
-            "learning_words": 0.9,
-            "confirmation_words": 0.7,
-            "completion_words": 1.1,
-            "refinement_words": 0.8
-        }
-        
         # 找出最显著的变化
         max_change_intensity = 0
         primary_change_type = None
         
         for change_type, change_data in changes.items():
-            if change_type in transition_weights and isinstance(change_data, dict):
-                weighted_intensity = change_data.get("change_intensity", 0) * transition_weights[change_type]
+            weight = _TRANSITION_WEIGHTS.get(change_type)
+            if weight is not None and isinstance(change_data, dict):
+                weighted_intensity = change_data.get("change_intensity", 0) * weight
                 if weighted_intensity > max_change_intensity:
                     max_change_intensity = weighted_intensity
                     primary_change_type = change_type
@@ -655,29 +796,19 @@ class DiffEngine:
         else:
             return "balanced"
     
-    def _analyze_intent_coherence(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_indicator_coherence(self, changes: Dict[str, Any]) -> Dict[str, Any]:
         """
-        分析意图变化的连贯性
+        分析意图指标变化的连贯性
         """
-        # 定义连贯的意图转换模式
-        coherent_patterns = [
-            ("problem_words", "solution_words"),
-            ("question_words", "action_words"),
-            ("learning_words", "action_words"),
-            ("analysis_words", "action_words"),
-            ("action_words", "confirmation_words"),
-            ("confirmation_words", "completion_words")
-        ]
-        
         coherence_score = 0
         coherent_transitions = []
         
-        for pattern in coherent_patterns:
-            if pattern[0] in changes and pattern[1] in changes:
+        for from_type, to_type in _COHERENT_PATTERNS:
+            if from_type in changes and to_type in changes:
                 coherence_score += 1
                 coherent_transitions.append({
-                    "from": pattern[0],
-                    "to": pattern[1],
+                    "from": from_type,
+                    "to": to_type,
                     "coherence_type": "natural_flow"
                 })
         
@@ -694,48 +825,24 @@ class DiffEngine:
         predictions = []
         
         # 基于当前变化的预测规则
-        if "problem_words" in changes:
-            predictions.append({
-                "predicted_intent": "solution_words",
-                "probability": 0.8,
-                "reason": "Problem statements typically lead to solution seeking"
-            })
-        
-        if "question_words" in changes and "action_words" not in changes:
-            predictions.append({
-                "predicted_intent": "action_words",
-                "probability": 0.7,
-                "reason": "Questions often precede actions"
-            })
-        
-        if "action_words" in changes and "confirmation_words" not in changes:
-            predictions.append({
-                "predicted_intent": "confirmation_words",
-                "probability": 0.6,
-                "reason": "Actions often require confirmation"
-            })
-        
-        if "analysis_words" in changes:
-            predictions.append({
-                "predicted_intent": "action_words",
-                "probability": 0.5,
-                "reason": "Analysis typically leads to action"
-            })
+        for trigger, unless, predicted, probability, reason in _PREDICTION_RULES:
+            if trigger in changes and (unless is None or unless not in changes):
+                predictions.append({
+                    "predicted_intent": predicted,
+                    "probability": probability,
+                    "reason": reason
+                })
         
         return predictions
     
-    def _calculate_intent_change_score(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+    def _calculate_intent_change_score(self, total_intensity: float, total_changes: int) -> Dict[str, Any]:
         """
         计算整体意图变化评分
-        """
-        total_changes = 0
-        total_intensity = 0
-        
-        for change_type, change_data in changes.items():
-            if isinstance(change_data, dict) and "change_intensity" in change_data:
-                total_changes += 1
-                total_intensity += change_data["change_intensity"]
         
+        Args:
+            total_intensity: 各项变化强度之和
+            total_changes: 带有变化强度的变化项数
+        """
         average_intensity = total_intensity / total_changes if total_changes > 0 else 0
         
         # 计算变化严重程度
@@ -763,12 +870,27 @@ class DiffEngine:
         """
         分析语义变化（简化版本，基于关键词相似度）
         """
-        old_words = set(old_content.lower().split())
-        new_words = set(new_content.lower().split())
-        
+        return self._analyze_semantic_changes_from_sets(
+            _tokenize(old_content),
+            _tokenize(new_content)
+        )
+
+    def _analyze_semantic_changes_from_sets(
+        self,
+        old_words: Set[str],
+        new_words: Set[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        基于已分词的词集合分析语义变化
+
+        Args:
+            old_words: 旧内容的小写词集合
+            new_words: 新内容的小写词集合
+        """
         # 计算词汇重叠度
+        # 并集大小由交集推出，不再构建并集
         overlap = len(old_words & new_words)
-        total_unique = len(old_words | new_words)
+        total_unique = len(old_words) + len(new_words) - overlap
         
         if total_unique == 0:
             return None
@@ -808,8 +930,8 @@ class DiffEngine:
                 "flow_analysis": {}
             }
         
-        # 基础转换矩阵
-        transition_matrix = {}
+        # 基础转换计数，以 (源意图, 目标意图) 为键
+        transition_counts: Counter = Counter()
         
         # 增强的流转模式分析
         transition_patterns = {}
@@ -820,33 +942,26 @@ class DiffEngine:
         # 详细的流转分析
         detailed_transitions = []
         
-        for i in range(len(structures) - 1):
-            current_structure = structures[i]
-            next_structure = structures[i + 1]
-            
+        for i, (current_structure, next_structure) in enumerate(zip(structures, structures[1:])):
             current_intent = current_structure.intent_analysis
             next_intent = next_structure.intent_analysis
             
             if current_intent and next_intent:
                 from_intent = current_intent.primary_intent
                 to_intent = next_intent.primary_intent
+                confidence_change = next_intent.intent_confidence - current_intent.intent_confidence
+                complexity_change = next_intent.complexity_score - current_intent.complexity_score
                 
-                # 更新基础转换矩阵
-                if from_intent not in transition_matrix:
-                    transition_matrix[from_intent] = {}
-                
-                if to_intent not in transition_matrix[from_intent]:
-                    transition_matrix[from_intent][to_intent] = 0
-                
-                transition_matrix[from_intent][to_intent] += 1
+                # 更新基础转换计数
+                transition_counts[(from_intent, to_intent)] += 1
                 
                 # 构建意图序列
                 intent_sequences.append({
                     "turn_index": i,
                     "from_intent": from_intent.value,
                     "to_intent": to_intent.value,
-                    "confidence_change": next_intent.intent_confidence - current_intent.intent_confidence,
-                    "complexity_change": next_intent.complexity_score - current_intent.complexity_score
+                    "confidence_change": confidence_change,
+                    "complexity_change": complexity_change
                 })
                 
                 # 详细的转换分析
@@ -869,10 +984,15 @@ class DiffEngine:
                 pattern["count"] += 1
                 pattern["transitions"].append({
                     "turn_index": i,
-                    "confidence_change": next_intent.intent_confidence - current_intent.intent_confidence,
-                    "complexity_change": next_intent.complexity_score - current_intent.complexity_score
+                    "confidence_change": confidence_change,
+                    "complexity_change": complexity_change
                 })
         
+        # 展开为嵌套的基础转换矩阵 {源意图: {目标意图: 次数}}
+        transition_matrix: Dict[Any, Dict[Any, int]] = {}
+        for (from_intent, to_intent), count in transition_counts.items():
+            transition_matrix.setdefault(from_intent, {})[to_intent] = count
+        
         # 计算模式统计
         for pattern_type, pattern_data in transition_patterns.items():
             if pattern_data["transitions"]:
@@ -917,12 +1037,7 @@ class DiffEngine:
         )
         
         # 分析转换的合理性
-        is_natural = transition_type in [
-            "inquiry_to_operation", "inquiry_to_creation",
-            "operation_to_confirmation", "creation_to_confirmation",
-            "confirmation_to_completion", "problem_to_analysis",
-            "analysis_to_solution", "brainstorming_to_creation"
-        ]
+        is_natural = transition_type in _NATURAL_TRANSITIONS
         
         # 分析IntentUnit的变化
         intent_units_diff = self._analyze_intent_units_diff(
@@ -1168,6 +1283,9 @@ class DiffEngine:
         if not values:
             return 0
         
+        if np is not None and len(values) >= _NUMPY_VARIANCE_MIN:
+            return float(np.asarray(values, dtype=np.float64).var())
+        
         mean = sum(values) / len(values)
         variance = sum((x - mean) ** 2 for x in values) / len(values)
         
@@ -1189,16 +1307,11 @@ class DiffEngine:
         removed_contexts = from_context_deps - to_context_deps
         
         # 分析关键词的变化
-        from_keywords = set()
-        to_keywords = set()
-        
-        for unit in from_intent.intent_units:
-            from_keywords.update(unit.keywords or [])
+        from_keywords = _unit_keywords(from_intent)
+        to_keywords = _unit_keywords(to_intent)
         
-        for unit in to_intent.intent_units:
-            to_keywords.update(unit.keywords or [])
-        
-        keyword_overlap = len(from_keywords & to_keywords) / max(1, len(from_keywords | to_keywords))
+        common_count = len(from_keywords & to_keywords)
+        keyword_overlap = common_count / max(1, len(from_keywords) + len(to_keywords) - common_count)
         
         # 检测主题漂移
         theme_shift_score = 1 - keyword_overlap
@@ -1588,23 +1701,33 @@ class DiffEngine:
 
     def compute_all_diffs(
         self,
-        structures: List[PromptStructure]
+        structures: List[PromptStructure],
+        detail_level: DetailLevel = "full"
     ) -> List[TurnDiff]:
         """
         计算所有相邻 turns 之间的差异
 
         Args:
             structures: List of PromptStructure objects in order
+            detail_level: IntentUnit 差异的详细程度，见 compute_diff
 
         Returns:
             List of TurnDiff objects
+
+        Raises:
+            ValueError: detail_level 不是 "summary" 或 "full" 时
         """
+        _check_detail_level(detail_level)
         diffs = []
 
+        # 中间的每个结构既是前一个 diff 的目标又是后一个 diff 的源，
+        # 其组件 key 只计算一次
+        keys = [self._component_keys(s) for s in structures]
+
         for i in range(1, len(structures)):
-            prev = structures[i - 1]
-            curr = structures[i]
-            diff = self.compute_diff(prev, curr)
+            diff = self._diff_structures(
+                structures[i - 1], structures[i], keys[i - 1], keys[i], detail_level
+            )
             diffs.append(diff)
 
         return diffs
@@ -7,6 +7,9 @@ from pydantic import BaseModel, Field
 class Message(BaseModel):
     role: str
     content: str
+    # Provider prompt-cache breakpoint, e.g. {"type": "ephemeral"}; clients
+    # without explicit cache markers ignore it
+    cache_control: Optional[Dict[str, Any]] = None
 
 
 class ToolCall(BaseModel):
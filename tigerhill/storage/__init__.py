@@ -1,5 +1,6 @@
 """Storage module for TigerHill trace management."""
 
 from .trace_store import TraceStore, TraceEvent, Trace, EventType
+from .async_writer import AsyncTraceWriter
 
-__all__ = ["TraceStore", "TraceEvent", "Trace", "EventType"]
+__all__ = ["TraceStore", "TraceEvent", "Trace", "EventType", "AsyncTraceWriter"]
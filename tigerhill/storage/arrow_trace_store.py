@@ -0,0 +1,262 @@
+"""
+Arrow-backed columnar event log
+
+Keeps trace events as Apache Arrow record batches so that analytical
+scans (token/cost totals, event counts by type) run as vectorized column
+operations instead of per-event dict lookups. Batches can be persisted to
+and reloaded from an Arrow IPC stream file.
+
+Requires the optional ``pyarrow`` dependency (``pip install tigerhill[arrow]``).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pc = None
+
+from tigerhill.storage.trace_store import (
+    EventType,
+    TraceEvent,
+    _EVENT_TYPE_BY_VALUE,
+    _EVENT_TYPE_TO_ID,
+    _ID_TO_EVENT_TYPE,
+    _LLM_EVENT_TYPES,
+    _json_dumps_bytes,
+    _json_loads,
+)
+
+
+def _event_schema() -> "pa.Schema":
+    return pa.schema([
+        ('trace_id', pa.string()),
+        ('event_id', pa.string()),
+        ('event_type', pa.dictionary(pa.int8(), pa.string())),
+        # Integer microseconds since the epoch
+        ('timestamp', pa.timestamp('us')),
+        ('sequence_number', pa.int32()),
+        # LLM stats lifted out of data for PROMPT/MODEL_RESPONSE events
+        ('total_tokens', pa.int64()),
+        ('cost_usd', pa.float64()),
+        # JSON payload: {"data": ..., "metadata": ...}
+        ('payload', pa.binary()),
+    ])
+
+
+class ArrowTraceStore:
+    """
+    Columnar, append-only storage for trace events.
+
+    Events are appended as Arrow record batches. Aggregates are computed
+    with pyarrow.compute, and TraceEvent objects are only rebuilt on demand
+    by iter_events().
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize ArrowTraceStore.
+
+        Args:
+            path: Optional IPC stream file. Existing batches are loaded from
+                it, and save() writes back to it by default.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        if pa is None:
+            raise ImportError(
+                "ArrowTraceStore requires pyarrow: pip install tigerhill[arrow]"
+            )
+
+        self.path = Path(path) if path else None
+        self.schema = _event_schema()
+        # Fixed dictionary for the event_type column, indexed by the shared
+        # event type codes, so every batch uses the same dictionary
+        self._type_dictionary = pa.array([et.value for et in _ID_TO_EVENT_TYPE], pa.string())
+        self._batches: List["pa.RecordBatch"] = []
+        self._next_sequence: Dict[str, int] = {}  # trace_id -> next sequence_number
+
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    def append_events(self, events: Iterable[TraceEvent]) -> int:
+        """
+        Append events as a single record batch.
+
+        Sequence numbers continue from the events already stored for each
+        trace.
+
+        Args:
+            events: Events to append.
+
+        Returns:
+            Number of events appended.
+        """
+        columns: Dict[str, List[Any]] = {name: [] for name in self.schema.names}
+        type_codes = []
+
+        for event in events:
+            event_type = _EVENT_TYPE_BY_VALUE.get(event.event_type) or EventType(event.event_type)
+            sequence_number = self._next_sequence.get(event.trace_id, 0)
+            self._next_sequence[event.trace_id] = sequence_number + 1
+
+            if event_type in _LLM_EVENT_TYPES:
+                total_tokens = event.data.get('total_tokens', 0)
+                cost_usd = event.data.get('cost_usd', 0.0)
+            else:
+                total_tokens = 0
+                cost_usd = 0.0
+
+            columns['trace_id'].append(event.trace_id)
+            columns['event_id'].append(event.event_id)
+            type_codes.append(_EVENT_TYPE_TO_ID[event_type])
+            columns['timestamp'].append(round(event.timestamp * 1_000_000))
+            columns['sequence_number'].append(sequence_number)
+            columns['total_tokens'].append(total_tokens)
+            columns['cost_usd'].append(cost_usd)
+            columns['payload'].append(
+                _json_dumps_bytes({'data': event.data, 'metadata': event.metadata})
+            )
+
+        if not type_codes:
+            return 0
+
+        columns['event_type'] = pa.DictionaryArray.from_arrays(
+            pa.array(type_codes, pa.int8()), self._type_dictionary
+        )
+        batch = pa.RecordBatch.from_arrays(
+            [
+                columns[name] if name == 'event_type'
+                else pa.array(columns[name], self.schema.field(name).type)
+                for name in self.schema.names
+            ],
+            schema=self.schema
+        )
+        self._batches.append(batch)
+        return batch.num_rows
+
+    def to_table(self, trace_id: Optional[str] = None) -> "pa.Table":
+        """
+        Get stored events as an Arrow table.
+
+        Args:
+            trace_id: Optional trace to filter by.
+
+        Returns:
+            Table with the event schema.
+        """
+        table = pa.Table.from_batches(self._batches, schema=self.schema)
+        if trace_id is not None:
+            table = table.filter(pc.equal(table['trace_id'], trace_id))
+        return table
+
+    def iter_events(self, trace_id: Optional[str] = None) -> Iterator[TraceEvent]:
+        """
+        Rebuild TraceEvent objects from the stored columns.
+
+        Args:
+            trace_id: Optional trace to filter by.
+
+        Yields:
+            TraceEvent objects in insertion order. Timestamps come back as
+            float seconds with microsecond precision.
+        """
+        event_types = _EVENT_TYPE_BY_VALUE
+        for batch in self.to_table(trace_id).to_batches():
+            rows = zip(
+                batch['event_id'].to_pylist(),
+                batch['trace_id'].to_pylist(),
+                batch['event_type'].to_pylist(),
+                batch['timestamp'].cast(pa.int64()).to_pylist(),
+                batch['payload'].to_pylist(),
+            )
+            for event_id, trace_id_, event_type, timestamp_us, payload in rows:
+                payload = _json_loads(payload)
+                yield TraceEvent(
+                    event_id=event_id,
+                    trace_id=trace_id_,
+                    event_type=event_types[event_type],
+                    timestamp=timestamp_us / 1_000_000,
+                    data=payload.get('data', {}),
+                    metadata=payload.get('metadata')
+                )
+
+    def get_stats(self, trace_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute event aggregates with vectorized column scans.
+
+        Args:
+            trace_id: Optional trace to filter by.
+
+        Returns:
+            Dictionary with total_events, llm_calls_count, total_tokens,
+            total_cost_usd, duration_seconds (first to last event) and
+            per-type event_counts.
+        """
+        table = self.to_table(trace_id)
+        event_types = table['event_type'].cast(pa.string())
+
+        event_counts = {
+            item['values']: item['counts']
+            for item in pc.value_counts(event_types).to_pylist()
+        }
+        llm_calls_count = sum(event_counts.get(et.value, 0) for et in _LLM_EVENT_TYPES)
+
+        # Integer subtraction on the microsecond column
+        duration_seconds = None
+        if table.num_rows:
+            bounds = pc.min_max(table['timestamp'].cast(pa.int64())).as_py()
+            duration_seconds = (bounds['max'] - bounds['min']) / 1_000_000
+
+        return {
+            'total_events': table.num_rows,
+            'llm_calls_count': llm_calls_count,
+            'total_tokens': pc.sum(table['total_tokens']).as_py() or 0,
+            'total_cost_usd': pc.sum(table['cost_usd']).as_py() or 0.0,
+            'duration_seconds': duration_seconds,
+            'event_counts': event_counts,
+        }
+
+    def save(self, path: Optional[str] = None) -> Path:
+        """
+        Write all batches to an Arrow IPC stream file.
+
+        Args:
+            path: Output path. Defaults to the path given at construction.
+
+        Returns:
+            Path written.
+
+        Raises:
+            ValueError: If no path is available.
+        """
+        target = Path(path) if path else self.path
+        if target is None:
+            raise ValueError("No path given for ArrowTraceStore.save()")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with pa.OSFile(str(target), 'wb') as sink:
+            with pa.ipc.new_stream(sink, self.schema) as writer:
+                for batch in self._batches:
+                    writer.write_batch(batch)
+
+        return target
+
+    def _load(self, path: Path) -> None:
+        """Load batches from an Arrow IPC stream file."""
+        with pa.OSFile(str(path), 'rb') as source:
+            reader = pa.ipc.open_stream(source)
+            for batch in reader:
+                self._batches.append(batch)
+
+        # Continue sequence numbers after the stored events of each trace
+        if self._batches:
+            for item in pc.value_counts(self.to_table()['trace_id']).to_pylist():
+                self._next_sequence[item['values']] = item['counts']
+
+
+__all__ = ["ArrowTraceStore"]
@@ -0,0 +1,120 @@
+"""
+Background trace writer
+
+Moves trace persistence off the caller's thread: finished traces are queued
+and a single daemon thread writes their events and ends them, so the caller
+can start its next task while the previous one is still being stored.
+"""
+
+import contextlib
+import logging
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from tigerhill.storage.trace_store import EventType
+
+logger = logging.getLogger(__name__)
+
+# Queued by close() to stop the writer thread
+_STOP = object()
+
+
+def _write_events(
+    store: Any,
+    events: List[Tuple[Dict[str, Any], Optional[EventType], Optional[float]]],
+    trace_id: str
+) -> None:
+    """Write events with the store's write_events(), or one write_event() call each."""
+    write_events = getattr(store, "write_events", None)
+    if write_events is not None:
+        write_events(events, trace_id=trace_id)
+        return
+
+    # Stores predating write_events() record the time of the call instead
+    for event_data, event_type, _timestamp in events:
+        store.write_event(event_data, trace_id=trace_id, event_type=event_type)
+
+
+class AsyncTraceWriter:
+    """
+    Single-threaded, bounded write-behind queue in front of a trace store.
+
+    Works with any store that provides end_trace() and write_events() or
+    write_event() (TraceStore, SQLiteTraceStore). Traces are written in submission order
+    by one thread, so events of a trace are never reordered.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        maxsize: int = 1024,
+        lock: Optional[threading.Lock] = None
+    ):
+        """
+        Initialize AsyncTraceWriter and start its writer thread.
+
+        Args:
+            store: Trace store to write to.
+            maxsize: Maximum number of queued traces. submit() blocks while
+                the queue is full.
+            lock: Optional lock held around each store call, for stores that
+                are also used from other threads.
+        """
+        self.store = store
+        self._lock = lock if lock is not None else contextlib.nullcontext()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(
+            target=self._run,
+            name="tigerhill-trace-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        trace_id: str,
+        events: List[Tuple[Dict[str, Any], Optional[EventType], Optional[float]]],
+        end_trace: bool = True
+    ) -> None:
+        """
+        Queue the events of a trace for writing.
+
+        Args:
+            trace_id: Trace the events belong to.
+            events: (event_data, event_type, timestamp) tuples, as accepted by
+                the store's write_events().
+            end_trace: If True, end the trace after writing its events.
+        """
+        self._queue.put((trace_id, events, end_trace))
+
+    def join(self) -> None:
+        """Block until every queued trace has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write all queued traces, then stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"Failed to write trace {item[0]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, trace_id: str, events: List[tuple], end_trace: bool) -> None:
+        with self._lock:
+            _write_events(self.store, events, trace_id)
+            if end_trace:
+                self.store.end_trace(trace_id)
+
+
+__all__ = ["AsyncTraceWriter"]
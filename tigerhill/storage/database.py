@@ -194,6 +194,29 @@ class DatabaseManager:
             logger.error(f"SQL query error: {e}")
             raise
 
+    def fetch_rows(self, sql: str, params: Tuple = None) -> List[sqlite3.Row]:
+        """查询多条记录，直接返回行对象
+
+        与fetch_all不同，不转换为字典，适合按列位置批量解码的场景
+
+        Args:
+            sql: SQL查询语句
+            params: 参数元组
+
+        Returns:
+            sqlite3.Row列表（支持按位置和列名访问）
+        """
+        conn = self.get_connection()
+        try:
+            if params:
+                cursor = conn.execute(sql, params)
+            else:
+                cursor = conn.execute(sql)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"SQL query error: {e}")
+            raise
+
     def insert(self, table: str, data: Dict[str, Any]) -> int:
         """插入记录
 
@@ -9,12 +9,21 @@ import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from tigerhill.storage.trace_store import Trace, TraceEvent, EventType
+from tigerhill.storage.trace_store import Trace, TraceEvent, EventType, EVENT_ROW_COLUMNS
 from tigerhill.storage.database import DatabaseManager
 
 
+# Column order of rows buffered by enqueue_event()
+_EVENT_COLUMNS = ('trace_id', 'event_type', 'timestamp', 'sequence_number', 'data')
+_SELECT_EVENTS_SQL = f"SELECT {', '.join(EVENT_ROW_COLUMNS)} FROM events"
+_INSERT_EVENT_SQL = (
+    f"INSERT INTO events ({', '.join(_EVENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _EVENT_COLUMNS)})"
+)
+
+
 class SQLiteTraceStore:
     """
     SQLite-backed storage for agent execution traces.
@@ -23,18 +32,30 @@ class SQLiteTraceStore:
     Supports advanced querying, filtering, sorting, and pagination.
     """
 
-    def __init__(self, db_path: Optional[str] = None, auto_init: bool = True):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        auto_init: bool = True,
+        event_batch_size: int = 256
+    ):
         """
         Initialize SQLiteTraceStore.
 
         Args:
             db_path: Path to SQLite database. If None, uses ./tigerhill.db
             auto_init: If True, automatically initialize database schema
+            event_batch_size: Number of events buffered by enqueue_event()
+                before they are flushed in a single executemany()
         """
         self.db_path = db_path or "./tigerhill.db"
         self.db = DatabaseManager(self.db_path)
         self._current_trace_id: Optional[str] = None
 
+        # Write-behind buffer for enqueue_event()
+        self.event_batch_size = event_batch_size
+        self._pending_events: List[tuple] = []
+        self._next_sequence: Dict[str, int] = {}  # trace_id -> next sequence_number
+
         # Initialize database schema if needed
         if auto_init and not self.db.table_exists('traces'):
             schema_path = Path(__file__).parent.parent.parent / "scripts" / "migrations" / "v1_initial_schema.sql"
@@ -88,6 +109,9 @@ class SQLiteTraceStore:
         if not tid:
             return
 
+        self.flush_events()
+        self._next_sequence.pop(tid, None)
+
         # Update end_time and recalculate status
         end_time = time.time()
 
@@ -145,23 +169,15 @@ class SQLiteTraceStore:
         if not tid:
             raise ValueError("No active trace. Call start_trace() first.")
 
+        # Keep buffered events ahead of this one
+        self.flush_events()
+        self._next_sequence.pop(tid, None)
+
         # Verify trace exists
         if not self.db.fetch_one("SELECT trace_id FROM traces WHERE trace_id = ?", (tid,)):
             raise ValueError(f"Trace {tid} does not exist.")
 
-        # Infer event type if not provided
-        if event_type is None:
-            event_type = self._infer_event_type(event_data)
-
-        # Create event
-        event = TraceEvent(
-            event_id=str(uuid.uuid4()),
-            trace_id=tid,
-            event_type=event_type,
-            timestamp=time.time(),
-            data=event_data,
-            metadata=metadata
-        )
+        event = self._create_event(tid, event_data, event_type, metadata)
 
         # Get current event count to determine sequence number
         result = self.db.fetch_one(
@@ -176,6 +192,145 @@ class SQLiteTraceStore:
 
         return event.event_id
 
+    def enqueue_event(
+        self,
+        event_data: Dict[str, Any],
+        trace_id: Optional[str] = None,
+        event_type: Optional[EventType] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None
+    ) -> str:
+        """
+        Buffer a trace event for a batched insert.
+
+        Same arguments as write_event(), but the row is only written once
+        event_batch_size events are pending, or when flush_events() or
+        close() is called. Reads and end_trace() flush the buffer first, so
+        buffered events are never missing from query results.
+
+        Args:
+            event_data: The event data to store.
+            trace_id: Optional trace ID. If None, uses current trace.
+            event_type: Type of event. If None, inferred from event_data.
+            metadata: Optional event metadata.
+            timestamp: When the event happened. If None, uses the current time.
+
+        Returns:
+            The event_id of the created event.
+
+        Raises:
+            ValueError: If no trace is active.
+        """
+        tid = trace_id or self._current_trace_id
+        if not tid:
+            raise ValueError("No active trace. Call start_trace() first.")
+
+        sequence_number = self._next_sequence.get(tid)
+        if sequence_number is None:
+            # Verify trace exists
+            if not self.db.fetch_one("SELECT trace_id FROM traces WHERE trace_id = ?", (tid,)):
+                raise ValueError(f"Trace {tid} does not exist.")
+
+            result = self.db.fetch_one(
+                "SELECT COUNT(*) as count FROM events WHERE trace_id = ?",
+                (tid,)
+            )
+            sequence_number = result['count'] if result else 0
+
+        event = self._create_event(tid, event_data, event_type, metadata, timestamp)
+
+        event_dict = event.to_db_dict(sequence_number)
+        self._pending_events.append(tuple(event_dict[c] for c in _EVENT_COLUMNS))
+        self._next_sequence[tid] = sequence_number + 1
+
+        if len(self._pending_events) >= self.event_batch_size:
+            self.flush_events()
+
+        return event.event_id
+
+    def write_events(
+        self,
+        events: Iterable[Tuple[Dict[str, Any], Optional[EventType], Optional[float]]],
+        trace_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Write several trace events to one trace in a single executemany().
+
+        Args:
+            events: (event_data, event_type, timestamp) tuples, in order. An
+                event_type of None is inferred from event_data, and a
+                timestamp of None means the current time.
+            trace_id: Optional trace ID. If None, uses current trace.
+
+        Returns:
+            The event_ids of the created events.
+
+        Raises:
+            ValueError: If no trace is active.
+        """
+        event_ids = [
+            self.enqueue_event(
+                event_data, trace_id=trace_id, event_type=event_type, timestamp=timestamp
+            )
+            for event_data, event_type, timestamp in events
+        ]
+        self.flush_events()
+        return event_ids
+
+    def flush_events(self) -> int:
+        """
+        Write all events buffered by enqueue_event().
+
+        The batch is inserted in one transaction. If the insert fails, it is
+        rolled back and the events stay buffered for the next flush.
+
+        Returns:
+            Number of events written.
+
+        Raises:
+            sqlite3.Error: If the insert fails.
+        """
+        rows = self._pending_events
+        if not rows:
+            return 0
+
+        with self.db.transaction():
+            self.db.execute_many(_INSERT_EVENT_SQL, rows)
+        self._pending_events = []
+        return len(rows)
+
+    def close(self) -> None:
+        """Flush buffered events and close this thread's database connection."""
+        self.flush_events()
+        self.db.close_connection()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _create_event(
+        self,
+        trace_id: str,
+        event_data: Dict[str, Any],
+        event_type: Optional[EventType],
+        metadata: Optional[Dict[str, Any]],
+        timestamp: Optional[float] = None
+    ) -> TraceEvent:
+        """Build a new event, inferring its type if not provided."""
+        if event_type is None:
+            event_type = self._infer_event_type(event_data)
+
+        return TraceEvent(
+            event_id=str(uuid.uuid4()),
+            trace_id=trace_id,
+            event_type=event_type,
+            timestamp=time.time() if timestamp is None else timestamp,
+            data=event_data,
+            metadata=metadata
+        )
+
     def get_trace(self, trace_id: str, include_events: bool = True) -> Optional[Trace]:
         """
         Retrieve a trace by ID.
@@ -187,6 +342,8 @@ class SQLiteTraceStore:
         Returns:
             The Trace object, or None if not found.
         """
+        self.flush_events()
+
         # Load trace from database
         trace_data = self.db.fetch_one(
             "SELECT * FROM traces WHERE trace_id = ?",
@@ -199,11 +356,10 @@ class SQLiteTraceStore:
         # Load events if requested
         events = []
         if include_events:
-            events_data = self.db.fetch_all(
-                "SELECT * FROM events WHERE trace_id = ? ORDER BY sequence_number",
+            events = TraceEvent.from_rows(self.db.fetch_rows(
+                _SELECT_EVENTS_SQL + " WHERE trace_id = ? ORDER BY sequence_number",
                 (trace_id,)
-            )
-            events = [TraceEvent.from_db_dict(e) for e in events_data]
+            ))
 
         # Create Trace object
         return Trace.from_db_dict(trace_data, events=events)
@@ -249,18 +405,20 @@ class SQLiteTraceStore:
         Returns:
             List of TraceEvent objects.
         """
+        self.flush_events()
+
         if event_type:
-            events_data = self.db.fetch_all(
-                "SELECT * FROM events WHERE trace_id = ? AND event_type = ? ORDER BY sequence_number",
+            rows = self.db.fetch_rows(
+                _SELECT_EVENTS_SQL + " WHERE trace_id = ? AND event_type = ? ORDER BY sequence_number",
                 (trace_id, event_type.value)
             )
         else:
-            events_data = self.db.fetch_all(
-                "SELECT * FROM events WHERE trace_id = ? ORDER BY sequence_number",
+            rows = self.db.fetch_rows(
+                _SELECT_EVENTS_SQL + " WHERE trace_id = ? ORDER BY sequence_number",
                 (trace_id,)
             )
 
-        return [TraceEvent.from_db_dict(e) for e in events_data]
+        return TraceEvent.from_rows(rows)
 
     def query_traces(
         self,
@@ -360,6 +518,8 @@ class SQLiteTraceStore:
 
     def clear(self) -> None:
         """Clear all traces from database."""
+        self._pending_events = []
+        self._next_sequence.clear()
         self.db.execute("DELETE FROM events")
         self.db.execute("DELETE FROM traces")
         self._current_trace_id = None
@@ -374,6 +534,9 @@ class SQLiteTraceStore:
         Returns:
             True if deleted, False if not found.
         """
+        self.flush_events()
+        self._next_sequence.pop(trace_id, None)
+
         rows = self.db.delete('traces', 'trace_id = ?', (trace_id,))
         return rows > 0
 
@@ -387,6 +550,7 @@ class SQLiteTraceStore:
         Returns:
             Dictionary containing trace summary statistics.
         """
+        # get_trace() flushes buffered events before the counts below
         trace = self.get_trace(trace_id, include_events=False)
         if not trace:
             return None
@@ -8,13 +8,39 @@ trace storage.
 
 import json
 import os
+import sys
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+
+# orjson is optional; its JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return _json_dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
 
 
 class EventType(str, Enum):
@@ -28,7 +54,139 @@ class EventType(str, Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10+; older interpreters keep __dict__
+_DATACLASS_OPTIONS: Dict[str, Any] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Value -> member lookup, cheaper than EventType(value) in bulk loads
+_EVENT_TYPE_BY_VALUE: Dict[str, EventType] = {et.value: et for et in EventType}
+
+# Stable small-integer codes for dictionary-encoded event_type columns.
+# New members must be appended so existing codes keep their meaning.
+_ID_TO_EVENT_TYPE = tuple(EventType)
+_EVENT_TYPE_TO_ID: Dict[EventType, int] = {et: i for i, et in enumerate(_ID_TO_EVENT_TYPE)}
+
+
+def _event_type_from_value(value: Any) -> EventType:
+    """Resolve a stored event type string or integer code, raising ValueError if unknown."""
+    event_type = _EVENT_TYPE_BY_VALUE.get(value)
+    if event_type is not None:
+        return event_type
+
+    if type(value) is int:
+        if 0 <= value < len(_ID_TO_EVENT_TYPE):
+            return _ID_TO_EVENT_TYPE[value]
+        raise ValueError(f"{value!r} is not a valid EventType code")
+
+    return EventType(value)
+
+
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+@lru_cache(maxsize=1024)
+def _encode_scalar_items(items: tuple) -> str:
+    return _json_dumps({
+        name: float(value) if value_type is float else value
+        for name, value_type, value in items
+    })
+
+
+def _encode_metadata_cached(metadata: Dict[str, Any]) -> str:
+    """Encode a metadata dict, reusing the JSON of repeated flat dicts.
+
+    Value types are part of the cache key so that 1, 1.0 and True do not
+    share an encoding. Floats are keyed by repr(), which round-trips
+    exactly, because -0.0 == 0.0 and NaN != NaN. Nested or large dicts are
+    encoded directly.
+    """
+    if len(metadata) > 16:
+        return _json_dumps(metadata)
+
+    key = []
+    for name, value in metadata.items():
+        value_type = type(value)
+        if type(name) is not str or value_type not in _SCALAR_TYPES:
+            return _json_dumps(metadata)
+        key.append((name, value_type, repr(value) if value_type is float else value))
+
+    return _encode_scalar_items(tuple(key))
+
+
+# orjson encodes small dicts faster than building a cache key for them
+_encode_metadata = _json_dumps if orjson is not None else _encode_metadata_cached
+
+
+# Event types counted as LLM calls in trace statistics
+_LLM_EVENT_TYPES = frozenset((EventType.PROMPT, EventType.MODEL_RESPONSE))
+
+# traces columns echoed into Trace.metadata as '_db_<column>' by from_db_dict
+_DB_STAT_KEYS = tuple(
+    (column, '_db_' + column)
+    for column in ('status', 'total_events', 'llm_calls_count', 'total_tokens', 'total_cost_usd')
+)
+
+# Events table columns read back into a TraceEvent, in TraceEvent.from_rows order
+EVENT_ROW_COLUMNS = ('trace_id', 'event_type', 'timestamp', 'data')
+
+# Fetches EVENT_ROW_COLUMNS from a row dict in one call
+_get_event_columns = itemgetter(*EVENT_ROW_COLUMNS)
+
+# First character of every stored event payload (a JSON object)
+_PAYLOAD_OPENERS = ('{', b'{')
+
+
+def _decode_event_payload(raw: Any) -> Optional[Dict[str, Any]]:
+    """Parse an events.data payload, or return None if it is not a JSON object.
+
+    Payloads are always JSON objects, so values that cannot be one (NULL,
+    empty, plain text) are rejected by their first character without
+    raising and catching a decode error.
+    """
+    if type(raw) not in (str, bytes) or raw[:1] not in _PAYLOAD_OPENERS:
+        return None
+
+    try:
+        return _json_loads(raw)
+    except json.JSONDecodeError:
+        return None
+
+
+# Payload tail for events with empty data and no metadata
+_EMPTY_PAYLOAD_TAIL = ',"data":{},"metadata":{}}'
+
+
+def _encode_event_payload(
+    event_id: str,
+    data: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]],
+    as_bytes: bool = False
+) -> Union[str, bytes]:
+    """Encode the JSON document stored in the events.data column.
+
+    The event type has its own column and is not repeated in the document.
+    With as_bytes, returns UTF-8 bytes; orjson produces those directly.
+    """
+    if not metadata and type(data) is dict and not data:
+        payload = '{"event_id":' + _json_dumps(event_id) + _EMPTY_PAYLOAD_TAIL
+    elif orjson is not None:
+        encoded = _json_dumps_bytes({
+            'event_id': event_id,
+            'data': data,
+            'metadata': metadata or {}
+        })
+        return encoded if as_bytes else encoded.decode()
+    else:
+        # Same document as above, with the (often repeated) metadata spliced in
+        payload = '{"event_id":%s,"data":%s,"metadata":%s}' % (
+            _json_dumps(event_id),
+            _json_dumps(data),
+            _encode_metadata(metadata) if metadata else '{}'
+        )
+
+    return payload.encode('utf-8') if as_bytes else payload
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class TraceEvent:
     """Represents a single trace event."""
     event_id: str
@@ -55,70 +213,104 @@ class TraceEvent:
         return cls(
             event_id=data["event_id"],
             trace_id=data["trace_id"],
-            event_type=EventType(data["event_type"]),
+            event_type=_event_type_from_value(data["event_type"]),
             timestamp=data["timestamp"],
             data=data["data"],
             metadata=data.get("metadata")
         )
 
-    def to_db_dict(self, sequence_number: int) -> Dict[str, Any]:
+    def to_db_dict(self, sequence_number: int, as_bytes: bool = False) -> Dict[str, Any]:
         """Convert to database format (for events table).
 
         Args:
             sequence_number: The sequence number of this event in the trace
+            as_bytes: If True, ``data`` is the JSON document as UTF-8 bytes
+                (stored by sqlite3 as a BLOB) instead of str
 
         Returns:
             Dictionary with fields matching the events table schema
         """
-        # Combine data and metadata into a single JSON object for the data field
-        event_data = {
-            'event_id': self.event_id,
-            'event_type': self.event_type.value if isinstance(self.event_type, EventType) else self.event_type,
-            'data': self.data,
-            'metadata': self.metadata or {}
-        }
+        event_type = self.event_type.value if isinstance(self.event_type, EventType) else self.event_type
 
         return {
             'trace_id': self.trace_id,
-            'event_type': self.event_type.value if isinstance(self.event_type, EventType) else self.event_type,
+            'event_type': event_type,
             'timestamp': self.timestamp,
             'sequence_number': sequence_number,
-            'data': json.dumps(event_data)
+            # Combine data and metadata into a single JSON object for the data field
+            'data': _encode_event_payload(self.event_id, self.data, self.metadata, as_bytes)
         }
 
     @classmethod
     def from_db_dict(cls, db_data: Dict[str, Any]) -> "TraceEvent":
         """Create TraceEvent from database format.
 
+        The ``data`` column may hold the JSON document as TEXT or, for rows
+        written as BLOBs, as UTF-8 bytes; both are decoded the same way.
+
         Args:
             db_data: Dictionary from events table (row data)
 
         Returns:
             TraceEvent object
         """
+        trace_id, event_type, timestamp, raw_data = _get_event_columns(db_data)
+
         # Parse the data field
-        try:
-            event_data = json.loads(db_data['data'])
-        except (json.JSONDecodeError, TypeError):
+        event_data = _decode_event_payload(raw_data)
+        if event_data is None:
             # Fallback if data is not JSON
-            event_data = {
-                'event_id': str(uuid.uuid4()),
-                'event_type': db_data['event_type'],
-                'data': {},
-                'metadata': {}
-            }
+            event_data = {'data': {}, 'metadata': {}}
 
         return cls(
-            event_id=event_data.get('event_id', str(uuid.uuid4())),
-            trace_id=db_data['trace_id'],
-            event_type=EventType(db_data['event_type']),
-            timestamp=db_data['timestamp'],
+            # Only mint a UUID when the payload has no event_id
+            event_id=event_data['event_id'] if 'event_id' in event_data else str(uuid.uuid4()),
+            trace_id=trace_id,
+            event_type=_event_type_from_value(event_type),
+            timestamp=timestamp,
             data=event_data.get('data', {}),
             metadata=event_data.get('metadata')
         )
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[Any]]) -> List["TraceEvent"]:
+        """Create TraceEvents from positional events rows.
+
+        Bulk counterpart of from_db_dict() with the same fallbacks. Each row
+        holds the columns in EVENT_ROW_COLUMNS order, e.g. the result of
+        ``SELECT trace_id, event_type, timestamp, data FROM events``.
 
-@dataclass
+        Args:
+            rows: Iterable of (trace_id, event_type, timestamp, data) rows
+
+        Returns:
+            List of TraceEvent objects in row order
+        """
+        events: List[TraceEvent] = []
+        append = events.append
+        decode = _decode_event_payload
+        resolve_type = _event_type_from_value
+        new_uuid = uuid.uuid4
+
+        for trace_id, event_type, timestamp, raw_data in rows:
+            event_data = decode(raw_data)
+            if event_data is None:
+                # Fallback if data is not JSON
+                event_data = {'data': {}, 'metadata': {}}
+
+            append(cls(
+                event_data['event_id'] if 'event_id' in event_data else str(new_uuid()),
+                trace_id,
+                resolve_type(event_type),
+                timestamp,
+                event_data.get('data', {}),
+                event_data.get('metadata')
+            ))
+
+        return events
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class Trace:
     """Represents a complete trace (collection of events)."""
     trace_id: str
@@ -129,6 +321,84 @@ class Trace:
     events: List[TraceEvent]
     metadata: Optional[Dict[str, Any]] = None
 
+    # Running aggregates over events[:_counted_events], kept by _sync_stats()
+    _stats_events: Optional[List[TraceEvent]] = field(default=None, init=False, repr=False, compare=False)
+    _stats_dirty: bool = field(default=False, init=False, repr=False, compare=False)
+    _counted_events: int = field(default=0, init=False, repr=False, compare=False)
+    _llm_calls_count: int = field(default=0, init=False, repr=False, compare=False)
+    _total_tokens: int = field(default=0, init=False, repr=False, compare=False)
+    _total_cost_usd: float = field(default=0.0, init=False, repr=False, compare=False)
+    _has_error: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def add_event(self, event: TraceEvent) -> None:
+        """Append an event and fold it into the running aggregates.
+
+        Args:
+            event: The event to append
+        """
+        self.events.append(event)
+        self._sync_stats()
+
+    def invalidate_stats(self) -> None:
+        """Mark the running aggregates stale.
+
+        Call after removing or replacing events in place, or editing an
+        event's ``data``; the next ``to_db_dict()`` then recounts all
+        events. Appending to ``events`` or reassigning it is detected
+        without it.
+        """
+        self._stats_dirty = True
+
+    def _recompute(self) -> None:
+        """Recount the running aggregates from all events."""
+        self._stats_events = self.events
+        self._stats_dirty = False
+        self._counted_events = 0
+        self._llm_calls_count = 0
+        self._total_tokens = 0
+        self._total_cost_usd = 0.0
+        self._has_error = False
+        self._sync_stats()
+
+    def _sync_stats(self) -> None:
+        """Bring the running aggregates up to date with ``events``."""
+        events = self.events
+        if (
+            self._stats_dirty
+            or events is not self._stats_events
+            or len(events) < self._counted_events
+        ):
+            self._recompute()
+            return
+
+        if self._counted_events == len(events):
+            return
+
+        # Fused single pass over the new events, accumulating in locals
+        llm_types = _LLM_EVENT_TYPES
+        error_type = EventType.ERROR
+        llm_calls_count = self._llm_calls_count
+        total_tokens = self._total_tokens
+        total_cost_usd = self._total_cost_usd
+        has_error = self._has_error
+
+        for event in islice(events, self._counted_events, None):
+            event_type = event.event_type
+            if event_type in llm_types:
+                llm_calls_count += 1
+                # Try to extract token and cost info from event data
+                data = event.data
+                total_tokens += data.get('total_tokens', 0)
+                total_cost_usd += data.get('cost_usd', 0.0)
+            elif event_type == error_type:
+                has_error = True
+
+        self._llm_calls_count = llm_calls_count
+        self._total_tokens = total_tokens
+        self._total_cost_usd = total_cost_usd
+        self._has_error = has_error
+        self._counted_events = len(events)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -165,47 +435,33 @@ class Trace:
         if self.end_time:
             duration_seconds = self.end_time - self.start_time
 
+        # Statistics are maintained incrementally as events are added
+        self._sync_stats()
+
         # Determine status
         if self.end_time is None:
             status = 'running'
         else:
-            # Check for error events
-            has_error = any(e.event_type == EventType.ERROR for e in self.events)
-            status = 'failed' if has_error else 'completed'
-
-        # Calculate statistics from events
-        total_events = len(self.events)
-        llm_calls_count = sum(
-            1 for e in self.events
-            if e.event_type in (EventType.PROMPT, EventType.MODEL_RESPONSE)
-        )
-
-        # Extract LLM stats from events
-        total_tokens = 0
-        total_cost_usd = 0.0
-        for event in self.events:
-            if event.event_type in (EventType.PROMPT, EventType.MODEL_RESPONSE):
-                # Try to extract token and cost info from event data
-                total_tokens += event.data.get('total_tokens', 0)
-                total_cost_usd += event.data.get('cost_usd', 0.0)
+            status = 'failed' if self._has_error else 'completed'
 
         # Extract tags and quality metrics from metadata
         tags = None
         quality_score = None
         cost_efficiency = None
+        metadata_json = None
 
-        if self.metadata:
-            if 'tags' in self.metadata:
-                tags = json.dumps(self.metadata['tags'])
-            if 'quality_score' in self.metadata:
-                quality_score = self.metadata['quality_score']
-            if 'cost_efficiency' in self.metadata:
-                cost_efficiency = self.metadata['cost_efficiency']
+        metadata = self.metadata
+        if metadata:
+            quality_score = metadata.get('quality_score')
+            cost_efficiency = metadata.get('cost_efficiency')
 
-        # Serialize metadata (excluding tags which are stored separately)
-        metadata_dict = dict(self.metadata) if self.metadata else {}
-        metadata_dict.pop('tags', None)  # Remove tags from metadata
-        metadata_json = json.dumps(metadata_dict) if metadata_dict else None
+            # Serialize metadata (excluding tags which are stored separately);
+            # only copied when there are tags to leave out
+            if 'tags' in metadata:
+                tags = _json_dumps(metadata['tags'])
+                metadata = {k: v for k, v in metadata.items() if k != 'tags'}
+            if metadata:
+                metadata_json = _encode_metadata(metadata)
 
         return {
             'trace_id': self.trace_id,
@@ -215,10 +471,10 @@ class Trace:
             'end_time': self.end_time,
             'duration_seconds': duration_seconds,
             'status': status,
-            'total_events': total_events,
-            'llm_calls_count': llm_calls_count,
-            'total_tokens': total_tokens,
-            'total_cost_usd': total_cost_usd,
+            'total_events': self._counted_events,
+            'llm_calls_count': self._llm_calls_count,
+            'total_tokens': self._total_tokens,
+            'total_cost_usd': self._total_cost_usd,
             'quality_score': quality_score,
             'cost_efficiency': cost_efficiency,
             'tags': tags,
@@ -236,33 +492,36 @@ class Trace:
         Returns:
             Trace object
         """
+        get = db_data.get
+
         # Parse metadata
         metadata = {}
-        if db_data.get('metadata'):
+        raw_metadata = get('metadata')
+        if raw_metadata:
             try:
-                metadata = json.loads(db_data['metadata'])
+                metadata = _json_loads(raw_metadata)
             except (json.JSONDecodeError, TypeError):
                 pass
 
         # Add tags back to metadata
-        if db_data.get('tags'):
+        raw_tags = get('tags')
+        if raw_tags:
             try:
-                metadata['tags'] = json.loads(db_data['tags'])
+                metadata['tags'] = _json_loads(raw_tags)
             except (json.JSONDecodeError, TypeError):
                 pass
 
         # Add quality metrics to metadata
-        if db_data.get('quality_score') is not None:
-            metadata['quality_score'] = db_data['quality_score']
-        if db_data.get('cost_efficiency') is not None:
-            metadata['cost_efficiency'] = db_data['cost_efficiency']
+        quality_score = get('quality_score')
+        if quality_score is not None:
+            metadata['quality_score'] = quality_score
+        cost_efficiency = get('cost_efficiency')
+        if cost_efficiency is not None:
+            metadata['cost_efficiency'] = cost_efficiency
 
         # Add database-specific fields to metadata for reference
-        metadata['_db_status'] = db_data.get('status')
-        metadata['_db_total_events'] = db_data.get('total_events')
-        metadata['_db_llm_calls_count'] = db_data.get('llm_calls_count')
-        metadata['_db_total_tokens'] = db_data.get('total_tokens')
-        metadata['_db_total_cost_usd'] = db_data.get('total_cost_usd')
+        for column, key in _DB_STAT_KEYS:
+            metadata[key] = get(column)
 
         return cls(
             trace_id=db_data['trace_id'],
@@ -391,10 +650,53 @@ class TraceStore:
             metadata=metadata
         )
 
-        self._traces[tid].events.append(event)
+        self._traces[tid].add_event(event)
 
         return event.event_id
 
+    def write_events(
+        self,
+        events: Iterable[Tuple[Dict[str, Any], Optional[EventType], Optional[float]]],
+        trace_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Write several trace events to one trace.
+
+        Args:
+            events: (event_data, event_type, timestamp) tuples, in order. An
+                event_type of None is inferred from event_data, and a
+                timestamp of None means the current time.
+            trace_id: Optional trace ID. If None, uses current trace.
+
+        Returns:
+            The event_ids of the created events.
+
+        Raises:
+            ValueError: If no trace is active.
+        """
+        tid = trace_id or self._current_trace_id
+        trace = self._traces.get(tid) if tid else None
+        if trace is None:
+            raise ValueError("No active trace. Call start_trace() first.")
+
+        event_ids = []
+        for event_data, event_type, timestamp in events:
+            if event_type is None:
+                event_type = self._infer_event_type(event_data)
+
+            event = TraceEvent(
+                event_id=str(uuid.uuid4()),
+                trace_id=tid,
+                event_type=event_type,
+                timestamp=time.time() if timestamp is None else timestamp,
+                data=event_data,
+                metadata=None
+            )
+            trace.add_event(event)
+            event_ids.append(event.event_id)
+
+        return event_ids
+
     def get_trace(self, trace_id: str) -> Optional[Trace]:
         """
         Retrieve a trace by ID.
@@ -484,17 +786,7 @@ class TraceStore:
     def _infer_event_type(self, event_data: Dict[str, Any]) -> EventType:
         """Infer event type from event data."""
         event_type_str = event_data.get("type", "")
-
-        type_mapping = {
-            "prompt": EventType.PROMPT,
-            "model_response": EventType.MODEL_RESPONSE,
-            "tool_call": EventType.TOOL_CALL,
-            "tool_result": EventType.TOOL_RESULT,
-            "error": EventType.ERROR,
-            "assertion": EventType.ASSERTION,
-        }
-
-        return type_mapping.get(event_type_str, EventType.CUSTOM)
+        return _EVENT_TYPE_BY_VALUE.get(event_type_str, EventType.CUSTOM)
 
     def _save_trace(self, trace_id: str) -> None:
         """Save a trace to disk."""
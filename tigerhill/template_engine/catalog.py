@@ -8,6 +8,8 @@ import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+from .loader import parse_yaml
+
 
 class TemplateCatalog:
     """Manages template catalog"""
@@ -40,7 +42,7 @@ class TemplateCatalog:
 
         try:
             with open(self.catalog_path, 'r', encoding='utf-8') as f:
-                self._catalog_data = yaml.safe_load(f)
+                self._catalog_data = parse_yaml(f)
             return self._catalog_data
         except Exception as e:
             raise Exception(f"Failed to load catalog: {e}")
@@ -5,6 +5,7 @@ Generates test scripts from templates using Jinja2.
 """
 
 import os
+import re
 from pathlib import Path
 from typing import Dict, Any, List
 from jinja2 import Template as Jinja2Template, Environment, StrictUndefined, TemplateError
@@ -15,6 +16,59 @@ class CodeGenerationError(Exception):
     pass
 
 
+def _snake_case(text: str) -> str:
+    """Convert to snake_case"""
+    # Replace hyphens with underscores
+    text = text.replace('-', '_')
+    # Insert underscore before capitals
+    text = re.sub('([a-z])([A-Z])', r'\1_\2', text)
+    return text.lower()
+
+
+def _camel_case(text: str) -> str:
+    """Convert to CamelCase"""
+    parts = text.replace('-', '_').split('_')
+    return ''.join(word.capitalize() for word in parts)
+
+
+def _kebab_case(text: str) -> str:
+    """Convert to kebab-case"""
+    text = text.replace('_', '-')
+    # Insert hyphen before capitals
+    text = re.sub('([a-z])([A-Z])', r'\1-\2', text)
+    return text.lower()
+
+
+def _create_environment() -> Environment:
+    """
+    Create the Jinja2 environment shared by all generators
+
+    Output is Python/Markdown/text rather than HTML and templates come from
+    in-memory strings, so autoescaping and reload checks are disabled.
+    """
+    env = Environment(
+        undefined=StrictUndefined,
+        autoescape=False,
+        auto_reload=False,
+        cache_size=1000,
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+
+    # Add custom filters
+    env.filters['snake_case'] = _snake_case
+    env.filters['camel_case'] = _camel_case
+    env.filters['kebab_case'] = _kebab_case
+
+    return env
+
+
+_ENV = _create_environment()
+
+# Compiled Jinja2 templates keyed by source string, shared across generators
+_COMPILED: Dict[str, Jinja2Template] = {}
+
+
 class CodeGenerator:
     """Generates code from templates"""
 
@@ -26,45 +80,7 @@ class CodeGenerator:
             template: Template object from TemplateLoader
         """
         self.template = template
-
-        # Create Jinja2 environment
-        self.env = Environment(
-            undefined=StrictUndefined,
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
-
-        # Add custom filters
-        self._add_custom_filters()
-
-    def _add_custom_filters(self):
-        """Add custom Jinja2 filters"""
-
-        def snake_case(text: str) -> str:
-            """Convert to snake_case"""
-            import re
-            # Replace hyphens with underscores
-            text = text.replace('-', '_')
-            # Insert underscore before capitals
-            text = re.sub('([a-z])([A-Z])', r'\1_\2', text)
-            return text.lower()
-
-        def camel_case(text: str) -> str:
-            """Convert to CamelCase"""
-            parts = text.replace('-', '_').split('_')
-            return ''.join(word.capitalize() for word in parts)
-
-        def kebab_case(text: str) -> str:
-            """Convert to kebab-case"""
-            import re
-            text = text.replace('_', '-')
-            # Insert hyphen before capitals
-            text = re.sub('([a-z])([A-Z])', r'\1-\2', text)
-            return text.lower()
-
-        self.env.filters['snake_case'] = snake_case
-        self.env.filters['camel_case'] = camel_case
-        self.env.filters['kebab_case'] = kebab_case
+        self.env = _ENV
 
     def generate(
         self,
@@ -86,13 +102,98 @@ class CodeGenerator:
         Raises:
             CodeGenerationError: If generation fails
         """
+        return self.write_files(self._render_all(params), output_dir, overwrite)
+
+    def write_files(
+        self,
+        rendered_files: Dict[str, str],
+        output_dir: str,
+        overwrite: bool = False
+    ) -> List[str]:
+        """
+        Write files rendered by generate_to_dict()
+
+        Lets callers keep the rendered content without reading the
+        written files back.
+
+        Args:
+            rendered_files: Dictionary mapping rendered file paths to content
+            output_dir: Output directory for generated files
+            overwrite: Whether to overwrite existing files
+
+        Returns:
+            List of generated file paths, in the order of rendered_files
+
+        Raises:
+            CodeGenerationError: If a file exists or cannot be written
+        """
         output_path = Path(output_dir)
 
         # Create output directory if it doesn't exist
         output_path.mkdir(parents=True, exist_ok=True)
 
+        # Check for existing files before writing anything
+        if not overwrite:
+            for rendered_path in rendered_files:
+                full_path = output_path / rendered_path
+                if full_path.exists():
+                    raise CodeGenerationError(
+                        f"File already exists: {full_path} (use overwrite=True to replace)"
+                    )
+
         generated_files = []
 
+        for rendered_path, rendered_content in rendered_files.items():
+            full_path = output_path / rendered_path
+
+            # Write file
+            try:
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(full_path, 'w', encoding='utf-8') as f:
+                    f.write(rendered_content)
+
+                generated_files.append(str(full_path))
+
+            except Exception as e:
+                raise CodeGenerationError(
+                    f"Failed to write file {full_path}: {e}"
+                )
+
+        return generated_files
+
+    def generate_to_dict(self, params: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Generate files in memory without touching the filesystem
+
+        Unlike preview(), rendering failures raise instead of being
+        embedded in the returned content.
+
+        Args:
+            params: Template parameters
+
+        Returns:
+            Dictionary mapping rendered file paths to rendered content
+
+        Raises:
+            CodeGenerationError: If generation fails
+        """
+        return self._render_all(params)
+
+    def _render_all(self, params: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Render every file defined by the template
+
+        Args:
+            params: Template parameters
+
+        Returns:
+            Dictionary mapping rendered file paths to rendered content
+
+        Raises:
+            CodeGenerationError: If a path or template fails to render
+        """
+        rendered_files = {}
+
         # Process each file definition
         for file_def in self.template.files:
             file_path = file_def['path']
@@ -106,15 +207,6 @@ class CodeGenerator:
                     f"Failed to render file path '{file_path}': {e}"
                 )
 
-            # Get full output path
-            full_path = output_path / rendered_path
-
-            # Check if file exists
-            if full_path.exists() and not overwrite:
-                raise CodeGenerationError(
-                    f"File already exists: {full_path} (use overwrite=True to replace)"
-                )
-
             # Get template content
             template_content = self.template.get_template_content(template_name)
             if template_content is None:
@@ -124,7 +216,7 @@ class CodeGenerator:
 
             # Render template
             try:
-                rendered_content = self._render_template(
+                rendered_files[rendered_path] = self._render_template(
                     template_content,
                     params
                 )
@@ -133,20 +225,23 @@ class CodeGenerator:
                     f"Failed to render template '{template_name}': {e}"
                 )
 
-            # Write file
-            try:
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write(rendered_content)
+        return rendered_files
 
-                generated_files.append(str(full_path))
+    def _compile(self, source: str) -> Jinja2Template:
+        """
+        Compile a Jinja2 template string, reusing earlier compilations
 
-            except Exception as e:
-                raise CodeGenerationError(
-                    f"Failed to write file {full_path}: {e}"
-                )
+        Args:
+            source: Jinja2 template source
 
-        return generated_files
+        Returns:
+            Compiled Jinja2 template
+        """
+        compiled = _COMPILED.get(source)
+        if compiled is None:
+            compiled = self.env.from_string(source)
+            _COMPILED[source] = compiled
+        return compiled
 
     def _render_string(self, template_str: str, params: Dict[str, Any]) -> str:
         """
@@ -160,7 +255,7 @@ class CodeGenerator:
             Rendered string
         """
         try:
-            template = self.env.from_string(template_str)
+            template = self._compile(template_str)
             return template.render(**self._get_render_context(params))
         except TemplateError as e:
             raise CodeGenerationError(f"Template rendering error: {e}")
@@ -181,7 +276,7 @@ class CodeGenerator:
             Rendered content
         """
         try:
-            template = self.env.from_string(template_content)
+            template = self._compile(template_content)
             return template.render(**self._get_render_context(params))
         except TemplateError as e:
             raise CodeGenerationError(f"Template rendering error: {e}")
@@ -9,6 +9,39 @@ import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on PyYAML build
+    from yaml import SafeLoader as _YamlLoader
+
+
+def parse_yaml(stream) -> Any:
+    """Safely parse YAML from a string or file object"""
+    return yaml.load(stream, Loader=_YamlLoader)
+
+
+def _scan_yaml(directory: str, recursive: bool) -> List[str]:
+    """
+    Collect .yaml file paths under a directory
+
+    Uses os.scandir so directory entries are classified from the listing
+    itself instead of stat()-ing every path as Path.glob does.
+    """
+    found = []
+    pending = [directory]
+
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        pending.append(entry.path)
+                elif entry.name.endswith('.yaml'):
+                    found.append(entry.path)
+
+    return found
+
 
 class TemplateLoadError(Exception):
     """Raised when template loading fails"""
@@ -84,6 +117,12 @@ class TemplateLoader:
                 f"Templates directory not found: {self.templates_dir}"
             )
 
+        # Parsed templates keyed by relative path
+        self._template_cache: Dict[str, Template] = {}
+
+        # list_templates() results keyed by category filter
+        self._list_cache: Dict[Optional[str], List[str]] = {}
+
     def load_template(self, template_path: str) -> Template:
         """
         Load a single template from a path relative to templates_dir
@@ -97,6 +136,10 @@ class TemplateLoader:
         Raises:
             TemplateLoadError: If template cannot be loaded
         """
+        cached = self._template_cache.get(template_path)
+        if cached is not None:
+            return cached
+
         full_path = self.templates_dir / template_path
 
         if not full_path.exists():
@@ -104,7 +147,7 @@ class TemplateLoader:
 
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+                data = parse_yaml(f)
 
             if not isinstance(data, dict):
                 raise TemplateLoadError(
@@ -122,7 +165,9 @@ class TemplateLoader:
                     f"Template {template_path} missing 'templates' section"
                 )
 
-            return Template(data, str(full_path))
+            template = Template(data, str(full_path))
+            self._template_cache[template_path] = template
+            return template
 
         except yaml.YAMLError as e:
             raise TemplateLoadError(
@@ -133,36 +178,48 @@ class TemplateLoader:
                 f"Failed to load template {template_path}: {e}"
             )
 
+    def clear_cache(self):
+        """Drop cached templates and listings so they are re-read from disk"""
+        self._template_cache.clear()
+        self._list_cache.clear()
+
     def list_templates(self, category: Optional[str] = None) -> List[str]:
         """
         List all available templates
 
+        The directory scan is cached per category; call clear_cache() to
+        pick up templates added after the first listing.
+
         Args:
             category: Optional category filter
 
         Returns:
             List of template paths (relative to templates_dir)
         """
-        templates = []
-
+        cached = self._list_cache.get(category)
+        if cached is None:
+            cached = self._scan_templates(category)
+            self._list_cache[category] = cached
+        return list(cached)
+
+    def _scan_templates(self, category: Optional[str]) -> List[str]:
+        """Scan templates_dir (or one category directory) for template files"""
         # Search for .yaml files
         if category:
             search_dir = self.templates_dir / category
             if not search_dir.exists():
                 return []
-            pattern = "*.yaml"
+            yaml_paths = _scan_yaml(str(search_dir), recursive=False)
         else:
-            search_dir = self.templates_dir
-            pattern = "**/*.yaml"
+            yaml_paths = _scan_yaml(str(self.templates_dir), recursive=True)
 
-        for yaml_file in search_dir.glob(pattern):
+        root = str(self.templates_dir)
+        templates = [
+            os.path.relpath(path, root)
+            for path in yaml_paths
             # Skip catalog.yaml
-            if yaml_file.name == 'catalog.yaml':
-                continue
-
-            # Get relative path
-            rel_path = yaml_file.relative_to(self.templates_dir)
-            templates.append(str(rel_path))
+            if os.path.basename(path) != 'catalog.yaml'
+        ]
 
         return sorted(templates)
 
@@ -6,9 +6,25 @@ Validates user-provided parameters against template parameter definitions.
 
 import re
 import json
-from typing import Dict, List, Any, Tuple, Optional
+import weakref
+from typing import Dict, List, Any, Tuple, Optional, Callable, Pattern
 from urllib.parse import urlparse
 
+# orjson is optional; its JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.JSONDecoder().decode
+
+
+# Whole value: scheme, non-empty netloc, optional path/query/fragment, no
+# whitespace. urlparse() still checks the netloc (e.g. unbalanced IPv6 brackets).
+_URL_RE = re.compile(r'[A-Za-z][A-Za-z0-9+.-]*://[^\s/?#]+(?:[/?#]\S*)?')
+
+# Simple email validation
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 
 class ParameterValidationError(Exception):
     """Raised when parameter validation fails"""
@@ -18,14 +34,109 @@ class ParameterValidationError(Exception):
 class TemplateValidator:
     """Validates parameters for a template"""
 
+    # Parameter type -> validator method name
+    _TYPE_VALIDATORS = {
+        'string': '_validate_string',
+        'integer': '_validate_integer',
+        'float': '_validate_float',
+        'boolean': '_validate_boolean',
+        'choice': '_validate_choice',
+        'json': '_validate_json',
+        'url': '_validate_url',
+        'email': '_validate_email',
+        'path': '_validate_path',
+    }
+
+    # Shared validators, one per live Template object
+    _instances: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def for_template(cls, template) -> "TemplateValidator":
+        """
+        Get the shared validator for a template, creating it on first use
+
+        Validators hold no per-call state, so a single instance can serve
+        every validation of the same template.
+
+        Args:
+            template: Template object from TemplateLoader
+
+        Returns:
+            TemplateValidator bound to the template
+        """
+        validator = cls._instances.get(template)
+        if validator is None:
+            validator = cls(template)
+            cls._instances[template] = validator
+        return validator
+
     def __init__(self, template):
         """
         Initialize validator with a template
 
+        Parameter definitions are indexed and each parameter's check is
+        resolved once here, so validate() only does dictionary lookups.
+
+        Only a weak reference to the template is kept, so the shared
+        instance in for_template() does not keep its own key alive.
+
         Args:
             template: Template object from TemplateLoader
         """
-        self.template = template
+        self._template_ref = weakref.ref(template)
+
+        self._param_defs: Dict[str, Dict] = {}
+        for param_def in template.parameters:
+            self._param_defs.setdefault(param_def['name'], param_def)
+
+        # Compiled 'validation.pattern' regexes keyed by pattern string
+        self._patterns: Dict[str, Pattern] = {}
+        for param_def in self._param_defs.values():
+            pattern = (param_def.get('validation') or {}).get('pattern')
+            if pattern is not None and pattern not in self._patterns:
+                try:
+                    self._patterns[pattern] = re.compile(pattern)
+                except re.error:
+                    # Left uncompiled; reported when the parameter is validated
+                    pass
+
+        # Default values for parameters that declare one
+        self._defaults: Dict[str, Any] = {
+            name: param_def['default']
+            for name, param_def in self._param_defs.items()
+            if 'default' in param_def
+        }
+
+        self._required: Tuple[str, ...] = tuple(
+            name for name, param_def in self._param_defs.items()
+            if param_def.get('required', False)
+        )
+
+        self._checks: Dict[str, Callable[[Any], List[str]]] = {
+            name: self._build_check(name, param_def)
+            for name, param_def in self._param_defs.items()
+        }
+
+    @property
+    def template(self):
+        """Template this validator was built for (None once it is garbage collected)"""
+        return self._template_ref()
+
+    def _build_check(
+        self,
+        param_name: str,
+        param_def: Dict
+    ) -> Callable[[Any], List[str]]:
+        """Resolve the type validator for a parameter into a single-argument check"""
+        param_type = param_def.get('type', 'string')
+        method_name = self._TYPE_VALIDATORS.get(param_type)
+
+        if method_name is None:
+            error = f"Unknown parameter type '{param_type}' for {param_name}"
+            return lambda value: [error]
+
+        method = getattr(self, method_name)
+        return lambda value: method(param_name, value, param_def)
 
     def validate(self, params: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """
@@ -40,31 +151,24 @@ class TemplateValidator:
         errors = []
 
         # Check all required parameters are provided
-        for param_def in self.template.parameters:
-            param_name = param_def['name']
-            is_required = param_def.get('required', False)
-
-            if is_required and param_name not in params:
+        for param_name in self._required:
+            if param_name not in params:
                 errors.append(
                     f"Missing required parameter: {param_name}"
                 )
 
         # Validate each provided parameter
+        checks = self._checks
         for param_name, param_value in params.items():
-            # Get parameter definition
-            param_def = self.template.get_parameter(param_name)
+            check = checks.get(param_name)
 
-            if param_def is None:
+            if check is None:
                 errors.append(
                     f"Unknown parameter: {param_name}"
                 )
                 continue
 
-            # Validate the parameter
-            param_errors = self._validate_parameter(
-                param_name, param_value, param_def
-            )
-            errors.extend(param_errors)
+            errors.extend(check(param_value))
 
         return (len(errors) == 0, errors)
 
@@ -75,34 +179,7 @@ class TemplateValidator:
         param_def: Dict
     ) -> List[str]:
         """Validate a single parameter"""
-        errors = []
-        param_type = param_def.get('type', 'string')
-
-        # Type validation
-        if param_type == 'string':
-            errors.extend(self._validate_string(param_name, value, param_def))
-        elif param_type == 'integer':
-            errors.extend(self._validate_integer(param_name, value, param_def))
-        elif param_type == 'float':
-            errors.extend(self._validate_float(param_name, value, param_def))
-        elif param_type == 'boolean':
-            errors.extend(self._validate_boolean(param_name, value, param_def))
-        elif param_type == 'choice':
-            errors.extend(self._validate_choice(param_name, value, param_def))
-        elif param_type == 'json':
-            errors.extend(self._validate_json(param_name, value, param_def))
-        elif param_type == 'url':
-            errors.extend(self._validate_url(param_name, value, param_def))
-        elif param_type == 'email':
-            errors.extend(self._validate_email(param_name, value, param_def))
-        elif param_type == 'path':
-            errors.extend(self._validate_path(param_name, value, param_def))
-        else:
-            errors.append(
-                f"Unknown parameter type '{param_type}' for {param_name}"
-            )
-
-        return errors
+        return self._build_check(param_name, param_def)(value)
 
     def _validate_string(
         self,
@@ -122,7 +199,10 @@ class TemplateValidator:
         # Pattern validation
         if 'pattern' in validation:
             pattern = validation['pattern']
-            if not re.match(pattern, value):
+            compiled = self._patterns.get(pattern)
+            if compiled is None:
+                compiled = re.compile(pattern)
+            if not compiled.match(value):
                 errors.append(
                     f"{param_name}: value '{value}' does not match pattern '{pattern}'"
                 )
@@ -252,7 +332,7 @@ class TemplateValidator:
         if isinstance(value, str):
             # Try to parse as JSON
             try:
-                json.loads(value)
+                _json_loads(value)
             except json.JSONDecodeError as e:
                 errors.append(f"{param_name}: invalid JSON - {e}")
         elif not isinstance(value, (dict, list)):
@@ -275,11 +355,13 @@ class TemplateValidator:
             errors.append(f"{param_name}: expected string, got {type(value).__name__}")
             return errors
 
+        if not _URL_RE.fullmatch(value):
+            errors.append(f"{param_name}: invalid URL format")
+            return errors
+
         try:
-            result = urlparse(value)
-            if not all([result.scheme, result.netloc]):
-                errors.append(f"{param_name}: invalid URL format")
-        except Exception as e:
+            urlparse(value)
+        except ValueError as e:
             errors.append(f"{param_name}: invalid URL - {e}")
 
         return errors
@@ -297,9 +379,7 @@ class TemplateValidator:
             errors.append(f"{param_name}: expected string, got {type(value).__name__}")
             return errors
 
-        # Simple email validation
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, value):
+        if not _EMAIL_RE.match(value):
             errors.append(f"{param_name}: invalid email format")
 
         return errors
@@ -337,14 +417,4 @@ class TemplateValidator:
         Returns:
             Parameters with defaults applied
         """
-        result = params.copy()
-
-        for param_def in self.template.parameters:
-            param_name = param_def['name']
-
-            # Apply default if parameter not provided and has default value
-            if param_name not in result:
-                if 'default' in param_def:
-                    result[param_name] = param_def['default']
-
-        return result
+        return {**self._defaults, **params}